@@ -0,0 +1,303 @@
+# -*- coding:utf-8 -*-
+
+"""Load test of `jumeaux run` with local stand-in servers for one and other
+
+Servers return synthetic JSON (see `benchmarks/payloads.py`) with configurable latency, size,
+ratio of different responses and ratio of errors. `jumeaux run` is executed for each concurrency
+in a separate process, and its throughput, CPU time, peak RSS and time of each stage are reported.
+
+Usage:
+  load.py [--requests <requests>] [--threads <threads>] [--processes <processes>]
+          [--latency <latency>] [--size <size>] [--diff-ratio <diff_ratio>]
+          [--error-rate <error_rate>] [--config <yaml>...] [--output <file>]
+  load.py --help
+
+Options:
+  --requests <requests>      Number of requests [default: 200]
+  --threads <threads>        Comma separated numbers of threads to run [default: 1,4]
+  --processes <processes>    Comma separated numbers of processes to run (threads are 1) [default: ]
+  --latency <latency>        Latency of servers in milliseconds [default: 20]
+  --size <size>              Approximate size of a response in bytes [default: 10000]
+  --diff-ratio <diff_ratio>  Ratio of requests whose responses are different [default: 0.1]
+  --error-rate <error_rate>  Ratio of requests to which other returns 500 [default: 0]
+  --config <yaml>...         Configuration files deeply merged into the generated one in order.
+                             (Lists such as add-ons of each layer are replaced, not appended)
+                             `final/json` is required to read results if `final` is overwritten
+  --output <file>            Save results as JSON
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List, Tuple
+
+from docopt import docopt
+from owlmixin import OwlMixin, TDict, TList, TOption
+from owlmixin.util import load_yamlf
+
+# noinspection PyUnresolvedReferences
+import jumeaux.addons  # XXX: Workaround for cyclic import
+from benchmarks import payloads
+from jumeaux import __version__
+from jumeaux.domain.config.service import apply_include_addons
+from jumeaux.models import Report, StatusCounts, TimingStats
+from jumeaux.utils import now
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+ERROR_BODY = b'{"message": "Internal Server Error"}'
+
+
+class Args(OwlMixin):
+    requests: int
+    threads: str
+    processes: str
+    latency: int
+    size: int
+    diff_ratio: float
+    error_rate: float
+    config: TList[str]
+    output: TOption[str]
+
+
+class Result(OwlMixin):
+    threads: int
+    processes: int
+    trials: int
+    # Including start-up and loading requests
+    elapsed_sec: float
+    # From the first request to the end (without start-up and loading requests)
+    run_sec: float
+    trials_per_sec: float
+    # User + system time of `jumeaux run` including worker processes
+    cpu_sec: float
+    # Max RSS of the largest process (`jumeaux run` or one of worker processes)
+    peak_rss_mb: float
+    status: StatusCounts
+    one_mean_sec: float
+    other_mean_sec: float
+    # `summary.timings` of the report
+    stages: TDict[TimingStats]
+    addons: TDict[TimingStats]
+
+
+def every(ratio: float, i: int) -> bool:
+    """True for every (1 / ratio)th `i`"""
+    return ratio > 0 and i % max(1, round(1 / ratio)) == 0
+
+
+def create_handler(is_other: bool, args: Args, same: bytes, different: bytes):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            i = int(self.path.split("?")[0].rsplit("/", 1)[-1])
+            time.sleep(args.latency / 1000)
+            # Shifted not to overlap requests whose responses are different
+            if is_other and every(args.error_rate, i + 1):
+                self.respond(500, ERROR_BODY)
+            else:
+                self.respond(200, different if is_other and every(args.diff_ratio, i) else same)
+
+        def respond(self, status: int, body: bytes):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+@contextmanager
+def serve(args: Args) -> Iterator[Tuple[str, str]]:
+    """Start servers for one and other in threads
+    :return: (host of one, host of other)
+    """
+    same = payloads.json_payload_by_size(args.size)
+    different = payloads.json_payload_by_size(args.size, 0.1)
+    servers = [
+        ThreadingHTTPServer(("127.0.0.1", 0), create_handler(is_other, args, same, different))
+        for is_other in [False, True]
+    ]
+    for s in servers:
+        s.daemon_threads = True
+        threading.Thread(target=s.serve_forever, daemon=True).start()
+    try:
+        yield tuple(f"http://127.0.0.1:{s.server_address[1]}" for s in servers)  # type: ignore
+    finally:
+        for s in servers:
+            s.shutdown()
+            s.server_close()
+
+
+def deep_merge(base: dict, override: dict) -> dict:
+    """Merge dicts recursively. Values other than dicts (ex: lists) in `override` replace others"""
+    return {
+        **base,
+        **{
+            k: deep_merge(base[k], v)
+            if isinstance(base.get(k), dict) and isinstance(v, dict)
+            else v
+            for k, v in override.items()
+        },
+    }
+
+
+def load_config(path: str) -> dict:
+    config: dict = load_yamlf(path, "utf8")
+    # `include` is relative to `path`, not to the merged config file
+    if "addons" in config:
+        config["addons"] = apply_include_addons(config["addons"], path)
+    return config
+
+
+def write_inputs(dir: str, args: Args, hosts: Tuple[str, str]) -> Tuple[str, str, str]:
+    """
+    `jumeaux run` replaces top-level keys by ones of later configs (ex: `output` without
+    `response_dir`), so configs in args are merged into the generated one here.
+
+    :return: (requests file, config file, response dir)
+    """
+    requests_file = os.path.join(dir, "requests")
+    with open(requests_file, "w", encoding="utf8") as f:
+        f.writelines(f"/bench/{i}?q=jumeaux\n" for i in range(args.requests))
+
+    generated: dict = {
+        "one": {"name": "one", "host": hosts[0]},
+        "other": {"name": "other", "host": hosts[1]},
+        "output": {"response_dir": os.path.join(dir, "responses")},
+        "addons": {
+            "log2reqs": {"name": "plain"},
+            "res2dict": [{"name": "json"}],
+            # Results are read from report.json
+            "final": [{"name": "json"}],
+        },
+    }
+    config: dict = args.config.map(load_config).reduce(deep_merge, generated)
+
+    config_file = os.path.join(dir, "config.yml")
+    with open(config_file, "w", encoding="utf8") as f:
+        # JSON is also YAML
+        json.dump(config, f)
+    return requests_file, config_file, config["output"]["response_dir"]
+
+
+def run_jumeaux(
+    dir: str, requests_file: str, config_file: str, response_dir: str, threads: int, processes: int
+) -> Result:
+    concurrency = [f"--processes={processes}"] if processes else [f"--threads={threads}"]
+    log_file = os.path.join(dir, "jumeaux.log")
+    begin = time.perf_counter()
+    with open(log_file, "w", encoding="utf8") as log:
+        p = subprocess.Popen(
+            [
+                sys.executable,
+                os.path.join(PROJECT_ROOT, "jumeaux", "main.py"),
+                "run",
+                requests_file,
+                f"--config={config_file}",
+                *concurrency,
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=log,
+        )
+        # Resource usage of `jumeaux run` and worker processes which it waited for
+        _, status, rusage = os.wait4(p.pid, 0)
+    elapsed_sec = time.perf_counter() - begin
+    end = now()
+    p.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+    if p.returncode != 0:
+        with open(log_file, encoding="utf8") as log:
+            sys.exit(f"{log.read()}\njumeaux run failed with exit code {p.returncode}")
+
+    report: Report = Report.from_jsonf(os.path.join(response_dir, "latest", "report.json"))
+    trials = len(report.trials)
+    first_request_time = min(datetime.fromisoformat(t.request_time) for t in report.trials)
+    run_sec = (end - first_request_time).total_seconds()
+    return Result.from_dict(
+        {
+            "threads": 1 if processes else threads,
+            "processes": processes or 1,
+            "trials": trials,
+            "elapsed_sec": round(elapsed_sec, 3),
+            "run_sec": round(run_sec, 3),
+            "trials_per_sec": round(trials / run_sec, 2),
+            "cpu_sec": round(rusage.ru_utime + rusage.ru_stime, 3),
+            # KiB in Linux
+            "peak_rss_mb": round(rusage.ru_maxrss / 1024, 1),
+            "status": report.summary.status,
+            "one_mean_sec": round(
+                sum(t.one.response_sec.get_or(0) for t in report.trials) / max(trials, 1), 3
+            ),
+            "other_mean_sec": round(
+                sum(t.other.response_sec.get_or(0) for t in report.trials) / max(trials, 1), 3
+            ),
+            "stages": report.summary.timings.map(lambda x: x.stages).get_or(TDict()),
+            "addons": report.summary.timings.map(lambda x: x.addons).get_or(TDict()),
+        }
+    )
+
+
+def print_timings(title: str, timings: TDict[TimingStats]):
+    for k, v in sorted(timings.items(), key=lambda x: -x[1].mean * x[1].count):
+        print(
+            f"    {title:<7}{k:<32} mean {v.mean * 1000:>8.2f}ms  p95 {v.p95 * 1000:>8.2f}ms",
+            file=sys.stderr,
+        )
+
+
+def to_numbers(value: str) -> List[int]:
+    return [int(x) for x in value.split(",") if x.strip()]
+
+
+def main():
+    args: Args = Args.from_dict(
+        {k.lstrip("-").replace("-", "_"): v for k, v in docopt(__doc__).items()},
+        force_cast=True,
+        restrict=False,
+    )
+    matrix: List[Tuple[int, int]] = [(t, 0) for t in to_numbers(args.threads)] + [
+        (1, p) for p in to_numbers(args.processes)
+    ]
+
+    results: List[Result] = []
+    with serve(args) as hosts, tempfile.TemporaryDirectory() as dir:
+        requests_file, config_file, response_dir = write_inputs(dir, args, hosts)
+        for threads, processes in matrix:
+            r = run_jumeaux(dir, requests_file, config_file, response_dir, threads, processes)
+            results.append(r)
+            print(
+                f"threads={r.threads:<3} processes={r.processes:<3} "
+                f"{r.trials_per_sec:>8.2f} trials/sec  {r.run_sec:>7.2f}s / {r.elapsed_sec:>7.2f}s  "
+                f"cpu {r.cpu_sec:>7.2f}s ({r.cpu_sec / r.elapsed_sec:>4.0%})  "
+                f"rss {r.peak_rss_mb:>7.1f}MB  {r.status.to_dict()}",
+                file=sys.stderr,
+            )
+            print_timings("stage", r.stages)
+            print_timings("addon", r.addons)
+
+    if args.output.any():
+        with open(args.output.get(), "w", encoding="utf8") as f:
+            json.dump(
+                {
+                    "version": __version__,
+                    "created_at": now().isoformat(),
+                    "args": args.to_dict(),
+                    "results": [r.to_dict() for r in results],
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+# -*- coding:utf-8 -*-
+
+"""Micro benchmarks for each stage of a trial
+
+Run offline with synthetic payloads (see `benchmarks/payloads.py`).
+Results can be saved as JSON and compared with ones of another release.
+
+Usage:
+  main.py [--filter <regexp>] [--repeat <repeat>] [--output <file>]
+          [--compare <file>] [--threshold <ratio>]
+  main.py --list
+  main.py --help
+
+Options:
+  --filter <regexp>    Run only benchmarks whose names match <regexp>
+  --repeat <repeat>    Number of measurements for each benchmark [default: 5]
+  --output <file>      Save results as JSON
+  --compare <file>     Compare with results saved by --output
+  --threshold <ratio>  Exit with 1 if a benchmark is <ratio> times slower than --compare [default: 1.2]
+  --list               Show names of benchmarks
+"""
+
+import json
+import platform
+import re
+import statistics
+import sys
+import timeit
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+from docopt import docopt
+from owlmixin import OwlMixin, TDict, TList, TOption
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# noinspection PyUnresolvedReferences
+import jumeaux.addons  # XXX: Workaround for cyclic import
+from benchmarks import payloads
+from jumeaux import __version__, executor
+from jumeaux.addons.dump import html as dump_html, json as dump_json, xml as dump_xml
+from jumeaux.addons.judgement import ignore
+from jumeaux.addons.res2dict import (
+    block as res2dict_block,
+    html as res2dict_html,
+    json as res2dict_json,
+    xml as res2dict_xml,
+)
+from jumeaux.addons.res2res import json_sort
+from jumeaux.domain.config.vo import EncodingDetection, QueryCustomization
+from jumeaux.models import (
+    DiffKeys,
+    DumpAddOnPayload,
+    EncodingDetector,
+    JudgementAddOnPayload,
+    JudgementAddOnReference,
+    Request,
+    Res2DictAddOnPayload,
+    Res2ResAddOnPayload,
+    Response,
+)
+from jumeaux.utils import now, when_filter
+
+# A function which prepares data and returns a function to measure
+Setup = Callable[[], Callable[[], Any]]
+
+BENCHMARKS: List[Tuple[str, Setup]] = []
+
+KINDS: Dict[str, List[str]] = {
+    "json": ["small", "large", "deep"],
+    "xml": ["small", "large"],
+    "html": ["small", "large"],
+    "block": ["small", "large"],
+}
+DIFF_RATIO = 0.1
+
+
+class Args(OwlMixin):
+    filter: TOption[str]
+    repeat: int
+    output: TOption[str]
+    compare: TOption[str]
+    threshold: float
+    list: bool
+
+
+class Result(OwlMixin):
+    # Number of calls in a measurement
+    number: int
+    repeat: int
+    # Seconds per call
+    best_sec: float
+    median_sec: float
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS.append((name, setup))
+        return setup
+
+    return register
+
+
+def to_requests_response(type: str, kind: str, diff_ratio: float = 0) -> requests.Response:
+    """Same as a response which `requests` returns"""
+    r = requests.Response()
+    r._content = payloads.payload(type, kind, diff_ratio)
+    r.status_code = 200
+    r.headers = CaseInsensitiveDict({"content-type": payloads.CONTENT_TYPES[type]})
+    r.encoding = get_encoding_from_headers(r.headers)
+    r.url = f"http://localhost/api/{type}/{kind}"
+    r.elapsed = timedelta(milliseconds=100)
+    return r
+
+
+def to_response(type: str, kind: str, diff_ratio: float = 0) -> Response:
+    return Response.from_requests(to_requests_response(type, kind, diff_ratio))
+
+
+def fresh(res: Response) -> Response:
+    """Not to reuse `Response.text` memoized by a previous call"""
+    return res.copy_with(body=res.body)
+
+
+def to_dict(res: Response) -> TOption[Any]:
+    return (
+        res2dict_json.Executor({})
+        .exec(Res2DictAddOnPayload.from_dict({"response": res, "result": None}))
+        .result
+    )
+
+
+# --------
+# Benchmarks
+# --------
+
+
+def register_from_requests(type: str, kind: str):
+    @benchmark(f"response/from_requests/{type}-{kind}")
+    def setup():
+        res = to_requests_response(type, kind)
+        # Not cached to measure detection itself
+        detector = EncodingDetector.from_config(EncodingDetection.from_dict({"cache": False}))
+        return lambda: Response.from_requests(res, TOption(None), detector)
+
+
+RES2DICT_EXECUTORS: Dict[str, Callable[[], Any]] = {
+    "json": lambda: res2dict_json.Executor({}),
+    "xml": lambda: res2dict_xml.Executor({}),
+    "html": lambda: res2dict_html.Executor({}),
+    "block": lambda: res2dict_block.Executor(
+        {
+            "header_regexp": payloads.BLOCK_HEADER_REGEXP,
+            "record_regexp": payloads.BLOCK_RECORD_REGEXP,
+        }
+    ),
+}
+
+
+def register_res2dict(type: str, kind: str):
+    @benchmark(f"res2dict/{type}/{kind}")
+    def setup():
+        addon = RES2DICT_EXECUTORS[type]()
+        res = to_response(type, kind)
+        return lambda: addon.exec(
+            Res2DictAddOnPayload.from_dict({"response": fresh(res), "result": None})
+        )
+
+
+def register_json_sort(kind: str):
+    @benchmark(f"res2res/json_sort/{kind}")
+    def setup():
+        addon = json_sort.Executor(
+            {
+                "items": [
+                    {
+                        "when": "True",
+                        "targets": [
+                            {"path": "root<'items'>", "sort_keys": ["name"]},
+                            {"path": "root<'items'><[0-9]+><'tags'>"},
+                        ],
+                    }
+                ]
+            }
+        )
+        res = to_response("json", kind)
+        req = Request.from_dict({"path": "/api/json"})
+        return lambda: addon.exec(
+            Res2ResAddOnPayload.from_dict({"response": fresh(res), "req": req, "tags": []})
+        )
+
+
+def register_diff(kind: str):
+    @benchmark(f"diff/json/{kind}")
+    def setup():
+        res_one = to_response("json", kind)
+        res_other = to_response("json", kind, DIFF_RATIO)
+        dict_one, dict_other = to_dict(res_one), to_dict(res_other)
+        return lambda: executor.diagnose_diffs(res_one, res_other, dict_one, dict_other)
+
+
+def register_ignore(rules: int):
+    @benchmark(f"judgement/ignore/{rules}-rules")
+    def setup():
+        addon = ignore.Executor(
+            {
+                "ignores": [
+                    {
+                        "title": f"rule{i}",
+                        "conditions": [
+                            {
+                                "when": "req.path|reg('/api/.+')",
+                                "changed": [{"path": f"root<'items'><{i}><'name'>"}],
+                            },
+                            {
+                                "changed": [
+                                    {
+                                        "path": f"root<'items'><{i + rules}><'name'>",
+                                        "when": "one != other",
+                                    }
+                                ]
+                            },
+                        ],
+                    }
+                    for i in range(rules)
+                ]
+            }
+        )
+        res_one = to_response("json", "large")
+        res_other = to_response("json", "large", DIFF_RATIO)
+        dict_one, dict_other = to_dict(res_one), to_dict(res_other)
+        diffs: Optional[TDict[DiffKeys]] = executor.diagnose_diffs(
+            res_one, res_other, dict_one, dict_other
+        )
+        reference = JudgementAddOnReference.from_dict(
+            {
+                "name": "name",
+                "path": "/api/json",
+                "qs": {},
+                "headers": {},
+                "res_one": res_one,
+                "res_other": res_other,
+                "dict_one": dict_one,
+                "dict_other": dict_other,
+            }
+        )
+        return lambda: addon.exec(
+            JudgementAddOnPayload.from_dict(
+                {
+                    "diffs_by_cognition": diffs,
+                    "regard_as_same_body": False,
+                    "regard_as_same_header": True,
+                }
+            ),
+            reference,
+        )
+
+
+@benchmark("when_filter/simple")
+def setup_when_filter_simple():
+    data = {"status": "different", "req": {"path": "/api/json"}}
+    return lambda: when_filter("status == 'different'", data)
+
+
+@benchmark("when_filter/complex")
+def setup_when_filter_complex():
+    data = {
+        "status": "different",
+        "req": {"name": "name", "path": "/api/json", "qs": {"q": ["1"]}},
+        "res_one": to_response("json", "small"),
+        "res_other": to_response("json", "small", DIFF_RATIO),
+    }
+    return lambda: when_filter(
+        "req.path|reg('/api/.+') and 'q' in req.qs and res_one.status_code == res_other.status_code"
+        " and res_one.byte < 100000",
+        data,
+    )
+
+
+@benchmark("create_query_string/plain")
+def setup_create_query_string_plain():
+    qs = TDict({f"key{i}": TList([f"value{i}", "日本語"]) for i in range(10)})
+    return lambda: executor.create_query_string(qs, TOption(None), "utf-8")
+
+
+@benchmark("create_query_string/customized")
+def setup_create_query_string_customized():
+    qs = TDict({f"key{i}": TList([f"value{i}", "日本語"]) for i in range(10)})
+    customization = TOption(
+        QueryCustomization.from_dict(
+            {
+                "overwrite": {"key0": ["overwritten"], "KEY1/i": ["case-insensitive"]},
+                "remove": ["key2", "KEY3/i"],
+            }
+        )
+    )
+    return lambda: executor.create_query_string(qs, customization, "utf-8")
+
+
+DUMP_EXECUTORS: Dict[str, Callable[[], Any]] = {
+    "json": lambda: dump_json.Executor({}),
+    "xml": lambda: dump_xml.Executor({}),
+    "html": lambda: dump_html.Executor({}),
+}
+
+
+def register_dump(type: str, kind: str):
+    @benchmark(f"dump/{type}/{kind}")
+    def setup():
+        addon = DUMP_EXECUTORS[type]()
+        res = to_response(type, kind)
+        return lambda: addon.exec(
+            DumpAddOnPayload.from_dict(
+                {"response": res, "body": res.body, "encoding": res.encoding}
+            )
+        )
+
+
+for _type, _kinds in KINDS.items():
+    for _kind in _kinds:
+        register_from_requests(_type, _kind)
+for _type, _kinds in KINDS.items():
+    for _kind in _kinds:
+        register_res2dict(_type, _kind)
+for _kind in KINDS["json"]:
+    register_json_sort(_kind)
+for _kind in KINDS["json"]:
+    register_diff(_kind)
+for _rules in [10, 200]:
+    register_ignore(_rules)
+for _type in DUMP_EXECUTORS:
+    for _kind in KINDS[_type]:
+        register_dump(_type, _kind)
+
+
+# --------
+# Runner
+# --------
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Result:
+    timer = timeit.Timer(func)
+    # Calls in a measurement so that it takes at least 0.2 seconds
+    number, _ = timer.autorange()
+    times: List[float] = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return Result.from_dict(
+        {
+            "number": number,
+            "repeat": repeat,
+            "best_sec": min(times),
+            "median_sec": statistics.median(times),
+        }
+    )
+
+
+def to_readable(sec: float) -> str:
+    if sec < 0.001:
+        return f"{sec * 1000000:.1f}µs"
+    if sec < 1:
+        return f"{sec * 1000:.2f}ms"
+    return f"{sec:.2f}s"
+
+
+def run(args: Args) -> Dict[str, Result]:
+    pattern = args.filter.map(re.compile).get()
+    results: Dict[str, Result] = {}
+    for name, setup in BENCHMARKS:
+        if pattern and not pattern.search(name):
+            continue
+        r = measure(setup(), args.repeat)
+        results[name] = r
+        print(
+            f"{name:<45} best {to_readable(r.best_sec):>10}  median {to_readable(r.median_sec):>10}"
+            f"  ({r.repeat} x {r.number} calls)",
+            file=sys.stderr,
+        )
+    return results
+
+
+def compare(results: Dict[str, Result], baseline_path: str, threshold: float) -> bool:
+    """
+    :return: True if no benchmark is slower than `threshold`
+    """
+    with open(baseline_path, encoding="utf8") as f:
+        baseline: dict = json.load(f)
+
+    print(f"\nCompared with {baseline_path} (version {baseline['version']})", file=sys.stderr)
+    ok = True
+    for name, r in results.items():
+        if name not in baseline["results"]:
+            continue
+        ratio = r.best_sec / baseline["results"][name]["best_sec"]
+        slower = ratio > threshold
+        ok = ok and not slower
+        print(f"{'💢' if slower else '  '} {name:<45} x{ratio:.2f}", file=sys.stderr)
+    return ok
+
+
+def main():
+    args: Args = Args.from_dict(
+        {k.lstrip("-").replace("-", "_"): v for k, v in docopt(__doc__).items()},
+        force_cast=True,
+        restrict=False,
+    )
+
+    if args.list:
+        for name, _ in BENCHMARKS:
+            print(name)
+        return
+
+    results: Dict[str, Result] = run(args)
+
+    if args.output.any():
+        with open(args.output.get(), "w", encoding="utf8") as f:
+            json.dump(
+                {
+                    "version": __version__,
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "created_at": now().isoformat(),
+                    "results": {k: v.to_dict() for k, v in results.items()},
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+    if args.compare.any() and not compare(results, args.compare.get(), args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# -*- coding:utf-8 -*-
+
+"""Synthetic payloads for benchmarks
+
+All generators are deterministic so that results can be compared between releases.
+`diff_ratio` is the ratio of values which are changed from the payload generated with `diff_ratio=0`.
+"""
+
+import json
+from typing import Any, Dict, List
+
+SIZES: Dict[str, int] = {"small": 10, "large": 2000}
+DEEP_DEPTH = 30
+
+BLOCK_HEADER_REGEXP = r"^\[(.+)\]$"
+BLOCK_RECORD_REGEXP = r"^([^=]+)=(.*)$"
+
+
+def _value(i: int, diff_ratio: float) -> str:
+    # Every (1 / diff_ratio)th value is changed
+    changed = diff_ratio > 0 and i % max(1, round(1 / diff_ratio)) == 0
+    return f"changed-{i}" if changed else f"value-{i}"
+
+
+def create_items(size: int, diff_ratio: float = 0) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": i,
+            "name": _value(i, diff_ratio),
+            "price": i * 100,
+            "tags": [f"tag{j}" for j in range(i % 5)],
+            "detail": {"description": "日本語の説明 " * 3, "available": i % 2 == 0},
+        }
+        for i in range(size)
+    ]
+
+
+def create_deep(depth: int = DEEP_DEPTH, diff_ratio: float = 0) -> Dict[str, Any]:
+    root: Dict[str, Any] = {}
+    node = root
+    for i in range(depth):
+        node["name"] = _value(i, diff_ratio)
+        node["siblings"] = [{"id": j} for j in range(3)]
+        node["child"] = {}
+        node = node["child"]
+    return root
+
+
+def json_payload(kind: str, diff_ratio: float = 0) -> bytes:
+    """
+    :param kind: small, large or deep
+    """
+    value: Any = (
+        create_deep(diff_ratio=diff_ratio)
+        if kind == "deep"
+        else {"items": create_items(SIZES[kind], diff_ratio)}
+    )
+    return json.dumps(value, ensure_ascii=False).encode("utf8")
+
+
+def json_payload_by_size(size: int, diff_ratio: float = 0) -> bytes:
+    """JSON of about `size` bytes"""
+    item_size = len(json.dumps(create_items(1)[0], ensure_ascii=False).encode("utf8"))
+    return json.dumps(
+        {"items": create_items(max(1, size // item_size), diff_ratio)}, ensure_ascii=False
+    ).encode("utf8")
+
+
+def xml_payload(kind: str, diff_ratio: float = 0) -> bytes:
+    items = "".join(
+        f'<item id="{x["id"]}"><name>{x["name"]}</name><price>{x["price"]}</price>'
+        f'<description>{x["detail"]["description"]}</description></item>'
+        for x in create_items(SIZES[kind], diff_ratio)
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><items>{items}</items>'.encode("utf8")
+
+
+def html_payload(kind: str, diff_ratio: float = 0) -> bytes:
+    rows = "".join(
+        f'<tr id="item-{x["id"]}"><td class="name">{x["name"]}</td><td>{x["price"]}</td>'
+        f'<td>{x["detail"]["description"]}</td></tr>'
+        for x in create_items(SIZES[kind], diff_ratio)
+    )
+    return (
+        '<!DOCTYPE html><html><head><meta charset="UTF-8"><title>Items</title></head>'
+        f'<body><div id="main"><table>{rows}</table></div></body></html>'
+    ).encode("utf8")
+
+
+def block_payload(kind: str, diff_ratio: float = 0) -> bytes:
+    """Text parsed by `res2dict/block` with `BLOCK_HEADER_REGEXP` and `BLOCK_RECORD_REGEXP`"""
+    return "\n".join(
+        f'[item{x["id"]}]\nname={x["name"]}\nprice={x["price"]}\n'
+        for x in create_items(SIZES[kind], diff_ratio)
+    ).encode("utf8")
+
+
+PAYLOADS = {
+    "json": json_payload,
+    "xml": xml_payload,
+    "html": html_payload,
+    "block": block_payload,
+}
+
+CONTENT_TYPES: Dict[str, str] = {
+    "json": "application/json; charset=utf-8",
+    "xml": "text/xml",
+    "html": "text/html",
+    "block": "text/plain",
+}
+
+
+def payload(type: str, kind: str, diff_ratio: float = 0) -> bytes:
+    """
+    :param type: json, xml, html or block
+    :param kind: small or large (or deep only for json)
+    """
+    return PAYLOADS[type](kind, diff_ratio)
@@ -1,12 +1,18 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import itertools
+import os
+import time
+from concurrent import futures
 from importlib import import_module
 from importlib.util import find_spec
-from owlmixin import TList
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+from owlmixin import TList, TOption
 
 from jumeaux.addons.models import Addon, Addons
-from jumeaux.domain.config.vo import Config
+from jumeaux.domain.config.vo import Config, Reqs2ReqsParallel
 from jumeaux.models import (
     Request,
     Log2ReqsAddOnPayload,
@@ -23,6 +29,15 @@ from jumeaux.models import (
     FinalAddOnPayload,
     FinalAddOnReference,
 )
+from jumeaux.addons import final
+from jumeaux import timing
+from jumeaux.utils import chunked, map_in_order
+
+T = TypeVar("T")
+
+# Set in each process by `init_reqs2reqs_worker`
+worker_reqs2reqs: TList = TList()
+worker_config: Optional[Config] = None
 
 
 def create_addon(a: Addon, layer: str):
@@ -47,9 +62,51 @@ Please check either if << {relative_name} >> or << {a.name} >> are exist.
     )
 
 
+def init_reqs2reqs_worker(addons: TList[Addon], config: Config):
+    global worker_reqs2reqs, worker_config
+    worker_reqs2reqs = addons.map(lambda x: create_addon(x, "reqs2reqs"))
+    worker_config = config
+
+
+def apply_reqs2reqs_to_chunk(requests: List[Request]) -> List[Request]:
+    return list(worker_reqs2reqs.reduce(lambda rs, a: a.stream(rs, worker_config), iter(requests)))
+
+
+def stream_in_processes(
+    addons: TList[Addon], requests: Iterable[Request], config: Config, parallel: Reqs2ReqsParallel
+) -> Iterator[Request]:
+    """Apply parallelizable reqs2reqs add-ons to chunks of requests in processes keeping the order"""
+    processes: int = parallel.processes.get_or(os.cpu_count() or 1)
+    with futures.ProcessPoolExecutor(
+        max_workers=processes, initializer=init_reqs2reqs_worker, initargs=(addons, config)
+    ) as ex:
+        for chunk in map_in_order(
+            ex, apply_reqs2reqs_to_chunk, chunked(requests, parallel.chunk_size), processes * 2
+        ):
+            yield from chunk
+
+
+def reduce_with_timings(
+    addons: TList,
+    names: List[str],
+    apply: Callable[[T, Any], T],
+    payload: T,
+    timings: Optional[Dict[str, float]],
+) -> T:
+    """Same as `addons.reduce(apply, payload)` but add seconds of each add-on to `timings`"""
+    if timings is None:
+        return addons.reduce(apply, payload)
+    for name, a in zip(names, addons):
+        begin = time.perf_counter()
+        payload = apply(payload, a)
+        timing.add(timings, name, begin)
+    return payload
+
+
 class AddOnExecutor:
     def __init__(self, addons: Addons) -> None:
         self.log2reqs = create_addon(addons.log2reqs, "log2reqs")
+        self.reqs2reqs_addons: TList[Addon] = addons.reqs2reqs if addons else TList()
         self.reqs2reqs = (
             addons.reqs2reqs.map(lambda x: create_addon(x, "reqs2reqs")) if addons else TList()
         )
@@ -74,40 +131,123 @@ class AddOnExecutor:
             else TList()
         )
         self.final = addons.final.map(lambda x: create_addon(x, "final")) if addons else TList()
+        # Keys of timings (ex: res2dict/json)
+        self.names: Dict[str, List[str]] = {
+            layer: [f"{layer}/{x.name}" for x in getattr(addons, layer)] if addons else []
+            for layer in [
+                "res2res",
+                "res2dict",
+                "judgement",
+                "store_criterion",
+                "dump",
+                "did_challenge",
+            ]
+        }
 
     def apply_log2reqs(self, payload: Log2ReqsAddOnPayload) -> TList[Request]:
         return self.log2reqs.exec(payload)
 
+    def stream_log2reqs(self, payload: Log2ReqsAddOnPayload) -> Iterator[Request]:
+        return self.log2reqs.stream(payload)
+
     def apply_reqs2reqs(
         self, payload: Reqs2ReqsAddOnPayload, config: Config
     ) -> Reqs2ReqsAddOnPayload:
         return self.reqs2reqs.reduce(lambda p, a: a.exec(p, config), payload)
 
-    def apply_res2res(self, payload: Res2ResAddOnPayload) -> Res2ResAddOnPayload:
-        return self.res2res.reduce(lambda p, a: a.exec(p), payload)
+    def stream_reqs2reqs(self, requests: Iterable[Request], config: Config) -> Iterable[Request]:
+        """Apply reqs2reqs add-ons lazily as far as possible
+
+        Streaming add-ons transform requests when they are consumed.
+        Others read all requests when this is called, and return a list.
+        Consecutive parallelizable add-ons run in processes if `reqs2reqs_parallel` is specified.
+        """
+        parallel: TOption[Reqs2ReqsParallel] = (
+            config.reqs2reqs_parallel if config else TOption(None)
+        )
+        for in_processes, pairs in itertools.groupby(
+            zip(self.reqs2reqs_addons, self.reqs2reqs),
+            key=lambda x: parallel.any() and x[1].parallelizable,
+        ):
+            if in_processes:
+                requests = stream_in_processes(
+                    TList(x[0] for x in pairs), requests, config, parallel.get()
+                )
+                continue
+            for _, a in pairs:
+                requests = (
+                    a.stream(iter(requests), config)
+                    if a.streaming
+                    else a.exec(
+                        Reqs2ReqsAddOnPayload.from_dict({"requests": TList(requests)}), config
+                    ).requests
+                )
+        return requests
+
+    def apply_res2res(
+        self, payload: Res2ResAddOnPayload, timings: Optional[Dict[str, float]] = None
+    ) -> Res2ResAddOnPayload:
+        return reduce_with_timings(
+            self.res2res, self.names["res2res"], lambda p, a: a.exec(p), payload, timings
+        )
 
-    def apply_res2dict(self, payload: Res2DictAddOnPayload) -> Res2DictAddOnPayload:
-        return self.res2dict.reduce(lambda p, a: a.exec(p), payload)
+    def apply_res2dict(
+        self, payload: Res2DictAddOnPayload, timings: Optional[Dict[str, float]] = None
+    ) -> Res2DictAddOnPayload:
+        return reduce_with_timings(
+            self.res2dict, self.names["res2dict"], lambda p, a: a.exec(p), payload, timings
+        )
 
     def apply_judgement(
-        self, payload: JudgementAddOnPayload, reference: JudgementAddOnReference
+        self,
+        payload: JudgementAddOnPayload,
+        reference: JudgementAddOnReference,
+        timings: Optional[Dict[str, float]] = None,
     ) -> JudgementAddOnPayload:
-        return self.judgement.reduce(lambda p, a: a.exec(p, reference), payload)
+        return reduce_with_timings(
+            self.judgement,
+            self.names["judgement"],
+            lambda p, a: a.exec(p, reference),
+            payload,
+            timings,
+        )
 
     def apply_store_criterion(
-        self, payload: StoreCriterionAddOnPayload, reference: StoreCriterionAddOnReference
+        self,
+        payload: StoreCriterionAddOnPayload,
+        reference: StoreCriterionAddOnReference,
+        timings: Optional[Dict[str, float]] = None,
     ) -> StoreCriterionAddOnPayload:
-        return self.store_criterion.reduce(lambda p, a: a.exec(p, reference), payload)
+        return reduce_with_timings(
+            self.store_criterion,
+            self.names["store_criterion"],
+            lambda p, a: a.exec(p, reference),
+            payload,
+            timings,
+        )
 
-    def apply_dump(self, payload: DumpAddOnPayload) -> DumpAddOnPayload:
-        return self.dump.reduce(lambda p, a: a.exec(p), payload)
+    def apply_dump(
+        self, payload: DumpAddOnPayload, timings: Optional[Dict[str, float]] = None
+    ) -> DumpAddOnPayload:
+        return reduce_with_timings(
+            self.dump, self.names["dump"], lambda p, a: a.exec(p), payload, timings
+        )
 
     def apply_did_challenge(
-        self, payload: DidChallengeAddOnPayload, reference: DidChallengeAddOnReference
+        self,
+        payload: DidChallengeAddOnPayload,
+        reference: DidChallengeAddOnReference,
+        timings: Optional[Dict[str, float]] = None,
     ) -> DidChallengeAddOnPayload:
-        return self.did_challenge.reduce(lambda p, a: a.exec(p, reference), payload)
+        return reduce_with_timings(
+            self.did_challenge,
+            self.names["did_challenge"],
+            lambda p, a: a.exec(p, reference),
+            payload,
+            timings,
+        )
 
     def apply_final(
         self, payload: FinalAddOnPayload, reference: FinalAddOnReference
     ) -> FinalAddOnPayload:
-        return self.final.reduce(lambda p, a: a.exec(p, reference), payload)
+        return final.exec_addons(self.final, payload, reference)
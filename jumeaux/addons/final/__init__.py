@@ -1,7 +1,98 @@
 # -*- coding:utf-8 -*-
+import time
+from concurrent import futures
+from typing import List, Dict
+
+from owlmixin import TList
+
+from jumeaux.logger import Logger
 from jumeaux.models import FinalAddOnPayload, FinalAddOnReference
 
+logger: Logger = Logger(__name__)
+LOG_PREFIX = "[final]"
+
+# `requires` which means all preceding add-ons
+ALL = "*"
+
 
 class FinalExecutor:
+    """
+    `concurrent` add-ons run in parallel with other `concurrent` add-ons
+    after add-ons which provide files they require or the same files as them.
+    They must not change a payload because their results are ignored.
+    Others run alone in order with a payload returned by the previous one. (as before)
+    """
+
+    concurrent: bool = False
+    # Files which the add-on creates (ex: `report.json`)
+    provides: List[str] = []
+    # Files which the add-on needs. `*` means all preceding add-ons (not only which provide files)
+    requires: List[str] = []
+
     def exec(self, payload: FinalAddOnPayload, reference: FinalAddOnReference) -> FinalAddOnPayload:
         raise NotImplementedError()
+
+
+def to_name(addon: FinalExecutor) -> str:
+    return addon.__class__.__module__.replace("jumeaux.addons.final.", "")
+
+
+def find_dependencies(addons: TList[FinalExecutor], index: int) -> List[int]:
+    """
+    :return: Indexes of preceding add-ons which `addons[index]` has to wait for
+    """
+    addon: FinalExecutor = addons[index]
+    if ALL in addon.requires:
+        return list(range(index))
+
+    # Add-ons which write the same files must not run at the same time
+    files = set(addon.requires) | set(addon.provides)
+    return [i for i, a in enumerate(addons[:index]) if not a.concurrent or set(a.provides) & files]
+
+
+def exec_addon(
+    addon: FinalExecutor, payload: FinalAddOnPayload, reference: FinalAddOnReference
+) -> FinalAddOnPayload:
+    start = time.perf_counter()
+    try:
+        return addon.exec(payload, reference)
+    finally:
+        logger.info_lv1(
+            f"{LOG_PREFIX} {to_name(addon)} finished in {time.perf_counter() - start:.2f} sec"
+        )
+
+
+def exec_addons(
+    addons: TList[FinalExecutor], payload: FinalAddOnPayload, reference: FinalAddOnReference
+) -> FinalAddOnPayload:
+    """Execute final add-ons concurrently as far as their dependencies allow"""
+    if not addons.any(lambda x: x.concurrent):
+        return addons.reduce(lambda p, a: exec_addon(a, p, reference), payload)
+
+    def run(addon: FinalExecutor, waits: List[futures.Future], p: FinalAddOnPayload):
+        for f in waits:
+            # Raise if a dependency failed
+            f.result()
+        return exec_addon(addon, p, reference)
+
+    fs: Dict[int, futures.Future] = {}
+    # Each add-on has its own thread so that waiting for dependencies never blocks others
+    with futures.ThreadPoolExecutor(max_workers=len(addons)) as ex:
+        for i, addon in enumerate(addons):
+            if addon.concurrent:
+                fs[i] = ex.submit(
+                    run, addon, [fs[d] for d in find_dependencies(addons, i)], payload
+                )
+                continue
+
+            # Wait for all preceding add-ons because this may depend on anything
+            futures.wait(list(fs.values()))
+            payload = run(addon, [fs[x] for x in sorted(fs)], payload)
+            fs[i] = futures.Future()
+            fs[i].set_result(payload)
+
+        # Raise the first error in the configured order
+        for i in sorted(fs):
+            fs[i].result()
+
+    return payload
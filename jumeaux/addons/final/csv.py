@@ -1,11 +1,13 @@
 # -*- coding:utf-8 -*-
 
-import logging
+import csv
+import gzip as gz
 
-from owlmixin import OwlMixin, TList
+from owlmixin import OwlMixin, TList, TDict
+from owlmixin.util import dump_json, get_dialect_name
 
 from jumeaux.addons.final import FinalExecutor
-from jumeaux.models import FinalAddOnPayload, FinalAddOnReference
+from jumeaux.models import FinalAddOnPayload, FinalAddOnReference, Trial
 from jumeaux.logger import Logger
 
 logger: Logger = Logger(__name__)
@@ -15,40 +17,63 @@ class Config(OwlMixin):
     column_names: TList[str]
     output_path: str
     with_header: bool = False
+    gzip: bool = False
+
+
+def to_record(x: Trial) -> dict:
+    return {
+        "seq": x.seq,
+        "name": x.name,
+        "method": x.method,
+        "path": x.path,
+        "headers": x.headers.to_json(),
+        "queries": x.queries.to_json(),
+        "request_time": x.request_time,
+        "status": x.status,
+        "one.url": x.one.url,
+        "one.status": x.one.status_code,
+        "one.byte": x.one.byte,
+        "one.response_sec": x.one.response_sec,
+        "one.content_type": x.one.content_type,
+        "one.encoding": x.one.encoding,
+        "other.url": x.other.url,
+        "other.status": x.other.status_code,
+        "other.byte": x.other.byte,
+        "other.response_sec": x.other.response_sec,
+        "other.content_type": x.other.content_type,
+        "other.encoding": x.other.encoding,
+    }
+
+
+def force_str(v):
+    # Same as owlmixin's `to_csvf`
+    return dump_json(v).replace('"', "'") if isinstance(v, (dict, list)) else v
 
 
 class Executor(FinalExecutor):
     def __init__(self, config: dict):
         self.config: Config = Config.from_dict(config or {})
+        self.concurrent = True
+        self.provides = [self.config.output_path]
 
     def exec(self, payload: FinalAddOnPayload, reference: FinalAddOnReference) -> FinalAddOnPayload:
-        payload.report.trials.map(
-            lambda x: {
-                "seq": x.seq,
-                "name": x.name,
-                "method": x.method,
-                "path": x.path,
-                "headers": x.headers.to_json(),
-                "queries": x.queries.to_json(),
-                "request_time": x.request_time,
-                "status": x.status,
-                "one.url": x.one.url,
-                "one.status": x.one.status_code,
-                "one.byte": x.one.byte,
-                "one.response_sec": x.one.response_sec,
-                "one.content_type": x.one.content_type,
-                "one.encoding": x.one.encoding,
-                "other.url": x.other.url,
-                "other.status": x.other.status_code,
-                "other.byte": x.other.byte,
-                "other.response_sec": x.other.response_sec,
-                "other.content_type": x.other.content_type,
-                "other.encoding": x.other.encoding,
-            }
-        ).to_csvf(
-            fpath=self.config.output_path,
-            fieldnames=self.config.column_names,
-            with_header=self.config.with_header,
-        )
+        # Write trial by trial not to create all records in memory
+        with (
+            gz.open(self.config.output_path, "wt", encoding="utf8", newline="")
+            if self.config.gzip
+            else open(self.config.output_path, "w", encoding="utf8", newline="")
+        ) as f:
+            writer = csv.DictWriter(
+                f,
+                fieldnames=self.config.column_names,
+                dialect=get_dialect_name(False, False),
+                extrasaction="ignore",
+            )
+            if self.config.with_header:
+                writer.writeheader()
+            for trial in payload.report.trials:
+                writer.writerow(
+                    {k: force_str(v) for k, v in TDict(to_record(trial)).to_dict().items()}
+                )
 
         return payload
@@ -1,5 +1,8 @@
 # -*- coding:utf-8 -*-
 
+import gzip as gz
+import sys
+
 from owlmixin import OwlMixin, TOption
 
 from jumeaux.addons.final import FinalExecutor
@@ -12,19 +15,36 @@ logger: Logger = Logger(__name__)
 class Config(OwlMixin):
     sysout: bool = False
     indent: TOption[int]
+    gzip: bool = False
 
 
 class Executor(FinalExecutor):
     def __init__(self, config: dict):
         self.config: Config = Config.from_dict(config or {})
+        # Outputs to stdout must not be mixed with others
+        self.concurrent = not self.config.sysout
+        self.provides = (
+            [] if self.config.sysout else ["report.json.gz" if self.config.gzip else "report.json"]
+        )
 
     def exec(self, payload: FinalAddOnPayload, reference: FinalAddOnReference) -> FinalAddOnPayload:
+        # Write trial by trial not to serialize the whole report in memory
+        chunks = payload.report.iter_json(indent=self.config.indent.get())
         if self.config.sysout:
-            print(payload.report.to_json(indent=self.config.indent.get()))
+            sys.stdout.writelines(chunks)
+            sys.stdout.write("\n")
+        elif self.config.gzip:
+            with gz.open(
+                f"{payload.result_path}/report.json.gz",
+                "wt",
+                encoding=payload.output_summary.encoding,
+            ) as f:
+                f.writelines(chunks)
         else:
-            payload.report.to_jsonf(
+            with open(
                 f"{payload.result_path}/report.json",
+                "w",
                 encoding=payload.output_summary.encoding,
-                indent=self.config.indent.get(),
-            )
+            ) as f:
+                f.writelines(chunks)
         return payload
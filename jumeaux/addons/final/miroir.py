@@ -2,16 +2,22 @@
 
 import json
 import os
-import shutil
 import warnings
+import zipfile
+from concurrent import futures
 from decimal import Decimal
+from typing import Callable, Iterator, List, Optional
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
 from owlmixin import OwlMixin, TOption, TList, OwlEnum
 
-from jumeaux.addons.final import FinalExecutor
+from jumeaux import journal, profiler
+from jumeaux.addons.final import FinalExecutor, ALL
 from jumeaux.models import Report, OutputSummary, FinalAddOnPayload, FinalAddOnReference
 from jumeaux.logger import Logger
+from jumeaux.store import content_encoding_of
 
 logger: Logger = Logger(__name__)
 MIROIR_AA = r"""
@@ -25,6 +31,13 @@ __/\__ |  \/  (_)_ __ ___ (_)_ __  __/\__
 # See https://github.com/boto/boto3/issues/454
 warnings.filterwarnings("ignore", category=ResourceWarning, message="unclosed.*<ssl.SSLSocket.*>")
 
+RESPONSE_DIRS = ['one', 'one-props', 'other', 'other-props']
+# Internal files for resume and profiling are not results
+EXCLUDED_FILES = [journal.RUN_FILE, journal.JOURNAL_FILE,
+                  profiler.STATS_FILE, profiler.SUMMARY_FILE, profiler.MEMORY_FILE]
+EXCLUDED_DIRS = [profiler.PROCESSES_DIR]
+MB = 1024 * 1024
+
 
 class When(OwlEnum):
     NOT_EMPTY = "not_empty"
@@ -36,6 +49,13 @@ class LocalStack(OwlMixin):
     endpoint: str = 'http://localhost'
 
 
+class Upload(OwlMixin):
+    workers: int = 8
+    multipart_threshold_mb: int = 8
+    multipart_chunksize_mb: int = 8
+    max_attempts: int = 5
+
+
 class Config(OwlMixin):
     table: str
     bucket: str
@@ -46,11 +66,72 @@ class Config(OwlMixin):
     checklist: TOption[str]
     local_stack: TOption[LocalStack]
     when: TList[When] = []
+    upload: TOption[Upload]
+
+
+class Uploader:
+    """Upload files to S3 concurrently with a bounded thread pool
+
+    Large files are uploaded by multipart upload. Retries are handled by a client.
+    `s3` only has to implement `upload_file` so that a stand-in can be used in tests.
+    """
+
+    def __init__(self, s3, bucket: str, cache_max_age: int, upload: Upload) -> None:
+        self.s3 = s3
+        self.bucket = bucket
+        self.cache_max_age = cache_max_age
+        self.workers = upload.workers
+        self.transfer_config = TransferConfig(multipart_threshold=upload.multipart_threshold_mb * MB,
+                                              multipart_chunksize=upload.multipart_chunksize_mb * MB,
+                                              use_threads=False)
+
+    def upload_file(self, path: str, key: str):
+        logger.info_lv3(f'Put {path}')
+        # Compressed responses are decompressed transparently by clients
+        content_encoding = content_encoding_of(path)
+        self.s3.upload_file(path, self.bucket, key,
+                            ExtraArgs={'CacheControl': f'max-age={self.cache_max_age}',
+                                       **({'ContentEncoding': content_encoding} if content_encoding else {})},
+                            Config=self.transfer_config)
+
+    def upload_responses(self, dir: str, base_key: str, whiches: List[str],
+                         on_uploaded: Optional[Callable[[str], None]] = None):
+        """
+        :param on_uploaded: Called with a path of each uploaded file in the caller's thread
+        """
+        files = [f'{which}/{file}' for which in whiches for file in os.listdir(f'{dir}/{which}')]
+        logger.info_lv1(f"Uploading {len(files)} responses with {self.workers} workers...")
+
+        with futures.ThreadPoolExecutor(max_workers=self.workers) as ex:
+            fs = {ex.submit(self.upload_file, f'{dir}/{file}', f'{base_key}/{file}'): f'{dir}/{file}'
+                  for file in files}
+            for f in futures.as_completed(fs):
+                f.result()
+                if on_uploaded:
+                    on_uploaded(fs[f])
+
+
+def iter_other_files(dir: str) -> Iterator[str]:
+    """
+    :return: Paths relative to `dir` of files to zip except for responses and excluded ones
+    """
+    for root, _, files in os.walk(dir):
+        top = os.path.relpath(root, dir).split(os.sep)[0]
+        if top in RESPONSE_DIRS or top in EXCLUDED_DIRS:
+            continue
+        for file in files:
+            path = os.path.relpath(f'{root}/{file}', dir)
+            if path not in EXCLUDED_FILES:
+                yield path
 
 
 class Executor(FinalExecutor):
     def __init__(self, config: dict) -> None:
         self.config: Config = Config.from_dict(config or {})
+        self.concurrent = True
+        # A zip includes all files in a result directory and `report.json` written by itself
+        self.requires = [ALL] if self.config.with_zip else []
+        self.provides = ['report.json'] if self.config.with_zip else []
 
     def exec(self, payload: FinalAddOnPayload, reference: FinalAddOnReference) -> FinalAddOnPayload:
         if When.NOT_EMPTY in self.config.when and payload.report.trials.size() == 0:
@@ -108,7 +189,9 @@ class Executor(FinalExecutor):
         table.put_item(Item=item)
 
         # s3
-        s3 = boto3.client('s3', **({
+        upload: Upload = self.config.upload.get_or(Upload.from_dict({}))
+        s3 = boto3.client('s3', config=BotoConfig(retries={'max_attempts': upload.max_attempts, 'mode': 'standard'},
+                                                  max_pool_connections=max(10, upload.workers)), **({
             'aws_access_key_id': tmp_credential['Credentials']['AccessKeyId'],
             'aws_secret_access_key': tmp_credential['Credentials']['SecretAccessKey'],
             'aws_session_token': tmp_credential['Credentials']['SessionToken'],
@@ -116,18 +199,6 @@ class Executor(FinalExecutor):
         } if tmp_credential else {'endpoint_url': create_endpoint_url(4572)}))
         base_key = self.config.prefix.map(lambda x: f'{x}/results').get_or('results')
 
-        def upload_responses(which: str):
-            dir = f'{output_summary.response_dir}/{report.key}'
-
-            logger.info_lv1(f"Uploading {len(os.listdir(f'{dir}/{which}'))} {which} responses...")
-            for file in os.listdir(f'{dir}/{which}'):
-                with open(f'{dir}/{which}/{file}', 'rb') as f:
-                    logger.info_lv3(f'Put {dir}/{which}/{file}')
-                    s3.put_object(Bucket=self.config.bucket,
-                                  Key=f'{base_key}/{report.key}/{which}/{file}',
-                                  Body=f.read(),
-                                  CacheControl=f'max-age={self.config.cache_max_age}')
-
         # report
         # TODO: Immutable...
         d = report.to_dict()
@@ -139,26 +210,27 @@ class Executor(FinalExecutor):
                       Key=f'{base_key}/{report.key}/trials.json',
                       Body=report.trials.to_json())
 
-        # details
-        upload_responses("one")
-        upload_responses("one-props")
-        upload_responses("other")
-        upload_responses("other-props")
-
-        # zip (${hashkey}.zip)
-        if self.config.with_zip:
-            base_name = f'{output_summary.response_dir}/{report.key}'
-            with open(f'{base_name}/report.json', 'w', encoding=output_summary.encoding) as f:
-                f.write(report.to_pretty_json())
-            shutil.make_archive(base_name, 'zip', f'{output_summary.response_dir}/{report.key}')
-
-            zip_fullpath = f'{base_name}.zip'
-            with open(zip_fullpath, 'rb') as zipf:
-                logger.info_lv3(f'Put {zip_fullpath}')
-                s3.put_object(Bucket=self.config.bucket,
-                              Key=f'{base_key}/{report.key}/{report.key[0:7]}.zip',
-                              Body=zipf.read(),
-                              CacheControl=f'max-age={self.config.cache_max_age}')
-            os.remove(zip_fullpath)
+        dir = f'{output_summary.response_dir}/{report.key}'
+        uploader = Uploader(s3, self.config.bucket, self.config.cache_max_age, upload)
+
+        # details and zip (${hashkey}.zip)
+        if not self.config.with_zip:
+            uploader.upload_responses(dir, f'{base_key}/{report.key}', RESPONSE_DIRS)
+            return payload
+
+        zip_fullpath = f'{dir}.zip'
+        with zipfile.ZipFile(zip_fullpath, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            # Responses are zipped as soon as they are uploaded not to read them twice from the disk later
+            uploader.upload_responses(dir, f'{base_key}/{report.key}', RESPONSE_DIRS,
+                                      on_uploaded=lambda path: zipf.write(path, os.path.relpath(path, dir)))
+
+            with open(f'{dir}/report.json', 'w', encoding=output_summary.encoding) as f:
+                f.writelines(report.iter_json(indent=4))
+            for path in iter_other_files(dir):
+                zipf.write(f'{dir}/{path}', path)
+
+        logger.info_lv1(f'Uploading {zip_fullpath}...')
+        uploader.upload_file(zip_fullpath, f'{base_key}/{report.key}/{report.key[0:7]}.zip')
+        os.remove(zip_fullpath)
 
         return payload
@@ -5,7 +5,7 @@ import sys
 from owlmixin import OwlMixin, TOption
 from owlmixin.owlcollections import TList
 
-from jumeaux.addons.final import FinalExecutor
+from jumeaux.addons.final import FinalExecutor, ALL
 from jumeaux.utils import jinja2_format, get_jinja2_format_error, when_optional_filter
 from jumeaux.logger import Logger
 from jumeaux.models import FinalAddOnPayload, Notifier, FinalAddOnReference, Report
@@ -44,6 +44,10 @@ def need_to_notify(notify: Notify, report: Report) -> bool:
 
 
 class Executor(FinalExecutor):
+    concurrent = True
+    # Notify after preceding add-ons (ex: miroir, json) finished successfully
+    requires = [ALL]
+
     def __init__(self, config: dict):
         self.config: Config = Config.from_dict(config or {})
 
@@ -17,6 +17,9 @@ class Config(OwlMixin):
 class Executor(FinalExecutor):
     def __init__(self, config: dict):
         self.config: Config = Config.from_dict(config or {})
+        # Outputs to stdout must not be mixed with others
+        self.concurrent = not self.config.sysout
+        self.provides = [] if self.config.sysout else ["summary.txt"]
 
     def exec(self, payload: FinalAddOnPayload, reference: FinalAddOnReference) -> FinalAddOnPayload:
         r: Report = payload.report
@@ -13,6 +13,10 @@ VIEWER = os.path.abspath(f"{os.path.dirname(__file__)}/../../sample/viewer/index
 
 
 class Executor(FinalExecutor):
+    concurrent = True
+    provides = ["index.html"]
+    requires = ["report.json"]
+
     def __init__(self, config: dict):
         pass
 
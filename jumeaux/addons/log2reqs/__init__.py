@@ -1,9 +1,105 @@
 # -*- coding:utf-8 -*-
-from owlmixin import TList
+import bz2
+import gzip
+import io
+import lzma
+import os
+from concurrent import futures
+from typing import Callable, Iterator, List, Tuple, TextIO, TypeVar
 
+from owlmixin import OwlMixin, TList, TOption
+
+from jumeaux.logger import Logger
 from jumeaux.models import Log2ReqsAddOnPayload, Request
+from jumeaux.utils import map_in_order
+
+logger: Logger = Logger(__name__)
+LOG_PREFIX = "[log2reqs]"
+
+MB = 1024 * 1024
+
+T = TypeVar("T")
+
+# (config, file, start, end)
+ChunkArg = Tuple[dict, str, int, int]
+
+OPENERS_BY_EXTENSION = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+class Parallel(OwlMixin):
+    processes: TOption[int]
+    chunk_size_mb: int = 16
 
 
 class Log2ReqsExecutor:
     def exec(self, payload: Log2ReqsAddOnPayload) -> TList[Request]:
         raise NotImplementedError()
+
+    def stream(self, payload: Log2ReqsAddOnPayload) -> Iterator[Request]:
+        """Yield requests one by one. Override it if requests can be parsed before reading a whole file."""
+        return iter(self.exec(payload))
+
+
+def open_text(file: str, encoding: str) -> TextIO:
+    """Open a file as text. Compressed files (.gz, .bz2, .xz) are decompressed while reading"""
+    opener = OPENERS_BY_EXTENSION.get(os.path.splitext(file)[1], open)
+    return opener(file, "rt", encoding=encoding)
+
+
+def is_compressed(file: str) -> bool:
+    return os.path.splitext(file)[1] in OPENERS_BY_EXTENSION
+
+
+def parallel_for(parallel: TOption[Parallel], file: str) -> TOption[Parallel]:
+    """`parallel` unless `file` is compressed. (A compressed file can't be split into chunks)"""
+    if parallel.any() and is_compressed(file):
+        logger.warning(f"{LOG_PREFIX} `parallel` is ignored for a compressed file: {file}")
+        return TOption(None)
+    return parallel
+
+
+def find_chunks(file: str, chunk_size: int) -> List[Tuple[int, int]]:
+    """Split a file into byte ranges `[start, end)` which begin and end at line boundaries"""
+    size = os.path.getsize(file)
+    chunks: List[Tuple[int, int]] = []
+    with open(file, "rb") as f:
+        start = 0
+        while start < size:
+            f.seek(min(start + chunk_size, size))
+            # Move to the beginning of the next line
+            f.readline()
+            end = f.tell()
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+
+def read_lines(file: str, start: int, end: int, encoding: str) -> Iterator[str]:
+    """Same as lines of `open(file, encoding=encoding)` but only in `[start, end)`"""
+    with open(file, "rb") as f:
+        f.seek(start)
+        return iter(io.StringIO(f.read(end - start).decode(encoding), newline=None))
+
+
+def map_chunks(
+    parse_chunk: Callable[[ChunkArg], T], config: dict, file: str, parallel: Parallel
+) -> Iterator[T]:
+    """Parse chunks of a file in processes and yield results in the order of the file
+
+    :param parse_chunk: Function which is defined at module level so that it can be pickled
+    """
+    args: List[ChunkArg] = [
+        (config, file, start, end) for start, end in find_chunks(file, parallel.chunk_size_mb * MB)
+    ]
+    processes: int = parallel.processes.get_or(os.cpu_count() or 1)
+    with futures.ProcessPoolExecutor(max_workers=processes) as ex:
+        # Not to hold all parsed requests in memory before they are consumed
+        yield from map_in_order(ex, parse_chunk, args, processes * 2)
+
+
+def stream_in_parallel(
+    parse_chunk: Callable[[ChunkArg], List[Request]], config: dict, file: str, parallel: Parallel
+) -> Iterator[Request]:
+    """Same as `map_chunks` but yield requests one by one"""
+    for requests in map_chunks(parse_chunk, config, file, parallel):
+        yield from requests
@@ -0,0 +1,111 @@
+# -*- coding:utf-8 -*-
+
+"""Transform access logs of web servers (ex: nginx, Apache) to requests
+
+Compressed logs (.gz, .bz2, .xz) are read as they are.
+"""
+
+import re
+import urllib.parse as urlparser
+from typing import Dict, Iterator, List, Optional, Pattern
+
+from owlmixin import OwlMixin, TOption
+from owlmixin.owlcollections import TList
+
+from jumeaux.addons.log2reqs import Log2ReqsExecutor, open_text
+from jumeaux.addons.log2reqs.plain import guess_url_encoding
+from jumeaux.logger import Logger
+from jumeaux.models import Request, Log2ReqsAddOnPayload, HttpMethod
+
+logger: Logger = Logger(__name__)
+LOG_PREFIX = "[log2reqs/access_log]"
+
+COMMON = (
+    r"^(?P<remote_host>\S+) \S+ (?P<remote_user>\S+) \[(?P<time>[^\]]+)\] "
+    r'"(?P<method>[A-Z]+) (?P<path>[^ "]+)[^"]*" (?P<status>\d{3}|-) (?P<size>\d+|-)'
+)
+COMBINED = COMMON + r' "(?P<referer>[^"]*)" "(?P<user_agent>[^"]*)"'
+PATTERNS_BY_FORMAT = {"common": COMMON, "combined": COMBINED}
+
+
+class Config(OwlMixin):
+    format: str = "combined"
+    pattern: TOption[str]
+    methods: TList[str] = ["GET"]
+    encoding: str = "utf8"
+    keep_blank: bool = False
+    candidate_for_url_encodings: TList[str] = []
+
+
+def to_request(method: str, target: str, config: Config) -> Request:
+    path, _, query = target.partition("?")
+
+    url_encoding = "utf-8"
+    qs: Dict[str, List[str]] = {}
+    if query:
+        url_encoding = guess_url_encoding(query, config.candidate_for_url_encodings).get_or("utf-8")
+        qs = urlparser.parse_qs(query, keep_blank_values=config.keep_blank, encoding=url_encoding)
+
+    return Request.from_dict(
+        {"method": method, "path": path, "qs": qs, "headers": {}, "url_encoding": url_encoding}
+    )
+
+
+class Executor(Log2ReqsExecutor):
+    def __init__(self, config: dict):
+        self.config: Config = Config.from_dict(config or {})
+
+        supported: TList[str] = TList(HttpMethod).map(lambda x: x.value)
+        unsupported: TList[str] = self.config.methods.reject(lambda x: x in supported)
+        if unsupported:
+            logger.error(
+                f"{LOG_PREFIX} `methods` has unsupported methods: {unsupported.join(', ')} (choose from {supported.join(', ')})",
+                exit=True,
+            )
+
+        pattern: Optional[str] = self.config.pattern.get() or PATTERNS_BY_FORMAT.get(
+            self.config.format
+        )
+        if pattern is None:
+            logger.error(
+                f"{LOG_PREFIX} `format` must be {' or '.join(PATTERNS_BY_FORMAT)} unless `pattern` is specified.",
+                exit=True,
+            )
+        try:
+            self.pattern: Pattern = re.compile(pattern)
+        except re.error as e:
+            logger.error(
+                f"{LOG_PREFIX} `pattern` is an invalid regular expression. ({e})", exit=True
+            )
+        if "path" not in self.pattern.groupindex:
+            logger.error(f"{LOG_PREFIX} `pattern` must have a named group `path`.", exit=True)
+
+    def exec(self, payload: Log2ReqsAddOnPayload) -> TList[Request]:
+        return TList(self.stream(payload))
+
+    def stream(self, payload: Log2ReqsAddOnPayload) -> Iterator[Request]:
+        """
+        A log is skipped if it doesn't match the pattern or its method is not in `methods`.
+        `method` is GET if the pattern doesn't have a named group `method`.
+        """
+        unmatched = 0
+        with open_text(payload.file, self.config.encoding) as f:
+            for i, line in enumerate(f, 1):
+                m = self.pattern.match(line)
+                if not m:
+                    unmatched += 1
+                    logger.debug(
+                        f"{LOG_PREFIX} Line {i} doesn't match the pattern: {line.rstrip()}"
+                    )
+                    continue
+
+                method: str = m.groupdict().get("method") or "GET"
+                if method not in self.config.methods:
+                    continue
+
+                yield to_request(method, m.group("path"), self.config)
+
+        if unmatched:
+            logger.warning(
+                f"{LOG_PREFIX} {unmatched} lines in {payload.file} were skipped because they didn't match the pattern."
+            )
@@ -2,12 +2,20 @@
 
 import csv
 import urllib.parse as urlparser
-from typing import Iterable
+from typing import Iterable, Iterator, List
 
-from owlmixin import OwlMixin
+from owlmixin import OwlMixin, TOption
 from owlmixin.owlcollections import TList
 
-from jumeaux.addons.log2reqs import Log2ReqsExecutor
+from jumeaux.addons.log2reqs import (
+    Log2ReqsExecutor,
+    Parallel,
+    ChunkArg,
+    open_text,
+    parallel_for,
+    read_lines,
+    stream_in_parallel,
+)
 from jumeaux.models import Request, Log2ReqsAddOnPayload
 
 
@@ -15,6 +23,30 @@ class Config(OwlMixin):
     encoding: str = "utf8"
     keep_blank: bool = False
     dialect: str = "excel"
+    parallel: TOption[Parallel]
+
+
+def rows_to_requests(lines: Iterator[str], config: Config) -> Iterator[Request]:
+    rs: Iterable[dict] = csv.DictReader(
+        lines, ("name", "method", "path", "qs", "headers"), dialect=config.dialect
+    )
+    for r in rs:
+        if len(r) > 5:
+            raise ValueError
+        r["qs"] = urlparser.parse_qs(r["qs"], keep_blank_values=config.keep_blank)
+
+        # XXX: This is bad implementation but looks simple...
+        r["headers"] = urlparser.parse_qs(r["headers"], keep_blank_values=config.keep_blank)
+        for k, v in r["headers"].items():
+            r["headers"][k] = v[0]
+
+        yield Request.from_dict(r)
+
+
+def parse_chunk(arg: ChunkArg) -> List[Request]:
+    config_dict, file, start, end = arg
+    config: Config = Config.from_dict(config_dict)
+    return list(rows_to_requests(read_lines(file, start, end, config.encoding), config))
 
 
 class Executor(Log2ReqsExecutor):
@@ -22,6 +54,9 @@ class Executor(Log2ReqsExecutor):
         self.config: Config = Config.from_dict(config or {})
 
     def exec(self, payload: Log2ReqsAddOnPayload) -> TList[Request]:
+        return TList(self.stream(payload))
+
+    def stream(self, payload: Log2ReqsAddOnPayload) -> Iterator[Request]:
         """Transform csv as below.
             "title1", "GET", "/path1","a=1&b=2","header1=1&header2=2"
             "title2", "GET", "/path2","c=1"
@@ -31,24 +66,13 @@ class Executor(Log2ReqsExecutor):
         Exception:
             ValueError: If fomat is invalid.
         """
-        outputs = []
-
-        with open(payload.file, encoding=self.config.encoding) as f:
-            rs: Iterable[dict] = csv.DictReader(
-                f, ("name", "method", "path", "qs", "headers"), dialect=self.config.dialect
+        parallel: TOption[Parallel] = parallel_for(self.config.parallel, payload.file)
+        if parallel.any():
+            # Chunks are split at line boundaries, so values must not contain line breaks
+            yield from stream_in_parallel(
+                parse_chunk, self.config.to_dict(), payload.file, parallel.get()
             )
-            for r in rs:
-                if len(r) > 5:
-                    raise ValueError
-                r["qs"] = urlparser.parse_qs(r["qs"], keep_blank_values=self.config.keep_blank)
-
-                # XXX: This is bad implementation but looks simple...
-                r["headers"] = urlparser.parse_qs(
-                    r["headers"], keep_blank_values=self.config.keep_blank
-                )
-                for k, v in r["headers"].items():
-                    r["headers"][k] = v[0]
-
-                outputs.append(r)
+            return
 
-        return Request.from_dicts(outputs)
+        with open_text(payload.file, self.config.encoding) as f:
+            yield from rows_to_requests(f, self.config)
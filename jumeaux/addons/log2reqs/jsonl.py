@@ -0,0 +1,131 @@
+# -*- coding:utf-8 -*-
+
+import json
+from typing import Iterator, List, Tuple
+
+from owlmixin import OwlMixin, TOption
+from owlmixin.errors import OwlMixinError
+from owlmixin.owlcollections import TList
+
+from jumeaux.addons.log2reqs import (
+    Log2ReqsExecutor,
+    Parallel,
+    ChunkArg,
+    open_text,
+    parallel_for,
+    read_lines,
+    map_chunks,
+)
+from jumeaux.logger import Logger
+from jumeaux.models import Request, Log2ReqsAddOnPayload
+
+logger: Logger = Logger(__name__)
+LOG_PREFIX = "[log2reqs/jsonl]"
+
+# (line number, error message)
+LineError = Tuple[int, str]
+
+
+class Config(OwlMixin):
+    encoding: str = "utf8"
+    strict: bool = False
+    parallel: TOption[Parallel]
+
+
+def parse_line(line: str) -> Request:
+    """
+    Exception:
+        ValueError: If a line is not a valid request.
+    """
+    try:
+        value = json.loads(line)
+        if not isinstance(value, dict):
+            raise ValueError(f"A request must be an object, but was {type(value).__name__}")
+        return Request.from_dict(value)
+    except OwlMixinError as e:
+        # Only the first line because the message of OwlMixinError is too long for a log
+        raise ValueError(f"{e.title}: {e.description.splitlines()[0]}")
+    except TypeError as e:
+        raise ValueError(e)
+
+
+def parse_lines(lines: Iterator[str], strict: bool) -> Tuple[List[Request], List[LineError], int]:
+    """Stop at the first invalid line if `strict` is true
+
+    :return: Requests, errors with line numbers from 1 in `lines`, and the number of lines
+    """
+    requests: List[Request] = []
+    errors: List[LineError] = []
+    number = 0
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            requests.append(parse_line(line))
+        except ValueError as e:
+            errors.append((number, str(e)))
+            if strict:
+                break
+    return requests, errors, number
+
+
+def parse_chunk(arg: ChunkArg) -> Tuple[List[Request], List[LineError], int]:
+    config_dict, file, start, end = arg
+    config: Config = Config.from_dict(config_dict)
+    return parse_lines(read_lines(file, start, end, config.encoding), config.strict)
+
+
+class Executor(Log2ReqsExecutor):
+    def __init__(self, config: dict):
+        self.config: Config = Config.from_dict(config or {})
+
+    def exec(self, payload: Log2ReqsAddOnPayload) -> TList[Request]:
+        return TList(self.stream(payload))
+
+    def stream(self, payload: Log2ReqsAddOnPayload) -> Iterator[Request]:
+        """Transform from json lines (a request per line) to Request
+
+        Invalid lines are skipped and reported with their line numbers unless `strict` is true.
+
+        Exception:
+            ValueError: If a line is invalid and `strict` is true.
+        """
+        errors = 0
+
+        def report(line_errors: List[LineError], offset: int):
+            for number, message in line_errors:
+                logger.warning(
+                    f"{LOG_PREFIX} Skip line {offset + number} in {payload.file}: {message}"
+                )
+
+        parallel: TOption[Parallel] = parallel_for(self.config.parallel, payload.file)
+        if parallel.any():
+            offset = 0
+            for requests, line_errors, lines in map_chunks(
+                parse_chunk, self.config.to_dict(), payload.file, parallel.get()
+            ):
+                # Line numbers in a chunk are converted to the ones in the file
+                if self.config.strict and line_errors:
+                    number, message = line_errors[0]
+                    raise ValueError(f"Line {offset + number}: {message}")
+                report(line_errors, offset)
+                errors += len(line_errors)
+                offset += lines
+                yield from requests
+        else:
+            with open_text(payload.file, self.config.encoding) as f:
+                for number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        request = parse_line(line)
+                    except ValueError as e:
+                        if self.config.strict:
+                            raise ValueError(f"Line {number}: {e}")
+                        report([(number, str(e))], 0)
+                        errors += 1
+                        continue
+                    yield request
+
+        if errors:
+            logger.warning(f"{LOG_PREFIX} {errors} invalid lines in {payload.file} were skipped.")
@@ -1,12 +1,20 @@
 # -*- coding:utf-8 -*-
 
 import urllib.parse as urlparser
-from typing import Dict, List
+from typing import Dict, Iterator, List
 
 from owlmixin import OwlMixin, TOption
 from owlmixin.owlcollections import TList
 
-from jumeaux.addons.log2reqs import Log2ReqsExecutor
+from jumeaux.addons.log2reqs import (
+    Log2ReqsExecutor,
+    Parallel,
+    ChunkArg,
+    open_text,
+    parallel_for,
+    read_lines,
+    stream_in_parallel,
+)
 from jumeaux.logger import Logger
 from jumeaux.models import Request, Log2ReqsAddOnPayload
 
@@ -18,6 +26,7 @@ class Config(OwlMixin):
     encoding: str = "utf8"
     keep_blank: bool = False
     candidate_for_url_encodings: TList[str] = []
+    parallel: TOption[Parallel]
 
 
 def guess_url_encoding(query_str: str, encodings: TList[str]) -> TOption[str]:
@@ -31,37 +40,52 @@ def guess_url_encoding(query_str: str, encodings: TList[str]) -> TOption[str]:
     return TOption(None)
 
 
+def line_to_request(line: str, seq: int, config: Config) -> Request:
+    logger.debug(f"{LOG_PREFIX} ---- {seq} ----")
+
+    parts: List[str] = line.split("?")
+    path = parts[0]
+    logger.debug(f"{LOG_PREFIX} [path] {path}")
+
+    url_encoding = "utf-8"
+    qs: Dict[str, List[str]] = {}
+    if len(parts) > 1:
+        url_encoding = guess_url_encoding(parts[1], config.candidate_for_url_encodings).get_or(
+            "utf-8"
+        )
+        qs = urlparser.parse_qs(
+            parts[1], keep_blank_values=config.keep_blank, encoding=url_encoding
+        )
+    logger.debug(f"{LOG_PREFIX} [qs] ({url_encoding}) {qs}")
+
+    return Request.from_dict({"path": path, "qs": qs, "headers": {}, "url_encoding": url_encoding})
+
+
+def lines_to_requests(lines: Iterator[str], config: Config) -> Iterator[Request]:
+    for i, line in enumerate(x for x in lines if x != "\n"):
+        yield line_to_request(line.rstrip(), i, config)
+
+
+def parse_chunk(arg: ChunkArg) -> List[Request]:
+    config_dict, file, start, end = arg
+    config: Config = Config.from_dict(config_dict)
+    return list(lines_to_requests(read_lines(file, start, end, config.encoding), config))
+
+
 class Executor(Log2ReqsExecutor):
     def __init__(self, config: dict):
         self.config: Config = Config.from_dict(config or {})
 
     def exec(self, payload: Log2ReqsAddOnPayload) -> TList[Request]:
-        def line_to_request(line: str, seq: int) -> Request:
-            logger.debug(f"{LOG_PREFIX} ---- {seq} ----")
-
-            path = line.split("?")[0]
-            logger.debug(f"{LOG_PREFIX} [path] {path}")
-
-            url_encoding = "utf-8"
-            qs: Dict[str, List[str]] = {}
-            if len(line.split("?")) > 1:
-                url_encoding = guess_url_encoding(
-                    line.split("?")[1], self.config.candidate_for_url_encodings
-                ).get_or("utf-8")
-                qs = urlparser.parse_qs(
-                    line.split("?")[1],
-                    keep_blank_values=self.config.keep_blank,
-                    encoding=url_encoding,
-                )
-            logger.debug(f"{LOG_PREFIX} [qs] ({url_encoding}) {qs}")
-
-            return Request.from_dict(
-                {"path": path, "qs": qs, "headers": {}, "url_encoding": url_encoding}
-            )
+        return TList(self.stream(payload))
 
-        with open(payload.file, encoding=self.config.encoding) as f:
-            requests: TList[Request] = TList([x.rstrip() for x in f if x != "\n"]).emap(
-                lambda x, i: line_to_request(x, i)
+    def stream(self, payload: Log2ReqsAddOnPayload) -> Iterator[Request]:
+        parallel: TOption[Parallel] = parallel_for(self.config.parallel, payload.file)
+        if parallel.any():
+            yield from stream_in_parallel(
+                parse_chunk, self.config.to_dict(), payload.file, parallel.get()
             )
+            return
 
-        return requests
+        with open_text(payload.file, self.config.encoding) as f:
+            yield from lines_to_requests(f, self.config)
@@ -1,9 +1,36 @@
 # -*- coding:utf-8 -*-
+from typing import Iterator
+
+from owlmixin import TList
 
 from jumeaux.domain.config.vo import Config as JumeauxConfig
-from jumeaux.models import Reqs2ReqsAddOnPayload
+from jumeaux.models import Reqs2ReqsAddOnPayload, Request
 
 
 class Reqs2ReqsExecutor:
+    """
+    Add-ons which transform requests one by one set `streaming` True and implement `stream`.
+    Others implement `exec` and all requests are buffered before it is called. (ex: shuffle)
+
+    Streaming add-ons which transform each request independently of others set `parallelizable` True.
+    They can be applied to chunks of requests in other processes. (`reqs2reqs_parallel`)
+    """
+
+    streaming: bool = False
+    parallelizable: bool = False
+
     def exec(self, payload: Reqs2ReqsAddOnPayload, config: JumeauxConfig) -> Reqs2ReqsAddOnPayload:
-        raise NotImplementedError()
+        if not self.streaming:
+            raise NotImplementedError()
+        return Reqs2ReqsAddOnPayload.from_dict(
+            {"requests": TList(self.stream(iter(payload.requests), config))}
+        )
+
+    def stream(self, requests: Iterator[Request], config: JumeauxConfig) -> Iterator[Request]:
+        if self.streaming:
+            raise NotImplementedError()
+        return iter(
+            self.exec(
+                Reqs2ReqsAddOnPayload.from_dict({"requests": TList(requests)}), config
+            ).requests
+        )
@@ -0,0 +1,139 @@
+# -*- coding:utf-8 -*-
+
+"""Remove duplicated requests
+
+Requests are regarded as duplicated if their fingerprints are the same.
+A fingerprint is a hash of method, path, queries sorted by key, selected headers and a body.
+"""
+
+import hashlib
+import json
+import math
+from typing import Dict, Iterator, List, Tuple
+
+from owlmixin import OwlMixin, TList, TOption
+
+from jumeaux.addons.reqs2reqs import Reqs2ReqsExecutor
+from jumeaux.domain.config.vo import Config as JumeauxConfig
+from jumeaux.logger import Logger
+from jumeaux.models import Request
+from jumeaux.utils import jinja2_format, get_jinja2_format_error
+
+logger: Logger = Logger(__name__)
+LOG_PREFIX = "[reqs2reqs/dedupe]"
+
+
+class BloomFilterConfig(OwlMixin):
+    capacity: int
+    error_rate: float = 0.001
+
+
+class Config(OwlMixin):
+    max_occurrences: int = 1
+    headers: TList[str] = []
+    tag: TOption[str]
+    bloom_filter: TOption[BloomFilterConfig]
+
+
+class BloomFilter:
+    """Set of fingerprints with fixed memory. It may regard a new fingerprint as existing."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size: int = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes: int = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, fingerprint: bytes) -> Iterator[Tuple[int, int]]:
+        # Double hashing by two halves of a fingerprint
+        h1 = int.from_bytes(fingerprint[:8], "big")
+        h2 = int.from_bytes(fingerprint[8:16], "big")
+        for i in range(self.hashes):
+            yield divmod((h1 + i * h2) % self.size, 8)
+
+    def __contains__(self, fingerprint: bytes) -> bool:
+        return all(self.bits[byte] & (1 << bit) for byte, bit in self._positions(fingerprint))
+
+    def add(self, fingerprint: bytes) -> bool:
+        """
+        :return: True if `fingerprint` probably has been added already
+        """
+        exists = fingerprint in self
+        for byte, bit in self._positions(fingerprint):
+            self.bits[byte] |= 1 << bit
+        return exists
+
+
+def to_fingerprint(req: Request, headers: List[str]) -> bytes:
+    lower_headers = {k.lower(): v for k, v in req.headers.items()}
+    canonical = [
+        req.method.value,
+        req.path,
+        sorted(req.qs.items()),
+        [(h, lower_headers.get(h)) for h in headers],
+        req.raw.get(),
+        req.form.map(lambda x: sorted(x.items())).get(),
+        req.json.get(),
+    ]
+    return hashlib.blake2b(
+        json.dumps(canonical, sort_keys=True, ensure_ascii=False).encode(), digest_size=16
+    ).digest()
+
+
+def add_tag(req: Request, tag: str) -> Request:
+    return Request.from_dict({**req.to_dict(), "tags": req.tags.get_or(TList()).concat([tag])})
+
+
+class Executor(Reqs2ReqsExecutor):
+    streaming = True
+
+    def __init__(self, config: dict):
+        self.config: Config = Config.from_dict(config or {})
+        self.headers: List[str] = [h.lower() for h in self.config.headers]
+
+        if self.config.max_occurrences < 1:
+            logger.error(f"{LOG_PREFIX} `max_occurrences` must be greater than 0.", exit=True)
+        if self.config.bloom_filter.any() and (
+            self.config.max_occurrences > 1 or self.config.tag.any()
+        ):
+            logger.error(
+                f"{LOG_PREFIX} `bloom_filter` can't be used with `max_occurrences` > 1 or `tag`"
+                " because it can't count occurrences.",
+                exit=True,
+            )
+        error: TOption[str] = self.config.tag.flat_map(get_jinja2_format_error)
+        if error.any():
+            logger.error(f"{LOG_PREFIX} Illegal format in `tag`. ({error.get()})", exit=True)
+
+    def stream(self, requests: Iterator[Request], config: JumeauxConfig) -> Iterator[Request]:
+        if self.config.bloom_filter.any():
+            bf = BloomFilter(
+                self.config.bloom_filter.get().capacity, self.config.bloom_filter.get().error_rate
+            )
+            return (r for r in requests if not bf.add(to_fingerprint(r, self.headers)))
+        if self.config.tag.any():
+            return self._dedupe_with_tag(requests)
+        return self._dedupe(requests)
+
+    def _dedupe(self, requests: Iterator[Request]) -> Iterator[Request]:
+        # Only counts of fingerprints are kept, not requests
+        counts: Dict[bytes, int] = {}
+        for r in requests:
+            fingerprint = to_fingerprint(r, self.headers)
+            count = counts.get(fingerprint, 0)
+            if count < self.config.max_occurrences:
+                counts[fingerprint] = count + 1
+                yield r
+
+    def _dedupe_with_tag(self, requests: Iterator[Request]) -> Iterator[Request]:
+        # All requests have to be read before the first one is yielded to know hits
+        kept: List[Tuple[bytes, Request]] = []
+        hits: Dict[bytes, int] = {}
+        for r in requests:
+            fingerprint = to_fingerprint(r, self.headers)
+            hits[fingerprint] = hits.get(fingerprint, 0) + 1
+            if hits[fingerprint] <= self.config.max_occurrences:
+                kept.append((fingerprint, r))
+
+        logger.info_lv1(f"{LOG_PREFIX} {sum(hits.values())} requests => {len(kept)} requests")
+        for fingerprint, r in kept:
+            yield add_tag(r, jinja2_format(self.config.tag.get(), {"hits": hits[fingerprint]}))
@@ -1,6 +1,8 @@
 # -*- coding:utf-8 -*-
 
+import itertools
 import sys
+from typing import Iterator, Optional
 
 from owlmixin import OwlMixin, TList, TOption
 
@@ -8,7 +10,7 @@ from jumeaux.addons.reqs2reqs import Reqs2ReqsExecutor
 from jumeaux.utils import jinja2_format, get_jinja2_format_error
 from jumeaux.logger import Logger
 from jumeaux.domain.config.vo import Config as JumeauxConfig
-from jumeaux.models import Reqs2ReqsAddOnPayload, Notifier
+from jumeaux.models import Request, Notifier
 from jumeaux.notification_handlers import create_notification_handler
 
 logger: Logger = Logger(__name__)
@@ -30,6 +32,8 @@ def send(message: str, notifier: Notifier) -> TOption[str]:
 
 
 class Executor(Reqs2ReqsExecutor):
+    streaming = True
+
     def __init__(self, config: dict):
         self.config: Config = Config.from_dict(config or {})
 
@@ -43,8 +47,10 @@ class Executor(Reqs2ReqsExecutor):
             errors.map(lambda x: logger.error(f"{LOG_PREFIX}   * `{x}`"))
             logger.error(f"{LOG_PREFIX} ---------------------", exit=True)
 
-    def exec(self, payload: Reqs2ReqsAddOnPayload, config: JumeauxConfig) -> Reqs2ReqsAddOnPayload:
-        if not payload.requests:
+    def stream(self, requests: Iterator[Request], config: JumeauxConfig) -> Iterator[Request]:
+        # Only the first request is read to know whether requests are empty
+        first: Optional[Request] = next(requests, None)
+        if first is None:
             logger.warning("Requests are empty. Exit executor.")
             # TODO: Error handling
             errors: TList[TOption[str]] = self.config.notifies.map(
@@ -58,4 +64,4 @@ class Executor(Reqs2ReqsExecutor):
             errors.map(lambda m: m.map(logger.error))
             sys.exit(1)
 
-        return Reqs2ReqsAddOnPayload.from_dict({"requests": payload.requests})
+        return itertools.chain([first], requests)
@@ -1,11 +1,13 @@
 # -*- coding:utf-8 -*-
 
+from typing import Iterator
+
 from owlmixin import OwlMixin
 
 from jumeaux.addons.reqs2reqs import Reqs2ReqsExecutor
 from jumeaux.utils import when_filter
 from jumeaux.domain.config.vo import Config as JumeauxConfig
-from jumeaux.models import Reqs2ReqsAddOnPayload
+from jumeaux.models import Request
 
 
 class Config(OwlMixin):
@@ -13,14 +15,11 @@ class Config(OwlMixin):
 
 
 class Executor(Reqs2ReqsExecutor):
+    streaming = True
+    parallelizable = True
+
     def __init__(self, config: dict):
         self.config: Config = Config.from_dict(config or {})
 
-    def exec(self, payload: Reqs2ReqsAddOnPayload, config: JumeauxConfig) -> Reqs2ReqsAddOnPayload:
-        return Reqs2ReqsAddOnPayload.from_dict(
-            {
-                "requests": payload.requests.filter(
-                    lambda r: when_filter(self.config.when, r.to_dict())
-                )
-            }
-        )
+    def stream(self, requests: Iterator[Request], config: JumeauxConfig) -> Iterator[Request]:
+        return (r for r in requests if when_filter(self.config.when, r.to_dict()))
@@ -1,10 +1,13 @@
 # -*- coding:utf-8 -*-
 
+import itertools
+from typing import Iterator
+
 from owlmixin import OwlMixin
 
 from jumeaux.addons.reqs2reqs import Reqs2ReqsExecutor
 from jumeaux.domain.config.vo import Config as JumeauxConfig
-from jumeaux.models import Reqs2ReqsAddOnPayload
+from jumeaux.models import Request
 
 
 class Config(OwlMixin):
@@ -12,8 +15,11 @@ class Config(OwlMixin):
 
 
 class Executor(Reqs2ReqsExecutor):
+    streaming = True
+
     def __init__(self, config: dict):
         self.config: Config = Config.from_dict(config or {})
 
-    def exec(self, payload: Reqs2ReqsAddOnPayload, config: JumeauxConfig) -> Reqs2ReqsAddOnPayload:
-        return Reqs2ReqsAddOnPayload.from_dict({"requests": payload.requests[0 : self.config.size]})
+    def stream(self, requests: Iterator[Request], config: JumeauxConfig) -> Iterator[Request]:
+        # Stop reading inputs after `size` requests
+        return itertools.islice(requests, self.config.size)
@@ -1,5 +1,8 @@
 # -*- coding:utf-8 -*-
 
+import copy
+from typing import Iterator
+
 from owlmixin import OwlMixin, TOption
 from owlmixin.owlcollections import TList
 
@@ -7,7 +10,7 @@ from jumeaux.logger import Logger
 from jumeaux.addons.reqs2reqs import Reqs2ReqsExecutor
 from jumeaux.utils import when_optional_filter, jinja2_format, get_jinja2_format_error
 from jumeaux.domain.config.vo import Config as JumeauxConfig
-from jumeaux.models import Request, Reqs2ReqsAddOnPayload
+from jumeaux.models import Request
 
 logger: Logger = Logger(__name__)
 LOG_PREFIX = "[reqs2reqs/rename]"
@@ -23,20 +26,23 @@ class Config(OwlMixin):
 
 
 def apply_first_condition(request: Request, conditions: TList[Condition]) -> Request:
+    request_dict: dict = request.to_dict()
     condition: TOption[Condition] = conditions.find(
-        lambda c: when_optional_filter(c.when, request.to_dict())
+        lambda c: when_optional_filter(c.when, request_dict)
     )
     if condition.is_none():
         return request
 
-    name: TOption[str] = jinja2_format(
-        condition.get().name, request.to_dict()
-    ) if when_optional_filter(condition.get().when, request.to_dict()) else request.name
-
-    return Request.from_dict({**request.to_dict(), "name": name})
+    # Copy on write not to change the original request
+    renamed: Request = copy.copy(request)
+    renamed.name = TOption(jinja2_format(condition.get().name, request_dict))
+    return renamed
 
 
 class Executor(Reqs2ReqsExecutor):
+    streaming = True
+    parallelizable = True
+
     def __init__(self, config: dict):
         self.config: Config = Config.from_dict(config or {})
 
@@ -50,11 +56,5 @@ class Executor(Reqs2ReqsExecutor):
             errors.map(lambda x: logger.error(f"{LOG_PREFIX}   * `{x}`"))
             logger.error(f"{LOG_PREFIX} ---------------------", exit=True)
 
-    def exec(self, payload: Reqs2ReqsAddOnPayload, config: JumeauxConfig) -> Reqs2ReqsAddOnPayload:
-        return Reqs2ReqsAddOnPayload.from_dict(
-            {
-                "requests": payload.requests.map(
-                    lambda r: apply_first_condition(r, self.config.conditions)
-                )
-            }
-        )
+    def stream(self, requests: Iterator[Request], config: JumeauxConfig) -> Iterator[Request]:
+        return (apply_first_condition(r, self.config.conditions) for r in requests)
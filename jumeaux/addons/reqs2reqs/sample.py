@@ -0,0 +1,131 @@
+# -*- coding:utf-8 -*-
+
+"""Sample requests for each group so that all groups (ex: endpoints) remain
+
+Requests are read only once and only sampled requests are kept in memory. (Reservoir sampling)
+Sampled requests are passed to the next add-on in their original order after all requests are read.
+"""
+
+import random
+import re
+from typing import Dict, Iterator, List, Optional, Pattern, Tuple
+
+from owlmixin import OwlMixin, TOption
+
+from jumeaux.addons.reqs2reqs import Reqs2ReqsExecutor
+from jumeaux.domain.config.vo import Config as JumeauxConfig
+from jumeaux.logger import Logger
+from jumeaux.models import Request
+from jumeaux.utils import jinja2_format, get_jinja2_format_error
+
+logger: Logger = Logger(__name__)
+LOG_PREFIX = "[reqs2reqs/sample]"
+
+# (Index in inputs, request)
+Indexed = Tuple[int, Request]
+
+
+class Config(OwlMixin):
+    key: str = "{{ method }} {{ path }}"
+    pattern: TOption[str]
+    size: TOption[int]
+    rate: TOption[float]
+    min_size: int = 1
+    seed: TOption[int]
+
+
+class Reservoir:
+    """Keep `size` items chosen uniformly at random from all added items"""
+
+    def __init__(self, size: int, rand: random.Random):
+        self.size: int = size
+        self.rand: random.Random = rand
+        self.items: List[Indexed] = []
+        self.count: int = 0
+
+    def add(self, item: Indexed):
+        self.count += 1
+        if len(self.items) < self.size:
+            self.items.append(item)
+            return
+        i = self.rand.randrange(self.count)
+        if i < self.size:
+            self.items[i] = item
+
+
+class Group:
+    def __init__(self, config: Config, rand: random.Random):
+        self.rate: Optional[float] = config.rate.get()
+        self.rand: random.Random = rand
+        self.reservoir = Reservoir(config.size.get_or(config.min_size), rand)
+        self.selected: List[Indexed] = []
+
+    def add(self, item: Indexed):
+        self.reservoir.add(item)
+        if self.rate is not None and self.rand.random() < self.rate:
+            self.selected.append(item)
+
+    def samples(self) -> List[Indexed]:
+        if self.rate is None:
+            return self.reservoir.items
+        # Fall back to the reservoir not to lose groups which have few requests
+        return (
+            self.selected
+            if len(self.selected) >= len(self.reservoir.items)
+            else self.reservoir.items
+        )
+
+
+class Executor(Reqs2ReqsExecutor):
+    streaming = True
+
+    def __init__(self, config: dict):
+        self.config: Config = Config.from_dict(config or {})
+
+        if self.config.size.any() == self.config.rate.any():
+            logger.error(f"{LOG_PREFIX} Either `size` or `rate` must be specified.", exit=True)
+        if self.config.size.get_or(1) < 1 or self.config.min_size < 0:
+            logger.error(f"{LOG_PREFIX} `size` and `min_size` must be positive.", exit=True)
+        if not 0 <= self.config.rate.get_or(0) <= 1:
+            logger.error(f"{LOG_PREFIX} `rate` must be between 0 and 1.", exit=True)
+
+        error: TOption[str] = get_jinja2_format_error(self.config.key)
+        if error.any():
+            logger.error(f"{LOG_PREFIX} Illegal format in `key`. ({error.get()})", exit=True)
+        try:
+            self.pattern: Optional[Pattern] = self.config.pattern.map(re.compile).get()
+        except re.error as e:
+            logger.error(
+                f"{LOG_PREFIX} `pattern` is an invalid regular expression. ({e})", exit=True
+            )
+
+    def to_key(self, req: Request) -> str:
+        # `GET` instead of `HttpMethod.GET` regardless of how the enum is formatted
+        key: str = jinja2_format(self.config.key, {**req.to_dict(), "method": req.method.value})
+        m = self.pattern.search(key) if self.pattern else None
+        if not m:
+            return key
+        # Optional groups which don't match are None
+        return "/".join(g for g in m.groups() if g is not None) if m.groups() else m.group(0)
+
+    def stream(self, requests: Iterator[Request], config: JumeauxConfig) -> Iterator[Request]:
+        rand = random.Random(self.config.seed.get())
+        groups: Dict[str, Group] = {}
+        count = 0
+        for i, r in enumerate(requests):
+            key = self.to_key(r)
+            if key not in groups:
+                groups[key] = Group(self.config, rand)
+            groups[key].add((i, r))
+            count = i + 1
+
+        samples: List[Indexed] = sorted(
+            (x for g in groups.values() for x in g.samples()), key=lambda x: x[0]
+        )
+        logger.info_lv1(
+            f"{LOG_PREFIX} {count} requests => {len(samples)} requests ({len(groups)} groups)"
+        )
+        for g_key, g in groups.items():
+            logger.info_lv3(f"{LOG_PREFIX}   {g_key}: {g.reservoir.count} => {len(g.samples())}")
+
+        return (r for _, r in samples)
@@ -65,16 +65,11 @@ class Executor(Res2ResExecutor):
 
         return Res2ResAddOnPayload.from_dict(
             {
-                "response": {
-                    "body": json_str.encode(new_encoding, errors="replace"),
-                    "type": "json",
-                    "encoding": new_encoding,
-                    "headers": res.headers,
-                    "url": res.url,
-                    "status_code": res.status_code,
-                    "elapsed": res.elapsed,
-                    "elapsed_sec": res.elapsed_sec,
-                },
+                "response": res.copy_with(
+                    body=json_str.encode(new_encoding, errors="replace"),
+                    type="json",
+                    encoding=TOption(new_encoding),
+                ),
                 "req": req,
                 "tags": payload.tags,
             }
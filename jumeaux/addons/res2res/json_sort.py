@@ -69,29 +69,23 @@ class Executor(Res2ResExecutor):
             return payload
 
         res_json = json.loads(res.text)
+        req_dict: dict = payload.req.to_dict()
         res_json_sorted = self.config.items.reduce(
             lambda t, s: (
                 _dict_sort(t, s.targets) if isinstance(t, dict) else _list_sort(t, s.targets)
             )
-            if when_filter(s.when, payload.req.to_dict())
+            if when_filter(s.when, req_dict)
             else t,
             res_json,
         )
 
         return Res2ResAddOnPayload.from_dict(
             {
-                "response": {
-                    "body": json.dumps(res_json_sorted, ensure_ascii=False).encode(
+                "response": res.copy_with(
+                    body=json.dumps(res_json_sorted, ensure_ascii=False).encode(
                         res.encoding.get(), errors="replace"
-                    ),
-                    "type": res.type,
-                    "encoding": res.encoding.get(),
-                    "headers": res.headers,
-                    "url": res.url,
-                    "status_code": res.status_code,
-                    "elapsed": res.elapsed,
-                    "elapsed_sec": res.elapsed_sec,
-                },
+                    )
+                ),
                 "req": payload.req,
                 "tags": payload.tags.concat(
                     self.config.footprints_tag.map(
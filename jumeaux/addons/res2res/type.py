@@ -20,24 +20,15 @@ class Config(OwlMixin):
 
 
 def apply_first_condition(res: Response, req: Request, conditions: TList[Condition]) -> Response:
-    condition: TOption[Condition] = conditions.find(
-        lambda c: when_optional_filter(c.when, {'req': req.to_dict(), 'res': res.to_dict()})
-    )
+    if conditions.all(lambda c: c.when.is_none()):
+        data: dict = {}
+    else:
+        data = {'req': req.to_dict(), 'res': res.to_dict()}
+    condition: TOption[Condition] = conditions.find(lambda c: when_optional_filter(c.when, data))
     if condition.is_none():
         return res
 
-    return Response.from_dict(
-        {
-            "body": res.body,
-            "type": condition.get().type,
-            "encoding": res.encoding.get(),
-            "headers": res.headers,
-            "url": res.url,
-            "status_code": res.status_code,
-            "elapsed": res.elapsed,
-            "elapsed_sec": res.elapsed_sec,
-        },
-    )
+    return res.copy_with(type=condition.get().type)
 
 
 class Executor(Res2ResExecutor):
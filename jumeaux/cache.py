@@ -0,0 +1,105 @@
+# -*- coding:utf-8 -*-
+
+"""Cache parsed requests on disk
+
+A cache file is a sequence of pickled lists of requests so that it can be written and read lazily.
+Its name is a digest of input file fingerprints and add-on configs, so a cache is never updated.
+A new cache is created instead when a file or a config changes.
+"""
+
+import gc
+import hashlib
+import json
+import os
+import pickle
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional
+
+from jumeaux import __version__
+from jumeaux.logger import Logger
+from jumeaux.models import Request
+from jumeaux.utils import chunked
+
+logger: Logger = Logger(__name__)
+LOG_PREFIX = "[cache]"
+
+BATCH_SIZE = 1000
+
+
+def fingerprint(file: str, use_content_hash: bool) -> dict:
+    """Values which change when `file` changes"""
+    stat = os.stat(file)
+    if not use_content_hash:
+        return {"path": os.path.abspath(file), "size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+    digest = hashlib.sha256()
+    with open(file, "rb") as f:
+        for b in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(b)
+    return {"path": os.path.abspath(file), "size": stat.st_size, "sha256": digest.hexdigest()}
+
+
+def to_cache_path(cache_dir: str, *sources) -> str:
+    """
+    :param sources: JSON serializable values which the cache depends on
+    """
+    key = hashlib.sha256(
+        json.dumps([__version__, *sources], sort_keys=True, ensure_ascii=False).encode()
+    ).hexdigest()
+    return os.path.join(os.path.expanduser(cache_dir), f"{key}.pickle")
+
+
+def load_batch(f: BinaryIO) -> Optional[List[Request]]:
+    # Garbage collection triggered by a lot of new objects makes unpickling several times slower
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return pickle.load(f)
+    except EOFError:
+        return None
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def read(path: str) -> Iterator[Request]:
+    with open(path, "rb") as f:
+        batch: Optional[List[Request]] = load_batch(f)
+        while batch is not None:
+            yield from batch
+            batch = load_batch(f)
+
+
+def write_through(path: str, requests: Iterable[Request]) -> Iterator[Request]:
+    """Yield `requests` and write them to `path` only if all of them are consumed"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    count = 0
+    completed = False
+    try:
+        with open(tmp, "wb") as f:
+            for batch in chunked(requests, BATCH_SIZE):
+                pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+                count += len(batch)
+                yield from batch
+        os.replace(tmp, path)
+        completed = True
+        logger.info_lv1(f"{LOG_PREFIX} Saved {count} requests to {path}")
+    finally:
+        if not completed and os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def stream_with_cache(
+    path: str, create: Callable[[], Iterable[Request]], description: str
+) -> Iterator[Request]:
+    """Load requests from `path` if exists, otherwise create them and save to `path`
+
+    :param description: What requests are. It is used only for logging
+    """
+    if os.path.exists(path):
+        logger.info_lv1(f"{LOG_PREFIX} Hit: {description} ({path})")
+        yield from read(path)
+        return
+
+    logger.info_lv1(f"{LOG_PREFIX} Miss: {description} ({path})")
+    yield from write_through(path, create())
@@ -0,0 +1,121 @@
+"""Format responses stored without dump add-ons
+Usage:
+  {cli} <report> [--output-dir=<output_dir>] [--processes=<processes>] [-vvv]
+  {cli} (-h | --help)
+
+Options:
+  <report>                                      Report (report.json) of the run
+  --output-dir = <output_dir>                   Directory for formatted copies [def: <report dir>/formatted]
+  --processes = <processes>                     The number of processes in formatting [def: cpu count]
+  -vvv                                          Logger level (`-v` or `-vv` or `-vvv`)
+  -h --help                                     Show this screen.
+
+Responses are stored as raw bytes when `output.store.deferred_dump` is true.
+This command applies dump add-ons in the report to them and writes formatted copies.
+"""
+
+import datetime
+import os
+from concurrent import futures
+from typing import Optional, Tuple
+
+from owlmixin import OwlMixin, TList, TOption
+
+from jumeaux.addons import create_addon
+from jumeaux.addons.models import Addon
+from jumeaux.logger import Logger, init_logger
+from jumeaux.models import (
+    Report,
+    Response,
+    ResponseSummary,
+    DumpAddOnPayload,
+    CaseInsensitiveDict,
+)
+from jumeaux.store import read, compress, EXTENSIONS_BY_COMPRESSION
+
+logger: Logger = Logger(__name__)
+
+dump_addons: TList = TList()
+
+
+class Args(OwlMixin):
+    report: str
+    output_dir: TOption[str]
+    processes: TOption[int]
+    v: int
+
+
+def to_response(summary: ResponseSummary, body: bytes) -> Response:
+    headers = summary.response_header.get() or (
+        {"content-type": summary.content_type.get()} if summary.content_type.any() else {}
+    )
+    return Response.from_dict(
+        {
+            "body": body,
+            "encoding": summary.encoding,
+            "headers": CaseInsensitiveDict(headers),
+            "url": summary.url,
+            "status_code": summary.status_code.get(),
+            "elapsed": datetime.timedelta(seconds=summary.response_sec.get_or(0)),
+            "elapsed_sec": summary.response_sec.get_or(0),
+            "type": summary.type,
+        }
+    )
+
+
+def init_dump_addons(addons: list):
+    global dump_addons
+    dump_addons = Addon.from_dicts(addons).map(lambda x: create_addon(x, "dump"))
+
+
+def format_file(args: Tuple[dict, str, str]) -> str:
+    """
+    [[[ WARNING !!!!! ]]]
+    An argument is a dict like `ResponseSummary` because it is pickled in multi processes.
+    """
+    summary_dict, src_dir, dst_dir = args
+    summary: ResponseSummary = ResponseSummary.from_dict(summary_dict)
+    file: str = summary.file.get()
+
+    res: Response = to_response(summary, read(f"{src_dir}/{file}"))
+    body: bytes = dump_addons.reduce(
+        lambda p, a: a.exec(p),
+        DumpAddOnPayload.from_dict({"response": res, "body": res.body, "encoding": res.encoding}),
+    ).body
+
+    compression: Optional[str] = next(
+        (c for c, ext in EXTENSIONS_BY_COMPRESSION.items() if file.endswith(ext)), None
+    )
+    dst = f"{dst_dir}/{file}"
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    with open(dst, "wb") as f:
+        f.write(compress(body, compression))
+
+    return file
+
+
+def run(args: Args):
+    init_logger(args.v)
+
+    report: Report = Report.from_jsonf(args.report, force_cast=True)
+    src_dir = os.path.dirname(os.path.abspath(args.report))
+    dst_dir = args.output_dir.get_or(f"{src_dir}/formatted")
+    addons: list = report.addons.map(lambda x: x.dump.to_dicts()).get_or([])
+
+    # Files are shared between trials if they are content addressed
+    summaries: TList[ResponseSummary] = (
+        report.trials.flat_map(lambda x: [x.one, x.other])
+        .filter(lambda x: x.file.any())
+        .uniq_by(lambda x: x.file.get())
+    )
+    logger.info_lv1(f"Format {len(summaries)} files to {dst_dir} by {len(addons)} dump add-ons")
+
+    with futures.ProcessPoolExecutor(
+        max_workers=args.processes.get(), initializer=init_dump_addons, initargs=(addons,)
+    ) as ex:
+        for file in ex.map(
+            format_file, [(x.to_dict(), src_dir, dst_dir) for x in summaries], chunksize=16
+        ):
+            logger.info_lv3(f"Formatted {file}")
+
+    logger.info_lv1(f"Finished formatting")
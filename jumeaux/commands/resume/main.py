@@ -0,0 +1,32 @@
+"""Resume a run which has stopped
+Usage:
+  {cli} <key> [--response-dir=<response_dir>] [-vvv]
+  {cli} (-h | --help)
+
+Options:
+  <key>                                         Key of the run (directory name in response_dir)
+  --response-dir = <response_dir>               `output.response_dir` of the run [def: responses]
+  -vvv                                          Logger level (`-v` or `-vv` or `-vvv`)
+  -h --help                                     Show this screen.
+
+Trials which have finished are read from `<response_dir>/<key>/journal.jsonl` and skipped.
+Others are executed with the same config, then a report with all trials is created.
+"""
+
+from owlmixin import OwlMixin, TOption
+
+from jumeaux import executor
+from jumeaux.logger import Logger, init_logger
+
+logger: Logger = Logger(__name__)
+
+
+class Args(OwlMixin):
+    key: str
+    response_dir: TOption[str]
+    v: int
+
+
+def run(args: Args):
+    init_logger(args.v)
+    executor.resume(key=args.key, response_dir=args.response_dir.get_or("responses"))
@@ -2,7 +2,10 @@
 Usage:
   {cli} <report> [--title=<title>] [--description=<description>]
                  [--tag=<tag>...] [--threads=<threads>] [--processes=<processes>]
-                 [--max-retries=<max_retries>] [-vvv]
+                 [--max-retries=<max_retries>] [--status=<statuses>]
+                 [--trial-tag=<trial_tag>...] [--path-regex=<path_regex>] [--merge]
+                 [--profile] [--profile-every=<profile_every>] [--profile-top=<profile_top>]
+                 [--profile-memory] [-vvv]
   {cli} (-h | --help)
 
 Options:
@@ -13,18 +16,29 @@ Options:
   --threads = <threads>                         The number of threads in challenge [def: 1]
   --processes = <processes>                     The number of processes in challenge
   --max-retries = <max_retries>                 The max number of retries which accesses to API
+  --status = <statuses>                         Retry only these statuses (ex: different,failure)
+  --trial-tag = <trial_tag>...                  Retry only trials with any of these tags
+  --path-regex = <path_regex>                   Retry only trials whose paths match the regex
+  --merge                                       Include trials not retried in the report
+  --profile                                     Profile trials by cProfile (see profile.txt)
+  --profile-every = <profile_every>             Profile only every n-th trial [def: 1]
+  --profile-top = <profile_top>                 The number of functions in profile.txt [def: 30]
+  --profile-memory                              Profile memory by tracemalloc
   -vvv                                          Logger level (`-v` or `-vv` or `-vvv`)
   -h --help                                     Show this screen.
 """
 
+import re
 from typing import Optional
 
 from owlmixin import OwlMixin, TList
 from owlmixin import TOption
 
 from jumeaux import executor
+from jumeaux.domain.config.service import create_profile
 from jumeaux.domain.config.vo import MergedArgs
 from jumeaux.logger import Logger, init_logger
+from jumeaux.models import Status
 
 logger: Logger = Logger(__name__)
 
@@ -37,11 +51,36 @@ class Args(OwlMixin):
     threads: TOption[int]
     processes: TOption[int]
     max_retries: TOption[int]
+    status: TOption[str]
+    trial_tag: TList[str]
+    path_regex: TOption[str]
+    merge: bool
+    profile: bool
+    profile_every: TOption[int]
+    profile_top: TOption[int]
+    profile_memory: bool
     v: int
 
 
+def to_statuses(statuses: TOption[str]) -> TList[Status]:
+    choices: TList[str] = TList(s.value for s in Status)
+    values: TList[str] = TList(statuses.get_or("").split(",")).map(str.strip).filter(bool)
+    invalids: TList[str] = values.reject(lambda x: x in choices)
+    if invalids:
+        logger.error(
+            f"Invalid status: {invalids.join(', ')} (choose from {choices.join(', ')})", exit=True
+        )
+    return values.map(Status.from_value)
+
+
 def run(args: Args):
     init_logger(args.v)
+    statuses: TList[Status] = to_statuses(args.status)
+    try:
+        args.path_regex.map(re.compile)
+    except re.error as e:
+        logger.error(f"--path-regex is an invalid regular expression. ({e})", exit=True)
+
     executor.retry(
         args=MergedArgs.from_dict(
             {
@@ -51,7 +90,14 @@ def run(args: Args):
                 "threads": args.threads,
                 "processes": args.processes,
                 "max_retries": args.max_retries,
+                "profile": create_profile(
+                    args.profile, args.profile_memory, args.profile_every, args.profile_top
+                ),
             }
         ),
         report=args.report,
+        statuses=statuses,
+        trial_tags=args.trial_tag,
+        path_regex=args.path_regex,
+        merge=args.merge,
     )
@@ -3,7 +3,9 @@ Usage:
   {cli} <files>... [--config=<yaml>...] [--title=<title>] [--description=<description>]
                    [--tag=<tag>...] [--skip-addon-tag=<skip_add_on_tag>...]
                    [--threads=<threads>] [--processes=<processes>]
-                   [--max-retries=<max_retries>] [-vvv]
+                   [--max-retries=<max_retries>]
+                   [--profile] [--profile-every=<profile_every>] [--profile-top=<profile_top>]
+                   [--profile-memory] [-vvv]
   {cli} (-h | --help)
 
 Options:
@@ -16,6 +18,10 @@ Options:
   --threads = <threads>                         The number of threads in challenge [def: 1]
   --processes = <processes>                     The number of processes in challenge
   --max-retries = <max_retries>                 The max number of retries which accesses to API
+  --profile                                     Profile trials by cProfile (see profile.txt)
+  --profile-every = <profile_every>             Profile only every n-th trial [def: 1]
+  --profile-top = <profile_top>                 The number of functions in profile.txt [def: 30]
+  --profile-memory                              Profile memory by tracemalloc
   -vvv                                          Logger level (`-v` or `-vv` or `-vvv`)
   -h --help                                     Show this screen.
 """
@@ -26,6 +32,7 @@ from owlmixin import OwlMixin, TList
 from owlmixin import TOption
 
 from jumeaux import executor
+from jumeaux.domain.config.service import create_profile
 from jumeaux.domain.config.vo import MergedArgs
 from jumeaux.logger import Logger, init_logger
 
@@ -42,6 +49,10 @@ class Args(OwlMixin):
     threads: TOption[int]
     processes: TOption[int]
     max_retries: TOption[int]
+    profile: bool
+    profile_every: TOption[int]
+    profile_top: TOption[int]
+    profile_memory: bool
     v: int
 
 
@@ -57,6 +68,9 @@ def run(args: Args):
                 "threads": args.threads,
                 "processes": args.processes,
                 "max_retries": args.max_retries,
+                "profile": create_profile(
+                    args.profile, args.profile_memory, args.profile_every, args.profile_top
+                ),
             }
         ),
         config_paths=args.config or TList(["config.yml"]),
@@ -7,7 +7,7 @@ from typing import List
 from owlmixin import TList, TOption
 from owlmixin.util import load_yamlf
 
-from jumeaux.domain.config.vo import Config, MergedArgs
+from jumeaux.domain.config.vo import Config, MergedArgs, Profile
 from jumeaux.models import Report
 
 
@@ -83,6 +83,28 @@ def create_config(config_paths: TList[str], skip_tags: TOption[TList[str]]) -> C
     return Config.from_dict(config_paths.reduce(reducer, {}))
 
 
+def create_profile(
+    cpu: bool, memory: bool, every: TOption[int], top: TOption[int]
+) -> TOption[Profile]:
+    """Profile from command line options. None if neither `cpu` nor `memory` is profiled"""
+    if not (cpu or memory):
+        return TOption(None)
+    return TOption(
+        Profile.from_dict(
+            {
+                k: v
+                for k, v in {
+                    "every": every.get(),
+                    "top": top.get(),
+                    "cpu": cpu,
+                    "memory": memory,
+                }.items()
+                if v is not None
+            }
+        )
+    )
+
+
 def create_config_from_report(report: Report) -> Config:
     return Config.from_dict(
         {
@@ -94,6 +116,7 @@ def create_config_from_report(report: Report) -> Config:
             "description": report.description,
             "notifiers": report.notifiers,
             "addons": report.addons.get().to_dict(),
+            "encoding_detection": report.summary.encoding_detection.get(),
         }
     )
 
@@ -115,6 +138,11 @@ def merge_args2config(args: MergedArgs, config: Config) -> Config:
             "input_files": args.files if args.files.any() else config.input_files,
             "notifiers": config.notifiers,
             "addons": config.addons,
+            "log2reqs_parallel": config.log2reqs_parallel,
+            "reqs2reqs_parallel": config.reqs2reqs_parallel,
+            "request_cache": config.request_cache,
+            "encoding_detection": config.encoding_detection,
+            "profile": args.profile if args.profile.any() else config.profile,
             "judge_response_header": config.judge_response_header,
             "ignore_response_header_keys": config.ignore_response_header_keys,
         }
@@ -28,10 +28,69 @@ class AccessPoint(OwlMixin):
     headers: TDict[str] = {}
 
 
+class Compression(OwlEnum):
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+
+class BackgroundWriting(OwlMixin):
+    queue_size: int = 1000
+    batch_size: int = 100
+
+
+class ResponseStore(OwlMixin):
+    # Name stored files by the digest of their contents and write each of them only once
+    content_addressed: bool = False
+    compression: TOption[Compression]
+    background_writer: TOption[BackgroundWriting]
+    # Store raw bodies without dump add-ons. (Format later by `jumeaux dump`)
+    deferred_dump: bool = False
+
+
 class OutputSummary(OwlMixin):
     response_dir: str
     encoding: str = "utf8"
     logger: TOption[any]
+    store: TOption[ResponseStore]
+    # Output timings of each trial in addition to the aggregation in the summary
+    trial_timings: bool = False
+
+
+class Log2ReqsParallel(OwlMixin):
+    processes: TOption[int]
+
+
+class Reqs2ReqsParallel(OwlMixin):
+    processes: TOption[int]
+    # Number of requests passed to a process at once
+    chunk_size: int = 1000
+
+
+class RequestCache(OwlMixin):
+    dir: str = "~/.cache/jumeaux/requests"
+    # Use a digest of contents instead of mtime to detect changes of input files
+    use_content_hash: bool = False
+    # Cache requests transformed by reqs2reqs add-ons, too
+    reqs2reqs: bool = False
+
+
+class EncodingDetection(OwlMixin):
+    # Only the beginning of a body is used to detect an encoding
+    max_bytes: int = 65536
+    # Reuse an encoding guessed from a body for the same host and content-type in a run
+    # (ascii and unconfident guesses are not reused)
+    cache: bool = False
+
+
+class Profile(OwlMixin):
+    # Profile only trials whose seqs are multiples of it
+    every: int = 1
+    # Number of functions in profile.txt
+    top: int = 30
+    # Measure trials by cProfile
+    cpu: bool = True
+    # Compare tracemalloc snapshots before and after trials (independent of `cpu`)
+    memory: bool = False
 
 
 class Concurrency(OwlMixin):
@@ -71,6 +130,11 @@ class Config(OwlMixin):
     input_files: TOption[TList[str]]
     notifiers: TOption[TDict[Notifier]]
     addons: Addons
+    log2reqs_parallel: TOption[Log2ReqsParallel]
+    reqs2reqs_parallel: TOption[Reqs2ReqsParallel]
+    request_cache: TOption[RequestCache]
+    encoding_detection: TOption[EncodingDetection]
+    profile: TOption[Profile]
     judge_response_header: bool = False
     ignore_response_header_keys: TList[str] = ["Content-Length", "Date"]
 
@@ -83,3 +147,4 @@ class MergedArgs(OwlMixin):
     threads: TOption[int]
     processes: TOption[int]
     max_retries: TOption[int]
+    profile: TOption[Profile]
@@ -1,14 +1,20 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import copy
 import hashlib
 import io
+import itertools
+import multiprocessing
 import os
 import re
+import shutil
 import sys
+import time
 import urllib.parse as urlparser
 from concurrent import futures
-from typing import Tuple, Optional, Any, List
+from datetime import datetime
+from typing import Tuple, Optional, Any, Dict, List, Iterable, Iterator, Pattern, Sized
 
 import requests
 from deepdiff import DeepDiff
@@ -20,14 +26,37 @@ from requests.exceptions import ConnectionError
 # sys.path.append(PROJECT_ROOT)
 # sys.path.append(os.getcwd())
 from jumeaux import __version__
-from jumeaux.addons import AddOnExecutor
-from jumeaux.utils import to_jumeaux_xpath, mill_seconds_until, now, parse_datetime_dsl
+from jumeaux.addons import AddOnExecutor, create_addon
+from jumeaux.addons.log2reqs import Log2ReqsExecutor
+from jumeaux import journal, profiler, timing
+from jumeaux.cache import fingerprint, stream_with_cache, to_cache_path
+from jumeaux.store import (
+    store,
+    check_compression,
+    get_background_writer,
+    close_background_writer,
+    init_child_writer,
+    pop_child_writer_errors,
+    BackgroundWriter,
+)
+from jumeaux.utils import (
+    to_jumeaux_xpath,
+    now,
+    parse_datetime_dsl,
+    map_in_order,
+)
 from jumeaux.domain.config.service import (
     create_config_from_report,
     create_config,
     merge_args2config,
 )
-from jumeaux.domain.config.vo import Config, MergedArgs
+from jumeaux.domain.config.vo import (
+    Config,
+    EncodingDetection,
+    Log2ReqsParallel,
+    MergedArgs,
+    RequestCache,
+)
 
 # XXX: ...
 from jumeaux.logger import Logger
@@ -36,13 +65,15 @@ from jumeaux.models import (
     Report,
     Request,
     Response,
-    ChallengeArg,
+    ChallengeContext,
+    EncodingDetector,
     Trial,
+    ResponseSummary,
+    Timings,
     Proxy,
     Summary,
     Concurrency,
     Log2ReqsAddOnPayload,
-    Reqs2ReqsAddOnPayload,
     Res2ResAddOnPayload,
     Res2DictAddOnPayload,
     JudgementAddOnPayload,
@@ -55,6 +86,7 @@ from jumeaux.models import (
     DidChallengeAddOnReference,
     DiffKeys,
     Status,
+    StatusCounts,
     DictOrList,
     QueryCustomization,
     FinalAddOnReference,
@@ -63,6 +95,11 @@ from jumeaux.models import (
 
 logger: Logger = Logger(__name__)
 global_addon_executor: AddOnExecutor
+# Set by `init_challenge`
+challenge_context: ChallengeContext
+challenge_session: requests.Session
+challenge_encoding_detector: EncodingDetector
+challenge_profiler: Optional[profiler.TrialProfiler] = None
 
 START_JUMEAUX_AA = r"""
         ____  _             _         _
@@ -123,14 +160,16 @@ __/\__  / ___|___  _ __  / _(_) __ _  __/\__
                                |___/
 """
 
-
-def write_to_file(name, dir, body):
-    with open(f"{dir}/{name}", "wb") as f:
-        f.write(body)
+RESUME_MISMATCH_MESSAGE = (
+    "The request of seq {seq} differs from the one of the stopped run, so it can't be resumed. "
+    "reqs2reqs add-ons must return the same requests in the same order "
+    "(ex: `shuffle`, `sample` without a seed or `$DATETIME` don't). Please run it again."
+)
 
 
 def make_dir(path):
-    os.makedirs(path)
+    # Exists when a run is resumed
+    os.makedirs(path, exist_ok=True)
     os.chmod(path, 0o777)
 
 
@@ -218,18 +257,67 @@ def concurrent_request(
     return res_one, res_other
 
 
-def res2res(res: Response, req: Request) -> Res2ResAddOnPayload:
+def res2res(
+    res: Response, req: Request, timings: Optional[Dict[str, float]] = None
+) -> Res2ResAddOnPayload:
     return global_addon_executor.apply_res2res(
-        Res2ResAddOnPayload.from_dict({"response": res, "req": req, "tags": []})
+        Res2ResAddOnPayload.from_dict({"response": res, "req": req, "tags": []}), timings
     )
 
 
-def res2dict(res: Response) -> TOption[dict]:
+def res2dict(res: Response, timings: Optional[Dict[str, float]] = None) -> TOption[dict]:
     return global_addon_executor.apply_res2dict(
-        Res2DictAddOnPayload.from_dict({"response": res, "result": None})
+        Res2DictAddOnPayload.from_dict({"response": res, "result": None}), timings
     ).result
 
 
+def diagnose_diffs(
+    res_one: Response,
+    res_other: Response,
+    dict_one: TOption[DictOrList],
+    dict_other: TOption[DictOrList],
+) -> Optional[TDict[DiffKeys]]:
+    # Either dict_one or dic_other is None, it means that it can't be analyzed, therefore return None
+    ddiff = (
+        None
+        if dict_one.is_none() or dict_other.is_none()
+        else {}
+        if res_one.body == res_other.body
+        else DeepDiff(dict_one.get(), dict_other.get())
+    )
+
+    return (
+        TDict(
+            {
+                "unknown": DiffKeys.from_dict(
+                    {
+                        "changed": TList(
+                            ddiff.get("type_changes", {}).keys()
+                            | ddiff.get("values_changed", {}).keys()
+                        )
+                        .map(to_jumeaux_xpath)
+                        .order_by(lambda x: x),
+                        "added": TList(
+                            ddiff.get("dictionary_item_added", {})
+                            | ddiff.get("iterable_item_added", {}).keys()
+                        )
+                        .map(to_jumeaux_xpath)
+                        .order_by(lambda x: x),
+                        "removed": TList(
+                            ddiff.get("dictionary_item_removed", {})
+                            | ddiff.get("iterable_item_removed", {}).keys()
+                        )
+                        .map(to_jumeaux_xpath)
+                        .order_by(lambda x: x),
+                    }
+                )
+            }
+        )
+        if ddiff is not None
+        else None
+    )
+
+
 def judgement(
     r_one: Response,
     r_other: Response,
@@ -242,6 +330,7 @@ def judgement(
     diffs_by_cognition: Optional[TDict[DiffKeys]],
     judge_response_header: bool,
     ignore_response_header_keys: TList[str],
+    timings: Optional[Dict[str, float]] = None,
 ) -> Tuple[Status, TOption[TDict[DiffKeys]]]:
     result: JudgementAddOnPayload = global_addon_executor.apply_judgement(
         JudgementAddOnPayload.from_dict(
@@ -270,6 +359,7 @@ def judgement(
                 "res_other": r_other,
             }
         ),
+        timings,
     )
 
     status: Status = Status.SAME if result.regard_as_same else Status.DIFFERENT  # type: ignore # Prevent for enum problem
@@ -277,7 +367,14 @@ def judgement(
     return status, result.diffs_by_cognition
 
 
-def store_criterion(status: Status, name: str, req: Request, r_one: Response, r_other: Response):
+def store_criterion(
+    status: Status,
+    name: str,
+    req: Request,
+    r_one: Response,
+    r_other: Response,
+    timings: Optional[Dict[str, float]] = None,
+):
     return global_addon_executor.apply_store_criterion(
         StoreCriterionAddOnPayload.from_dict({"stored": False}),
         StoreCriterionAddOnReference.from_dict(
@@ -288,12 +385,14 @@ def store_criterion(status: Status, name: str, req: Request, r_one: Response, r_
                 "res_other": r_other,
             }
         ),
+        timings,
     ).stored
 
 
-def dump(res: Response):
+def dump(res: Response, timings: Optional[Dict[str, float]] = None):
     return global_addon_executor.apply_dump(
-        DumpAddOnPayload.from_dict({"response": res, "body": res.body, "encoding": res.encoding})
+        DumpAddOnPayload.from_dict({"response": res, "body": res.body, "encoding": res.encoding}),
+        timings,
     ).body
 
 
@@ -333,66 +432,102 @@ def create_query_string(
     return urlparser.urlencode(removed, doseq=True, encoding=encoding)
 
 
-def challenge(arg_dict: dict) -> dict:
+def init_challenge(context: ChallengeContext):
+    """Set values shared by all trials. Called once in each process"""
+    global challenge_context, challenge_session, challenge_encoding_detector, challenge_profiler
+    challenge_context = context
+    challenge_encoding_detector = EncodingDetector.from_config(context.encoding_detection)
+    challenge_profiler = context.profile.map(
+        lambda x: profiler.create_profiler(x, f"{context.res_dir}/{context.key}")
+    ).get()
+    challenge_session = requests.Session()
+    challenge_session.mount("http://", HTTPAdapter(max_retries=context.max_retries))
+    challenge_session.mount("https://", HTTPAdapter(max_retries=context.max_retries))
+
+
+def init_challenge_process(context: ChallengeContext, writer_errors: Any):
+    """Initializer of worker processes"""
+    init_child_writer(writer_errors)
+    init_challenge(context)
+
+
+def log_elapsed(log_prefix: str, stage: str, sec: float):
+    logger.info_lv3(f"{log_prefix} ⏰ {stage}:   {round(sec * 1000)}ms")
+
+
+def challenge(task: Tuple[int, Request]) -> Trial:
     """
-    [[[ WARNING !!!!! ]]]
-    `arg_dict` is dict like `ChallengeArg` because HttpMethod(OwlEnum) can't be pickled.
-    Return value is dict like `Trial` because Status(OwlEnum) can't be pickled.
+    :param task: (seq, request). Others are in `challenge_context` not to pickle them for each task.
+    A returned `Trial` is passed as it is (pickled in processes) not to convert it again.
     """
-    arg: ChallengeArg = ChallengeArg.from_dict(arg_dict)
+    if challenge_profiler is None:
+        return do_challenge(task)
+    with challenge_profiler.trial(task[0]):
+        return do_challenge(task)
+
+
+def do_challenge(task: Tuple[int, Request]) -> Trial:
+    seq, req = task
+    ctx: ChallengeContext = challenge_context
+    challenge_begin = time.perf_counter()
+    # Seconds by stage and by add-on
+    stages: Dict[str, float] = {}
+    addons: Dict[str, float] = {}
 
-    name: str = arg.req.name.get_or(str(arg.seq))
-    log_prefix = f"[{arg.seq} / {arg.number_of_request}]"
+    name: str = req.name.get_or(str(seq))
+    log_prefix = f"[{seq} / {ctx.number_of_request.get_or('?')}]"
 
     logger.info_lv3(f"{log_prefix} {'-'*80}")
-    logger.info_lv3(f"{log_prefix}  {arg.seq}. {arg.req.name.get_or(arg.req.path)}")
+    logger.info_lv3(f"{log_prefix}  {seq}. {req.name.get_or(req.path)}")
     logger.info_lv3(f"{log_prefix} {'-'*80}")
 
-    path_str_one = arg.path_one.map(lambda x: re.sub(x.before, x.after, arg.req.path)).get_or(
-        arg.req.path
+    path_str_one = ctx.path_one.map(lambda x: re.sub(x.before, x.after, req.path)).get_or(req.path)
+    path_str_other = ctx.path_other.map(lambda x: re.sub(x.before, x.after, req.path)).get_or(
+        req.path
     )
-    path_str_other = arg.path_other.map(lambda x: re.sub(x.before, x.after, arg.req.path)).get_or(
-        arg.req.path
-    )
-    qs_str_one = create_query_string(arg.req.qs, arg.query_one, arg.req.url_encoding)
-    qs_str_other = create_query_string(arg.req.qs, arg.query_other, arg.req.url_encoding)
-    url_one = f"{arg.host_one}{path_str_one}?{qs_str_one}"
-    url_other = f"{arg.host_other}{path_str_other}?{qs_str_other}"
+    qs_str_one = create_query_string(req.qs, ctx.query_one, req.url_encoding)
+    qs_str_other = create_query_string(req.qs, ctx.query_other, req.url_encoding)
+    url_one = f"{ctx.host_one}{path_str_one}?{qs_str_one}"
+    url_other = f"{ctx.host_other}{path_str_other}?{qs_str_other}"
 
     # Get two responses
     req_time = now()
     try:
         logger.info_lv3(f"{log_prefix} One   URL:   {url_one}")
-        logger.debug(f"{log_prefix} One   PROXY: {arg.proxy_one.map(lambda x: x.to_dict()).get()}")
+        logger.debug(f"{log_prefix} One   PROXY: {ctx.proxy_one.map(lambda x: x.to_dict()).get()}")
 
         logger.info_lv3(f"{log_prefix} Other URL:   {url_other}")
         logger.debug(
-            f"{log_prefix} Other PROXY: {arg.proxy_other.map(lambda x: x.to_dict()).get()}"
+            f"{log_prefix} Other PROXY: {ctx.proxy_other.map(lambda x: x.to_dict()).get()}"
         )
 
-        if arg.req.headers:
-            logger.info_lv3(f"{log_prefix} Additional headers:   {arg.req.headers}")
-        if arg.req.raw.any():
-            logger.info_lv3(f"{log_prefix} raw:   {arg.req.raw.get()}")
-        if arg.req.form.any():
-            logger.info_lv3(f"{log_prefix} form:   {arg.req.form.get()}")
-        if arg.req.json.any():
-            logger.info_lv3(f"{log_prefix} json:   {arg.req.json.get()}")
+        if req.headers:
+            logger.info_lv3(f"{log_prefix} Additional headers:   {req.headers}")
+        if req.raw.any():
+            logger.info_lv3(f"{log_prefix} raw:   {req.raw.get()}")
+        if req.form.any():
+            logger.info_lv3(f"{log_prefix} form:   {req.form.get()}")
+        if req.json.any():
+            logger.info_lv3(f"{log_prefix} json:   {req.json.get()}")
 
+        request_begin = time.perf_counter()
         r_one, r_other = concurrent_request(
-            arg.session,
-            headers=arg.req.headers,
-            method=arg.req.method,
-            raw=arg.req.raw,
-            form=arg.req.form,
-            json_=arg.req.json,
+            challenge_session,
+            headers=req.headers,
+            method=req.method,
+            raw=req.raw,
+            form=req.form,
+            json_=req.json,
             url_one=url_one,
             url_other=url_other,
-            headers_one=arg.headers_one,
-            headers_other=arg.headers_other,
-            proxies_one=arg.proxy_one,
-            proxies_other=arg.proxy_other,
+            headers_one=ctx.headers_one,
+            headers_other=ctx.headers_other,
+            proxies_one=ctx.proxy_one,
+            proxies_other=ctx.proxy_other,
         )
+        timing.add(stages, "request", request_begin)
+        stages["request.one"] = r_one.elapsed.total_seconds()
+        stages["request.other"] = r_other.elapsed.total_seconds()
 
         logger.info_lv3(
             f"{log_prefix} One:   {r_one.status_code} / {to_sec(r_one.elapsed)}s / {len(r_one.content)}b / {r_one.headers.get('content-type')}"  # noqa
@@ -401,166 +536,171 @@ def challenge(arg_dict: dict) -> dict:
             f"{log_prefix} Other: {r_other.status_code} / {to_sec(r_other.elapsed)}s / {len(r_other.content)}b / {r_other.headers.get('content-type')}"  # noqa
         )
     except ConnectionError:
-        logger.info_lv1(f"{log_prefix} 💀 {arg.req.name.get()}")
+        logger.info_lv1(f"{log_prefix} 💀 {req.name.get()}")
         # TODO: Integrate logic into create_trial
         return Trial.from_dict(
             {
-                "seq": arg.seq,
+                "seq": seq,
                 "name": name,
                 "tags": [],
                 "request_time": req_time.isoformat(),
                 "status": "failure",
-                "method": arg.req.method,
-                "path": arg.req.path,
-                "queries": arg.req.qs,
-                "raw": arg.req.raw,
-                "form": arg.req.form,
-                "json": arg.req.json,
-                "headers": arg.req.headers,
+                "method": req.method,
+                "path": req.path,
+                "queries": req.qs,
+                "raw": req.raw,
+                "form": req.form,
+                "json": req.json,
+                "headers": req.headers,
                 "one": {"url": url_one, "type": "unknown"},
                 "other": {"url": url_other, "type": "unknown"},
             }
-        ).to_dict()
+        )
 
-    res2res_one_begin = now()
+    begin = time.perf_counter()
     res_one_payload: Res2ResAddOnPayload = res2res(
-        Response.from_requests(r_one, arg.default_response_encoding_one), arg.req
+        Response.from_requests(
+            r_one, ctx.default_response_encoding_one, challenge_encoding_detector
+        ),
+        req,
+        addons,
     )
     res_one = res_one_payload.response
-    logger.info_lv3(f"{log_prefix} ⏰ One   res2res:   {mill_seconds_until(res2res_one_begin)}ms")
+    log_elapsed(log_prefix, "One   res2res", timing.add(stages, "res2res.one", begin))
 
-    res2res_other_begin = now()
+    begin = time.perf_counter()
     res_other_payload: Res2ResAddOnPayload = res2res(
-        Response.from_requests(r_other, arg.default_response_encoding_other), arg.req
+        Response.from_requests(
+            r_other, ctx.default_response_encoding_other, challenge_encoding_detector
+        ),
+        req,
+        addons,
     )
     res_other = res_other_payload.response
-    logger.info_lv3(
-        f"{log_prefix} ⏰ Other   res2res:   {mill_seconds_until(res2res_other_begin)}ms"
-    )
+    log_elapsed(log_prefix, "Other   res2res", timing.add(stages, "res2res.other", begin))
 
-    res2dict_one_begin = now()
-    dict_one: TOption[DictOrList] = res2dict(res_one)
-    logger.info_lv3(f"{log_prefix} ⏰ One   res2dict:   {mill_seconds_until(res2dict_one_begin)}ms")
+    begin = time.perf_counter()
+    dict_one: TOption[DictOrList] = res2dict(res_one, addons)
+    log_elapsed(log_prefix, "One   res2dict", timing.add(stages, "res2dict.one", begin))
 
-    res2dict_other_begin = now()
-    dict_other: TOption[DictOrList] = res2dict(res_other)
-    logger.info_lv3(
-        f"{log_prefix} ⏰ Other   res2dict:   {mill_seconds_until(res2dict_other_begin)}ms"
-    )
+    begin = time.perf_counter()
+    dict_other: TOption[DictOrList] = res2dict(res_other, addons)
+    log_elapsed(log_prefix, "Other   res2dict", timing.add(stages, "res2dict.other", begin))
 
     # Create diff
-    # Either dict_one or dic_other is None, it means that it can't be analyzed, therefore return None
-    diff_diagnosis_begin = now()
-    ddiff = (
-        None
-        if dict_one.is_none() or dict_other.is_none()
-        else {}
-        if res_one.body == res_other.body
-        else DeepDiff(dict_one.get(), dict_other.get())
-    )
-    logger.info_lv3(
-        f"{log_prefix} ⏰ Diff diagnosis:   {mill_seconds_until(diff_diagnosis_begin)}ms"
-    )
-
-    initial_diffs_by_cognition: Optional[TDict[DiffKeys]] = (
-        TDict(
-            {
-                "unknown": DiffKeys.from_dict(
-                    {
-                        "changed": TList(
-                            ddiff.get("type_changes", {}).keys()
-                            | ddiff.get("values_changed", {}).keys()
-                        )
-                        .map(to_jumeaux_xpath)
-                        .order_by(lambda x: x),
-                        "added": TList(
-                            ddiff.get("dictionary_item_added", {})
-                            | ddiff.get("iterable_item_added", {}).keys()
-                        )
-                        .map(to_jumeaux_xpath)
-                        .order_by(lambda x: x),
-                        "removed": TList(
-                            ddiff.get("dictionary_item_removed", {})
-                            | ddiff.get("iterable_item_removed", {}).keys()
-                        )
-                        .map(to_jumeaux_xpath)
-                        .order_by(lambda x: x),
-                    }
-                )
-            }
-        )
-        if ddiff is not None
-        else None
+    begin = time.perf_counter()
+    initial_diffs_by_cognition: Optional[TDict[DiffKeys]] = diagnose_diffs(
+        res_one, res_other, dict_one, dict_other
     )
+    log_elapsed(log_prefix, "Diff diagnosis", timing.add(stages, "diff", begin))
 
     # Judgement
-    judgement_begin = now()
+    begin = time.perf_counter()
     status, diffs_by_cognition = judgement(
         res_one,
         res_other,
         dict_one,
         dict_other,
         name,
-        arg.req.path,
-        arg.req.qs,
-        arg.req.headers,
+        req.path,
+        req.qs,
+        req.headers,
         initial_diffs_by_cognition,
-        arg.judge_response_header,
-        arg.ignore_response_header_keys,
+        ctx.judge_response_header,
+        ctx.ignore_response_header_keys,
+        addons,
     )
-    logger.info_lv3(f"{log_prefix} ⏰ Judgement:   {mill_seconds_until(judgement_begin)}ms")
+    log_elapsed(log_prefix, "Judgement", timing.add(stages, "judgement", begin))
 
     status_symbol = "O" if status == Status.SAME else "X"
-    log_msg = f"{log_prefix} {status_symbol} ({res_one.status_code} - {res_other.status_code}) <{res_one.elapsed_sec}s - {res_other.elapsed_sec}s> {{{arg.req.method}}} {arg.req.name.get_or(arg.req.path)}"  # noqa
+    log_msg = f"{log_prefix} {status_symbol} ({res_one.status_code} - {res_other.status_code}) <{res_one.elapsed_sec}s - {res_other.elapsed_sec}s> {{{req.method}}} {req.name.get_or(req.path)}"  # noqa
     (logger.info_lv2 if status == Status.SAME else logger.info_lv1)(log_msg)
 
     # Store files
-    store_criterion_begin = now()
+    begin = time.perf_counter()
     file_one: Optional[str] = None
     file_other: Optional[str] = None
     prop_file_one: Optional[str] = None
     prop_file_other: Optional[str] = None
-    if store_criterion(status, name, arg.req, res_one, res_other):
-        dir = f"{arg.res_dir}/{arg.key}"
-        file_one = f"one/({arg.seq}){name}"
-        file_other = f"other/({arg.seq}){name}"
-        write_to_file(file_one, dir, dump(res_one))
-        write_to_file(file_other, dir, dump(res_other))
+    stored: bool = store_criterion(status, name, req, res_one, res_other, addons)
+    log_elapsed(log_prefix, "Store criterion", timing.add(stages, "store_criterion", begin))
+    begin = time.perf_counter()
+    if stored:
+        dir = f"{ctx.res_dir}/{ctx.key}"
+        content_addressed = ctx.store.map(lambda x: x.content_addressed).get_or(False)
+        compression = ctx.store.flat_map(lambda x: x.compression).map(lambda x: x.value).get()
+        writer: Optional[BackgroundWriter] = (
+            ctx.store.flat_map(lambda x: x.background_writer)
+            .map(lambda x: get_background_writer(x.queue_size, x.batch_size))
+            .get()
+        )
+        deferred_dump = ctx.store.map(lambda x: x.deferred_dump).get_or(False)
+        # Bodies are created in a writer thread if `writer` is specified (Timings of dump are lost)
+        dump_timings: Optional[Dict[str, float]] = None if writer else addons
+        file_one = store(
+            (lambda: res_one.body) if deferred_dump else (lambda: dump(res_one, dump_timings)),
+            dir=dir,
+            category="one",
+            name=f"({seq}){name}",
+            content_addressed=content_addressed,
+            compression=compression,
+            writer=writer,
+        )
+        file_other = store(
+            (lambda: res_other.body) if deferred_dump else (lambda: dump(res_other, dump_timings)),
+            dir=dir,
+            category="other",
+            name=f"({seq}){name}",
+            content_addressed=content_addressed,
+            compression=compression,
+            writer=writer,
+        )
         if not dict_one.is_none():
-            prop_file_one = f"one-props/({arg.seq}){name}.json"
-            write_to_file(
-                prop_file_one, dir, to_json(dict_one.get()).encode("utf-8", errors="replace")
+            prop_file_one = store(
+                lambda: to_json(dict_one.get()).encode("utf-8", errors="replace"),
+                dir=dir,
+                category="one-props",
+                name=f"({seq}){name}",
+                extension=".json",
+                content_addressed=content_addressed,
+                compression=compression,
+                writer=writer,
             )
         if not dict_other.is_none():
-            prop_file_other = f"other-props/({arg.seq}){name}.json"
-            write_to_file(
-                prop_file_other, dir, to_json(dict_other.get()).encode("utf-8", errors="replace")
+            prop_file_other = store(
+                lambda: to_json(dict_other.get()).encode("utf-8", errors="replace"),
+                dir=dir,
+                category="other-props",
+                name=f"({seq}){name}",
+                extension=".json",
+                content_addressed=content_addressed,
+                compression=compression,
+                writer=writer,
             )
-    logger.info_lv3(
-        f"{log_prefix} ⏰ Store criterion:   {mill_seconds_until(store_criterion_begin)}ms"
-    )
+        log_elapsed(log_prefix, "Store", timing.add(stages, "store", begin))
 
     # Did challenge
-    did_challenge_begin = now()
+    begin = time.perf_counter()
     payload = global_addon_executor.apply_did_challenge(
         DidChallengeAddOnPayload.from_dict(
             {
                 "trial": Trial.from_dict(
                     {
-                        "seq": arg.seq,
+                        "seq": seq,
                         "name": name,
-                        "tags": res_one_payload.tags.concat(
-                            res_other_payload.tags
-                        ).uniq(),  # TODO: tags created by reqs2reqs
+                        "tags": req.tags.get_or(TList())
+                        .concat(res_one_payload.tags)
+                        .concat(res_other_payload.tags)
+                        .uniq(),
                         "request_time": req_time.isoformat(),
                         "status": status,
-                        "method": arg.req.method,
-                        "path": arg.req.path,
-                        "queries": arg.req.qs,
-                        "raw": arg.req.raw,
-                        "form": arg.req.form,
-                        "json": arg.req.json,
-                        "headers": arg.req.headers,
+                        "method": req.method,
+                        "path": req.path,
+                        "queries": req.qs,
+                        "raw": req.raw,
+                        "form": req.form,
+                        "json": req.json,
+                        "headers": req.headers,
                         "diffs_by_cognition": diffs_by_cognition,
                         "one": {
                             "url": res_one.url,
@@ -574,7 +714,7 @@ def challenge(arg_dict: dict) -> dict:
                             "file": file_one,
                             "prop_file": prop_file_one,
                             "response_header": dict(res_one.headers)
-                            if arg.judge_response_header
+                            if ctx.judge_response_header
                             else None,
                         },
                         "other": {
@@ -589,7 +729,7 @@ def challenge(arg_dict: dict) -> dict:
                             "file": file_other,
                             "prop_file": prop_file_other,
                             "response_header": dict(res_other.headers)
-                            if arg.judge_response_header
+                            if ctx.judge_response_header
                             else None,
                         },
                     }
@@ -604,17 +744,31 @@ def challenge(arg_dict: dict) -> dict:
                 "res_other_props": dict_other,
             }
         ),
+        addons,
     )
-    logger.info_lv3(f"{log_prefix} ⏰ Did challenge:   {mill_seconds_until(did_challenge_begin)}ms")
+    log_elapsed(log_prefix, "Did challenge", timing.add(stages, "did_challenge", begin))
+    timing.add(stages, "total", challenge_begin)
 
-    return payload.trial.to_dict()
+    payload.trial.timings = TOption(
+        Timings.from_dict({"stages": timing.rounded(stages), "addons": timing.rounded(addons)})
+    )
+    return payload.trial
 
 
-def create_concurrent_executor(config: Config) -> Tuple[Any, Concurrency]:
+def create_concurrent_executor(
+    config: Config, context: ChallengeContext, writer_errors: Any
+) -> Tuple[Any, Concurrency]:
+    """
+    :param writer_errors: Queue to which worker processes report errors of their writers
+    """
     processes = config.processes.get()
     if processes:
         return (
-            futures.ProcessPoolExecutor(max_workers=processes),
+            futures.ProcessPoolExecutor(
+                max_workers=processes,
+                initializer=init_challenge_process,
+                initargs=(context, writer_errors),
+            ),
             Concurrency.from_dict({"processes": processes, "threads": 1}),
         )
 
@@ -625,25 +779,40 @@ def create_concurrent_executor(config: Config) -> Tuple[Any, Concurrency]:
     )
 
 
-def exec(config: Config, reqs: TList[Request], key: str, retry_hash: Optional[str]) -> Report:
-    # Provision
-    s = requests.Session()
-    s.mount("http://", HTTPAdapter(max_retries=config.max_retries))
-    s.mount("https://", HTTPAdapter(max_retries=config.max_retries))
+def exec(
+    config: Config,
+    reqs: Iterable[Request],
+    key: str,
+    retry_hash: Optional[str],
+    completed: Optional[Dict[int, journal.Entry]] = None,
+    start_time: Optional[datetime] = None,
+) -> Report:
+    """
+    :param completed: Journal entries of trials which have finished before by seq. (Resume)
+    :param start_time: Start time of the run which is resumed
+    """
+    compression_error: Optional[str] = (
+        config.output.store.flat_map(lambda x: x.compression)
+        .map(lambda x: check_compression(x.value))
+        .get()
+    )
+    if compression_error:
+        logger.error(compression_error, exit=True)
 
     make_dir(f"{config.output.response_dir}/{key}/one")
     make_dir(f"{config.output.response_dir}/{key}/other")
     make_dir(f"{config.output.response_dir}/{key}/one-props")
     make_dir(f"{config.output.response_dir}/{key}/other-props")
 
-    # Parse inputs to args of multi-thread executor.
-    ex_args = reqs.emap(
-        lambda x, i: {
-            "seq": i + 1,
-            "number_of_request": len(reqs),
+    # Requests are streamed unless a reqs2reqs add-on needs all of them (ex: shuffle)
+    number_of_request: Optional[int] = len(reqs) if isinstance(reqs, Sized) else None
+
+    # Values shared by all trials are created only once
+    context: ChallengeContext = ChallengeContext.from_dict(
+        {
+            "number_of_request": number_of_request,
             "key": key,
-            "session": s,
-            "req": x,
+            "max_retries": config.max_retries,
             "host_one": config.one.host,
             "host_other": config.other.host,
             "proxy_one": Proxy.from_host(config.one.proxy),
@@ -656,17 +825,41 @@ def exec(config: Config, reqs: TList[Request], key: str, retry_hash: Optional[st
             "headers_other": config.other.headers,
             "default_response_encoding_one": config.one.default_response_encoding,
             "default_response_encoding_other": config.other.default_response_encoding,
+            "encoding_detection": config.encoding_detection.get_or(EncodingDetection.from_dict({})),
+            "profile": config.profile,
             "res_dir": config.output.response_dir,
+            "store": config.output.store,
             "judge_response_header": config.judge_response_header,
             "ignore_response_header_keys": config.ignore_response_header_keys,
         }
-    ).to_dicts()
+    )
+    # For threads. Processes call it by themselves
+    if not config.processes.get():
+        init_challenge(context)
+    # Fingerprints of requests which are running, by seq (for the journal)
+    fingerprints: Dict[int, str] = {}
+
+    def to_tasks() -> Iterator[Tuple[int, Request]]:
+        resumed: int = 0
+        for i, req in enumerate(reqs):
+            seq, fingerprint = i + 1, journal.fingerprint(req)
+            if completed and seq in completed:
+                # Seqs of completed trials are meaningless if requests differ from the stopped run
+                if completed[seq].request != fingerprint:
+                    logger.error(RESUME_MISMATCH_MESSAGE.format(seq=seq), exit=True)
+                resumed += 1
+                continue
+            fingerprints[seq] = fingerprint
+            yield seq, req
+        if completed and resumed != len(completed):
+            logger.error(RESUME_MISMATCH_MESSAGE.format(seq=max(completed)), exit=True)
 
     # Challenge
     title = config.title.get_or("No title")
     description = config.description.get()
     tags = config.tags.get_or([])
-    executor, concurrency = create_concurrent_executor(config)
+    writer_errors = multiprocessing.SimpleQueue()
+    executor, concurrency = create_concurrent_executor(config, context, writer_errors)
 
     logger.info_lv1(
         f"""
@@ -682,11 +875,47 @@ def exec(config: Config, reqs: TList[Request], key: str, retry_hash: Optional[st
     """
     )
 
-    start_time = now()
-    with executor as ex:
-        trials = TList([r for r in ex.map(challenge, ex_args)]).map(Trial.from_dict)
+    start_time = start_time or now()
+    res_dir = f"{config.output.response_dir}/{key}"
+    if not completed:
+        journal.save_run(
+            res_dir,
+            journal.Run.from_dict(
+                {"config": config, "start_time": start_time.isoformat(), "retry_hash": retry_hash}
+            ),
+        )
+    new_trials: List[Trial] = []
+    with executor as ex, journal.Journal(res_dir) as jour:
+        # Not to read all requests before the first trial
+        window: int = (concurrency.processes * concurrency.threads) * 4
+        for t in map_in_order(ex, challenge, to_tasks(), window):
+            jour.append(t, fingerprints.pop(t.seq))
+            new_trials.append(t)
+    trials: TList[Trial] = (
+        TList(new_trials)
+        .concat([x.trial for x in (completed or {}).values()])
+        .order_by(lambda x: x.seq)
+    )
+    # Writers and profilers in child processes have been closed when they exited
+    close_background_writer()
+    child_writer_errors: List[str] = pop_child_writer_errors(writer_errors)
+    if child_writer_errors:
+        for message in child_writer_errors:
+            logger.error(f"Failed to store responses in a worker process: {message}")
+        logger.error("Some responses could not be stored.", exit=True)
+    if config.profile.any():
+        if challenge_profiler:
+            challenge_profiler.close()
+        for path in profiler.merge(res_dir, config.profile.get().top):
+            logger.info_lv1(f"Profile: {path}")
     end_time = now()
 
+    # Resumed trials have timings in the journal as well
+    timings_summary = timing.summarize(t.timings.get() for t in trials if t.timings.any())
+    if not config.output.trial_timings:
+        for t in trials:
+            t.timings = TOption(None)
+
     latest = f"{config.output.response_dir}/latest"
     if os.path.lexists(latest):
         os.remove(latest)
@@ -721,6 +950,8 @@ def exec(config: Config, reqs: TList[Request], key: str, retry_hash: Optional[st
             },
             "output": config.output.to_dict(),
             "concurrency": concurrency,
+            "timings": timings_summary,
+            "encoding_detection": config.encoding_detection.get(),
         }
     )
 
@@ -731,8 +962,9 @@ def exec(config: Config, reqs: TList[Request], key: str, retry_hash: Optional[st
             "title": title,
             "description": description,
             "notifiers": config.notifiers,
-            "summary": summary.to_dict(),
-            "trials": trials.to_dicts(),
+            # Objects are used as they are. (`from_dict` for each trial is expensive)
+            "summary": summary,
+            "trials": trials,
             "addons": config.addons.to_dict(),
             "retry_hash": retry_hash,
         }
@@ -741,11 +973,18 @@ def exec(config: Config, reqs: TList[Request], key: str, retry_hash: Optional[st
 
 def __run(
     config: Config,
-    origin_reqs: TList[Request],
+    origin_reqs: Iterable[Request],
     addon_executor: AddOnExecutor,
     hash: str,
     retry_hash: Optional[str],
+    reqs2reqs_cache_path: Optional[str] = None,
+    merge_with: Optional[Tuple[Report, List[int]]] = None,
+    resume_from: Optional[journal.Run] = None,
 ):
+    """
+    :param merge_with: Original report and seqs of its trials which `origin_reqs` are created from
+    :param resume_from: Run which has stopped. `hash` must be its key
+    """
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding=config.output.encoding)
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding=config.output.encoding)
 
@@ -768,29 +1007,172 @@ def __run(
     global_addon_executor = addon_executor
 
     # Requests
-    reqs: TList[Request] = addon_executor.apply_reqs2reqs(
-        Reqs2ReqsAddOnPayload.from_dict({"requests": origin_reqs}), config
-    ).requests
+    reqs: Iterable[Request] = (
+        stream_with_cache(
+            reqs2reqs_cache_path,
+            lambda: addon_executor.stream_reqs2reqs(origin_reqs, config),
+            "Requests transformed by reqs2reqs",
+        )
+        if reqs2reqs_cache_path
+        else addon_executor.stream_reqs2reqs(origin_reqs, config)
+    )
 
     # Execute
-    report = exec(config, reqs, hash, retry_hash)
+    res_dir = f"{config.output.response_dir}/{hash}"
+    report = (
+        exec(
+            config,
+            reqs,
+            hash,
+            retry_hash,
+            journal.load_entries(res_dir),
+            datetime.fromisoformat(resume_from.start_time),
+        )
+        if resume_from
+        else exec(config, reqs, hash, retry_hash)
+    )
+    if merge_with:
+        report = merge_reports(merge_with[0], report, merge_with[1])
 
     # Finalize
     addon_executor.apply_final(
         FinalAddOnPayload.from_dict({"report": report, "output_summary": config.output}),
         FinalAddOnReference.from_dict({"notifiers": config.notifiers}),
     )
+    # The run can't be resumed after final add-ons finish
+    journal.remove(res_dir)
 
 
 def hash_from_args(args_str: str) -> str:
     return hashlib.sha256((str(now()) + args_str).encode()).hexdigest()
 
 
-def retry(*, args: MergedArgs, report: str):
+def select_trials(
+    trials: TList[Trial],
+    statuses: TList[Status],
+    tags: TList[str],
+    path_regex: TOption[str],
+) -> TList[Trial]:
+    """Trials which match all of specified conditions. Empty conditions match any trials"""
+    pattern: Optional[Pattern] = path_regex.map(re.compile).get()
+    return trials.filter(
+        lambda x: (not statuses or x.status in statuses)
+        and (not tags or bool(set(x.tags) & set(tags)))
+        and (not pattern or bool(pattern.search(x.path)))
+    )
+
+
+def copy_response_files(trials: TList[Trial], src_dir: str, dst_dir: str):
+    for t in trials:
+        for f in [t.one.file, t.one.prop_file, t.other.file, t.other.prop_file]:
+            if f.is_none():
+                continue
+            src = os.path.join(src_dir, f.get())
+            dst = os.path.join(dst_dir, f.get())
+            # Files may be shared by trials if they are content addressed
+            if os.path.exists(src) and not os.path.exists(dst):
+                shutil.copy2(src, dst)
+
+
+def to_merged_file(file: str, seq: int, merged_seq: int) -> str:
+    """`one/(1)name` -> `one/(<merged_seq>)name`. Content addressed files are not renamed"""
+    category, name = file.split("/", 1)
+    prefix = f"({seq})"
+    return f"{category}/({merged_seq}){name[len(prefix):]}" if name.startswith(prefix) else file
+
+
+def rename_retried_files(trials: TList[Trial], merged_seqs: List[int], dir: str) -> TList[Trial]:
+    """Rename files of retried `trials` so that they are named by seqs in a merged report
+
+    Otherwise they could be confused with files of untouched trials which have the same names.
+    :return: Trials with `merged_seqs` and renamed files
+    """
+    renames: Dict[str, str] = {}
+
+    def to_merged(trial: Trial, merged_seq: int) -> Trial:
+        def to_merged_summary(res: ResponseSummary) -> ResponseSummary:
+            renamed: ResponseSummary = copy.copy(res)
+            for attr in ["file", "prop_file"]:
+                file: TOption[str] = getattr(res, attr)
+                if file.is_none():
+                    continue
+                dst = to_merged_file(file.get(), trial.seq, merged_seq)
+                if dst != file.get():
+                    renames[file.get()] = dst
+                    setattr(renamed, attr, TOption(dst))
+            return renamed
+
+        merged: Trial = copy.copy(trial)
+        merged.seq = merged_seq
+        merged.one = to_merged_summary(trial.one)
+        merged.other = to_merged_summary(trial.other)
+        return merged
+
+    merged_trials = TList([to_merged(t, s) for t, s in zip(trials, merged_seqs)])
+
+    # In 2 steps because a new name can be an old name of another file
+    existing = {src: dst for src, dst in renames.items() if os.path.exists(os.path.join(dir, src))}
+    for src in existing:
+        os.rename(os.path.join(dir, src), os.path.join(dir, f"{src}.merging"))
+    for src, dst in existing.items():
+        os.rename(os.path.join(dir, f"{src}.merging"), os.path.join(dir, dst))
+
+    return merged_trials
+
+
+def merge_reports(origin: Report, retried: Report, retried_seqs: List[int]) -> Report:
+    """Replace trials of `origin` whose seqs are `retried_seqs` with trials of `retried`
+
+    Files of retried trials are renamed by their seqs in `origin`,
+    and files of the other trials are copied to the directory of `retried`.
+    """
+    retried_dir = os.path.join(retried.summary.output.response_dir, retried.key)
+    retried_by_seq: Dict[int, Trial] = {
+        t.seq: t for t in rename_retried_files(retried.trials, retried_seqs, retried_dir)
+    }
+    untouched: TList[Trial] = origin.trials.reject(lambda x: x.seq in retried_by_seq)
+    copy_response_files(
+        untouched,
+        os.path.join(origin.summary.output.response_dir, origin.key),
+        retried_dir,
+    )
+
+    merged: Report = copy.copy(retried)
+    merged.trials = origin.trials.map(lambda x: retried_by_seq.get(x.seq, x))
+    merged.summary = copy.copy(retried.summary)
+    merged.summary.status = StatusCounts.from_dict(
+        merged.trials.group_by(lambda x: x.status.value).map_values(len).to_dict()
+    )
+    # `timings` are left as they are since they are of the retried trials that actually ran
+    # Requests of trials have been transformed by reqs2reqs add-ons already
+    merged.addons = origin.addons
+    return merged
+
+
+def retry(
+    *,
+    args: MergedArgs,
+    report: str,
+    statuses: TList[Status] = TList(),
+    trial_tags: TList[str] = TList(),
+    path_regex: TOption[str] = TOption(None),
+    merge: bool = False,
+):
     report: Report = Report.from_jsonf(report, force_cast=True)
     config: Config = merge_args2config(args, create_config_from_report(report))
+    if merge:
+        # Not to transform requests twice and to keep the correspondence to original trials
+        config = Config.from_dict(
+            {**config.to_dict(), "addons": {**config.addons.to_dict(), "reqs2reqs": []}}
+        )
     addon_executor = AddOnExecutor(config.addons)
-    origin_reqs: TList[Request] = report.trials.map(
+
+    trials: TList[Trial] = select_trials(report.trials, statuses, trial_tags, path_regex)
+    logger.info_lv1(f"Retry {len(trials)} of {len(report.trials)} trials")
+    if not trials:
+        logger.warning("There are no trials to retry.")
+
+    origin_reqs: TList[Request] = trials.map(
         lambda x: Request.from_dict(
             {
                 "path": x.path,
@@ -803,7 +1185,126 @@ def retry(*, args: MergedArgs, report: str):
             }
         )
     )
-    __run(config, origin_reqs, addon_executor, hash_from_args(args.to_json()), report.key)
+    __run(
+        config,
+        origin_reqs,
+        addon_executor,
+        hash_from_args(args.to_json()),
+        report.key,
+        merge_with=(report, [x.seq for x in trials]) if merge else None,
+    )
+
+
+def stream_file(file: str, config: Config, log2reqs: Log2ReqsExecutor) -> Iterable[Request]:
+    def create() -> Iterable[Request]:
+        return log2reqs.stream(Log2ReqsAddOnPayload.from_dict({"file": file}))
+
+    if config.request_cache.is_none():
+        return create()
+
+    cache: RequestCache = config.request_cache.get()
+    return stream_with_cache(
+        to_cache_path(
+            cache.dir,
+            fingerprint(file, cache.use_content_hash),
+            config.addons.log2reqs.to_dict(),
+        ),
+        create,
+        f"Requests of {file}",
+    )
+
+
+def log_loaded(file: str, count: int, elapsed_sec: float):
+    logger.info_lv1(f"[log2reqs] Loaded {count} requests from {file} in {elapsed_sec:.2f} sec")
+
+
+def stream_file_with_log(
+    file: str, config: Config, log2reqs: Log2ReqsExecutor
+) -> Iterator[Request]:
+    start = time.perf_counter()
+    count = 0
+    for r in stream_file(file, config, log2reqs):
+        count += 1
+        yield r
+    log_loaded(file, count, time.perf_counter() - start)
+
+
+# Set in each process by `init_log2reqs_worker`
+worker_log2reqs: Optional[Log2ReqsExecutor] = None
+worker_config: Optional[Config] = None
+
+
+def init_log2reqs_worker(config: Config):
+    global worker_log2reqs, worker_config
+    worker_log2reqs = create_addon(config.addons.log2reqs, "log2reqs")
+    worker_config = config
+
+
+def load_file(file: str) -> Tuple[List[Request], float]:
+    start = time.perf_counter()
+    requests: List[Request] = list(stream_file(file, worker_config, worker_log2reqs))
+    return requests, time.perf_counter() - start
+
+
+def stream_files_in_processes(
+    files: TList[str], config: Config, parallel: Log2ReqsParallel
+) -> Iterator[Request]:
+    """Load files in processes and yield requests in the order of `files`"""
+    processes: int = parallel.processes.get_or(os.cpu_count() or 1)
+    with futures.ProcessPoolExecutor(
+        max_workers=processes, initializer=init_log2reqs_worker, initargs=(config,)
+    ) as ex:
+        # Not to hold requests of all files in memory before they are consumed
+        for file, (requests, elapsed_sec) in zip(
+            files, map_in_order(ex, load_file, files, processes)
+        ):
+            log_loaded(file, len(requests), elapsed_sec)
+            yield from requests
+
+
+def stream_files(
+    files: TList[str], config: Config, log2reqs: Log2ReqsExecutor
+) -> Iterator[Request]:
+    """Files are read lazily when requests are consumed"""
+    if config.log2reqs_parallel.any() and len(files) > 1:
+        return stream_files_in_processes(files, config, config.log2reqs_parallel.get())
+    return itertools.chain.from_iterable(stream_file_with_log(f, config, log2reqs) for f in files)
+
+
+def to_reqs2reqs_cache_path(config: Config) -> Optional[str]:
+    cache: Optional[RequestCache] = config.request_cache.get()
+    if not cache or not cache.reqs2reqs:
+        return None
+    return to_cache_path(
+        cache.dir,
+        [fingerprint(f, cache.use_content_hash) for f in config.input_files.get()],
+        config.addons.log2reqs.to_dict(),
+        config.addons.reqs2reqs.to_dicts(),
+    )
+
+
+def resume(*, key: str, response_dir: str):
+    res_dir = f"{response_dir}/{key}"
+    run: Optional[journal.Run] = journal.load_run(res_dir)
+    if not run:
+        logger.error(f"There is no run to resume in {res_dir}.", exit=True)
+    if run.retry_hash.any():
+        logger.error("A run by `jumeaux retry` can't be resumed. Please retry again.", exit=True)
+
+    config: Config = run.config
+    addon_executor = AddOnExecutor(config.addons)
+    origin_reqs: Iterator[Request] = stream_files(
+        config.input_files.get(), config, addon_executor.log2reqs
+    )
+    __run(
+        config,
+        origin_reqs,
+        addon_executor,
+        key,
+        None,
+        to_reqs2reqs_cache_path(config),
+        resume_from=run,
+    )
 
 
 def run(
@@ -818,7 +1319,14 @@ def run(
     )
 
     addon_executor = AddOnExecutor(config.addons)
-    origin_reqs: TList[Request] = config.input_files.get().flat_map(
-        lambda f: addon_executor.apply_log2reqs(Log2ReqsAddOnPayload.from_dict({"file": f}))
+    origin_reqs: Iterator[Request] = stream_files(
+        config.input_files.get(), config, addon_executor.log2reqs
+    )
+    __run(
+        config,
+        origin_reqs,
+        addon_executor,
+        hash_from_args(args.to_json()),
+        None,
+        to_reqs2reqs_cache_path(config),
     )
-    __run(config, origin_reqs, addon_executor, hash_from_args(args.to_json()), None)
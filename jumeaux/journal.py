@@ -0,0 +1,137 @@
+# -*- coding:utf-8 -*-
+
+"""Record progress of a run in `<response_dir>/<key>` so that it can be resumed
+
+`run.json` has a config of the run and `journal.jsonl` has a trial per line in order of completion.
+Each line also has a fingerprint of the request to detect that requests changed when resuming.
+Both are removed after the run finishes.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+from owlmixin import OwlMixin, TOption
+from owlmixin.errors import OwlMixinError
+
+from jumeaux.domain.config.vo import Config
+from jumeaux.logger import Logger
+from jumeaux.models import Request, Trial
+
+logger: Logger = Logger(__name__)
+LOG_PREFIX = "[journal]"
+
+RUN_FILE = "run.json"
+JOURNAL_FILE = "journal.jsonl"
+
+
+class Run(OwlMixin):
+    config: Config
+    start_time: str
+    retry_hash: TOption[str]
+
+
+class Entry(OwlMixin):
+    # `fingerprint` of the request
+    request: str
+    trial: Trial
+
+
+def fingerprint(req: Request) -> str:
+    return hashlib.sha256(
+        json.dumps(req.to_dict(), ensure_ascii=False, sort_keys=True).encode("utf8")
+    ).hexdigest()
+
+
+def truncate_broken_line(path: str):
+    """Remove the last line if it was not written completely (ex: killed while writing)"""
+    if not os.path.exists(path):
+        return
+
+    with open(path, "rb+") as f:
+        pos = f.seek(0, os.SEEK_END)
+        while pos > 0:
+            size = min(4096, pos)
+            pos -= size
+            f.seek(pos)
+            newline = f.read(size).rfind(b"\n")
+            if newline >= 0:
+                f.truncate(pos + newline + 1)
+                return
+        f.truncate(0)
+
+
+class Journal:
+    """Append trials to `journal.jsonl` one by one"""
+
+    def __init__(self, dir: str):
+        path = os.path.join(dir, JOURNAL_FILE)
+        # Not to append a trial to a broken line
+        truncate_broken_line(path)
+        self.file = open(path, "a", encoding="utf8")
+
+    def append(self, trial: Trial, request_fingerprint: str):
+        self.file.write(
+            json.dumps(
+                {"request": request_fingerprint, "trial": trial.to_dict()}, ensure_ascii=False
+            )
+            + "\n"
+        )
+        # Not to lose trials which have finished if the process is killed
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def save_run(dir: str, run: Run):
+    run.to_jsonf(os.path.join(dir, RUN_FILE), encoding="utf8")
+
+
+def load_run(dir: str) -> Optional[Run]:
+    path = os.path.join(dir, RUN_FILE)
+    return Run.from_jsonf(path, encoding="utf8") if os.path.exists(path) else None
+
+
+def exists_files(trial: Trial, dir: str) -> bool:
+    return all(
+        os.path.exists(os.path.join(dir, f.get()))
+        for f in [trial.one.file, trial.one.prop_file, trial.other.file, trial.other.prop_file]
+        if f.any()
+    )
+
+
+def load_entries(dir: str) -> Dict[int, Entry]:
+    """Trials which have finished completely
+
+    A trial is ignored if the last line is broken or files of the trial were not written yet.
+    """
+    path = os.path.join(dir, JOURNAL_FILE)
+    if not os.path.exists(path):
+        return {}
+
+    entries: Dict[int, Entry] = {}
+    with open(path, encoding="utf8") as f:
+        for i, line in enumerate(f, 1):
+            try:
+                entry: Entry = Entry.from_dict(json.loads(line))
+            except (ValueError, OwlMixinError):
+                logger.warning(f"{LOG_PREFIX} Skip a broken line {i} in {path}")
+                continue
+            if exists_files(entry.trial, dir):
+                entries[entry.trial.seq] = entry
+    return entries
+
+
+def remove(dir: str):
+    for f in [JOURNAL_FILE, RUN_FILE]:
+        path = os.path.join(dir, f)
+        if os.path.exists(path):
+            os.remove(path)
@@ -1,8 +1,14 @@
 # -*- coding: utf-8 -*-
+import codecs
+import copy
 import datetime
-from typing import Optional, List, Any
+import json
+import uuid
+from typing import Optional, List, Any, Iterator, Dict, Tuple
+from urllib.parse import urlparse
 
 from owlmixin import OwlMixin, TOption, TList, TDict, OwlEnum
+from requests.compat import chardet
 from requests.structures import CaseInsensitiveDict as RequestsCaseInsensitiveDict
 from requests_toolbelt.utils import deprecated
 
@@ -14,6 +20,9 @@ from jumeaux.domain.config.vo import (
     Concurrency,
     OutputSummary,
     Notifier,
+    ResponseStore,
+    EncodingDetection,
+    Profile,
 )
 
 DictOrList = any  # type: ignore
@@ -53,6 +62,8 @@ class Request(OwlMixin):
     json: TOption[dict]
     headers: TDict[str] = {}
     url_encoding: str = "utf-8"
+    # Added to tags of a trial (ex: tags by reqs2reqs add-ons)
+    tags: TOption[TList[str]]
 
 
 class Proxy(OwlMixin):
@@ -68,6 +79,68 @@ class Proxy(OwlMixin):
         )
 
 
+class EncodingDetector:
+    """Detect encodings of bodies without a charset only by their first `max_bytes` bytes
+
+    Guessed encodings are cached by (host, content-type) if `cache` is True
+    because guessing is much slower than decoding.
+    Only confident guesses except for ascii are cached (ascii can't tell about later bodies),
+    and a cached encoding is guessed again if it can't decode a body.
+    """
+
+    # Minimum confidence of chardet to cache a guessed encoding
+    CACHE_CONFIDENCE = 0.9
+
+    def __init__(self, max_bytes: Optional[int] = None, cache: bool = False):
+        self.max_bytes: Optional[int] = max_bytes
+        self.guessed: Optional[Dict[Tuple[str, Optional[str]], str]] = {} if cache else None
+
+    @classmethod
+    def from_config(cls, config: EncodingDetection) -> "EncodingDetector":
+        return cls(config.max_bytes, config.cache)
+
+    def head(self, content: bytes) -> bytes:
+        return content if self.max_bytes is None else content[: self.max_bytes]
+
+    def _guess(self, content: bytes) -> Tuple[Optional[str], float]:
+        """
+        :return: (encoding, confidence)
+        """
+        # Same as `requests.Response.apparent_encoding` but only for the head
+        if chardet is None:
+            return "utf-8", 0
+        head: bytes = self.head(content)
+        detected = chardet.detect(head)
+        # A multibyte character cut at the end of the head can make detection fail
+        for i in range(1, 4 if len(head) < len(content) else 0):
+            if detected["encoding"]:
+                break
+            detected = chardet.detect(head[:-i])
+        return detected["encoding"], detected["confidence"] or 0
+
+    def _decodable(self, content: bytes, encoding: str) -> bool:
+        try:
+            # Not final because the head may end in the middle of a character
+            codecs.getincrementaldecoder(encoding)().decode(self.head(content), final=False)
+            return True
+        except (UnicodeDecodeError, LookupError):
+            return False
+
+    def guess(self, res: Any) -> Optional[str]:
+        if self.guessed is None:
+            return self._guess(res.content)[0]
+
+        key = (urlparse(res.url).netloc, res.headers.get("content-type"))
+        cached: Optional[str] = self.guessed.get(key)
+        if cached and self._decodable(res.content, cached):
+            return cached
+
+        encoding, confidence = self._guess(res.content)
+        if encoding and encoding.lower() != "ascii" and confidence >= self.CACHE_CONFIDENCE:
+            self.guessed[key] = encoding
+        return encoding
+
+
 class Response(OwlMixin):
     body: bytes
     encoding: TOption[str]
@@ -78,10 +151,18 @@ class Response(OwlMixin):
     elapsed_sec: float
     type: str
 
+    @property
+    def _dict(self):
+        # Exclude a memoized text from `to_dict`
+        return {k: v for k, v in self.__dict__.items() if k != "_text"}
+
     @property
     def text(self) -> str:
-        # Refer https://github.com/requests/requests/blob/e4fc3539b43416f9e9ba6837d73b1b7392d4b242/requests/models.py#L831
-        return self.body.decode(self.encoding.get_or("utf8"), errors="replace")
+        # Decoded only once because add-ons may refer it many times
+        if "_text" not in self.__dict__:
+            # Refer https://github.com/requests/requests/blob/e4fc3539b43416f9e9ba6837d73b1b7392d4b242/requests/models.py#L831
+            self._text: str = self.body.decode(self.encoding.get_or("utf8"), errors="replace")
+        return self._text
 
     @property
     def byte(self) -> int:
@@ -107,10 +188,25 @@ class Response(OwlMixin):
     def ___headers(cls, v):
         return CaseInsensitiveDict(v)
 
+    def copy_with(self, **values) -> "Response":
+        """Copy with `values` without `from_dict`. Unchanged values are shared with the original."""
+        copied: Response = copy.copy(self)
+        for k, v in values.items():
+            setattr(copied, k, v)
+        if "body" in values or "encoding" in values:
+            copied.__dict__.pop("_text", None)
+        return copied
+
     @classmethod
     def _decide_encoding(
-        cls, res: Any, default_encoding: TOption[str] = TOption(None)
+        cls,
+        res: Any,
+        default_encoding: TOption[str] = TOption(None),
+        detector: Optional[EncodingDetector] = None,
     ) -> Optional[str]:
+        """
+        :param detector: A whole body is used to detect an encoding if None
+        """
         content_type = res.headers.get("content-type")
 
         if content_type and "octet-stream" in content_type:
@@ -119,10 +215,14 @@ class Response(OwlMixin):
         if res.encoding and not ("text" in content_type and res.encoding == "ISO-8859-1"):
             return res.encoding
 
-        meta_encodings: List[str] = deprecated.get_encodings_from_content(res.content)
-        return (
-            meta_encodings[0] if meta_encodings else default_encoding.get() or res.apparent_encoding
+        meta_encodings: List[str] = deprecated.get_encodings_from_content(
+            detector.head(res.content) if detector else res.content
         )
+        if meta_encodings:
+            return meta_encodings[0]
+        if default_encoding.get():
+            return default_encoding.get()
+        return detector.guess(res) if detector else res.apparent_encoding
 
     @classmethod
     def _to_type(cls, res: Any) -> str:
@@ -132,8 +232,13 @@ class Response(OwlMixin):
         return content_type.split(";")[0].split("/")[1]
 
     @classmethod
-    def from_requests(cls, res: Any, default_encoding: TOption[str] = TOption(None)) -> "Response":
-        encoding: Optional[str] = cls._decide_encoding(res, default_encoding)
+    def from_requests(
+        cls,
+        res: Any,
+        default_encoding: TOption[str] = TOption(None),
+        detector: Optional[EncodingDetector] = None,
+    ) -> "Response":
+        encoding: Optional[str] = cls._decide_encoding(res, default_encoding, detector)
         type: str = cls._to_type(res)
         return Response.from_dict(
             {
@@ -152,12 +257,13 @@ class Response(OwlMixin):
 # --------
 
 
-class ChallengeArg(OwlMixin):
-    seq: int
-    number_of_request: int
+class ChallengeContext(OwlMixin):
+    """Values shared by all trials in a run"""
+
+    # None if requests are streamed
+    number_of_request: TOption[int]
     key: str
-    session: object
-    req: Request
+    max_retries: int
     host_one: str
     host_other: str
     path_one: TOption[PathReplace]
@@ -170,7 +276,10 @@ class ChallengeArg(OwlMixin):
     headers_other: TDict[str]
     default_response_encoding_one: TOption[str]
     default_response_encoding_other: TOption[str]
+    encoding_detection: EncodingDetection
+    profile: TOption[Profile]
     res_dir: str
+    store: TOption[ResponseStore]
     judge_response_header: bool
     ignore_response_header_keys: TList[str]
 
@@ -190,6 +299,31 @@ class Time(OwlMixin):
     elapsed_sec: int
 
 
+class Timings(OwlMixin):
+    """Seconds of a trial"""
+
+    # By stage (ex: res2dict.one)
+    stages: TDict[float] = {}
+    # By add-on (ex: res2dict/json). The sum if it is applied twice or more in a trial.
+    addons: TDict[float] = {}
+
+
+class TimingStats(OwlMixin):
+    """Seconds of trials"""
+
+    count: int
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+
+class TimingsSummary(OwlMixin):
+    stages: TDict[TimingStats] = {}
+    addons: TDict[TimingStats] = {}
+
+
 class Summary(OwlMixin):
     one: AccessPoint
     other: AccessPoint
@@ -199,6 +333,9 @@ class Summary(OwlMixin):
     concurrency: Concurrency
     output: OutputSummary
     default_encoding: TOption[str]
+    timings: TOption[TimingsSummary]
+    # Used in retry
+    encoding_detection: TOption[EncodingDetection]
 
 
 class DiffKeys(OwlMixin):
@@ -247,6 +384,8 @@ class Trial(OwlMixin):
     status: Status
     # `None` is not same as `{}`. `{}` means no diffs, None means unknown
     diffs_by_cognition: TOption[TDict[DiffKeys]]
+    # Only if `output.trial_timings` is true
+    timings: TOption[Timings]
 
 
 class Report(OwlMixin):
@@ -262,6 +401,45 @@ class Report(OwlMixin):
     addons: TOption[Addons]
     retry_hash: TOption[str]
 
+    def iter_json(self, indent: Optional[int] = None) -> Iterator[str]:
+        """Same as `to_json(indent=indent)` but serialize trials one by one.
+
+        It doesn't create a whole json string or dict of the report at once. (Memory efficient)
+        """
+
+        def dump(value: Any) -> str:
+            return json.dumps(
+                value, indent=indent, ensure_ascii=False, sort_keys=True, separators=(",", ": ")
+            )
+
+        # Trials are the second depth (in the root object)
+        trial_separator = "," if indent is None else ",\n" + " " * indent * 2
+        trials_begin = "[" if indent is None else "[\n" + " " * indent * 2
+        trials_end = "]" if indent is None else "\n" + " " * indent + "]"
+
+        placeholder = f"<<<trials-{uuid.uuid4()}>>>"
+        head, tail = dump(
+            {
+                **TDict({k: v for k, v in vars(self).items() if k != "trials"}).to_dict(),
+                "trials": placeholder,
+            }
+        ).split(dump(placeholder))
+
+        yield head
+        if not self.trials:
+            yield "[]"
+        else:
+            yield trials_begin
+            for i, trial in enumerate(self.trials):
+                if i > 0:
+                    yield trial_separator
+                trial_json = dump(trial.to_dict())
+                yield trial_json if indent is None else trial_json.replace(
+                    "\n", "\n" + " " * indent * 2
+                )
+            yield trials_end
+        yield tail
+
 
 # ---
 
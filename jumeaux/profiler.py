@@ -0,0 +1,152 @@
+# -*- coding:utf-8 -*-
+
+"""Profile trials with cProfile (and tracemalloc) for `--profile`
+
+cProfile measures only the thread which enables it, so each worker thread has its own profiler
+which is enabled only while it runs a sampled trial.
+Stats of each process are written in `<response_dir>/<key>/profile` when it finishes trials,
+and merged into `profile.pstats`, `profile.txt` (and `profile-memory.txt`) at the end of a run.
+"""
+
+import cProfile
+import glob
+import io
+import multiprocessing.util
+import os
+import pstats
+import shutil
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from jumeaux.domain.config.vo import Profile
+from jumeaux.logger import Logger
+
+logger: Logger = Logger(__name__)
+LOG_PREFIX = "[profile]"
+
+PROCESSES_DIR = "profile"
+STATS_FILE = "profile.pstats"
+SUMMARY_FILE = "profile.txt"
+MEMORY_FILE = "profile-memory.txt"
+
+# Not to count allocations for profiling itself and imports
+MEMORY_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, pstats.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+class TrialProfiler:
+    """Profilers of trials in the current process"""
+
+    def __init__(self, profile: Profile, dir: str):
+        self.profile = profile
+        self.dir = os.path.join(dir, PROCESSES_DIR)
+        self.local = threading.local()
+        self.profilers: List[cProfile.Profile] = []
+        self.lock = threading.Lock()
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        if profile.memory:
+            tracemalloc.start()
+            self.snapshot = tracemalloc.take_snapshot()
+
+    def sampled(self, seq: int) -> bool:
+        return seq % max(1, self.profile.every) == 0
+
+    @contextmanager
+    def trial(self, seq: int) -> Iterator[None]:
+        if not self.profile.cpu or not self.sampled(seq):
+            yield
+            return
+
+        profiler: Optional[cProfile.Profile] = getattr(self.local, "profiler", None)
+        if profiler is None:
+            profiler = cProfile.Profile()
+            self.local.profiler = profiler
+            with self.lock:
+                self.profilers.append(profiler)
+
+        enabled = True
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows only one active profiler at the same time
+            enabled = False
+            logger.debug(f"{LOG_PREFIX} Skip a trial ({seq}) because another one is profiled")
+        try:
+            yield
+        finally:
+            if enabled:
+                profiler.disable()
+
+    def close(self):
+        """Write stats of this process. Nothing is written if no trials are profiled"""
+        os.makedirs(self.dir, exist_ok=True)
+        pid = os.getpid()
+
+        # Before creating stats of cProfile not to count them
+        if self.snapshot is not None:
+            begin = self.snapshot.filter_traces(MEMORY_FILTERS)
+            end = tracemalloc.take_snapshot().filter_traces(MEMORY_FILTERS)
+            tracemalloc.stop()
+            self.snapshot = None
+            with open(os.path.join(self.dir, f"{pid}.memory.txt"), "w", encoding="utf8") as f:
+                f.write(f"# Process {pid}\n")
+                f.writelines(f"{x}\n" for x in end.compare_to(begin, "lineno")[: self.profile.top])
+
+        with self.lock:
+            profilers, self.profilers = self.profilers, []
+        if profilers:
+            stats = pstats.Stats(profilers[0])
+            for p in profilers[1:]:
+                stats.add(p)
+            stats.dump_stats(os.path.join(self.dir, f"{pid}.pstats"))
+
+
+def create_profiler(profile: Profile, dir: str) -> TrialProfiler:
+    """A profiler in a child process is closed when the process exits."""
+    profiler = TrialProfiler(profile, dir)
+    if multiprocessing.parent_process() is not None:
+        multiprocessing.util.Finalize(profiler, profiler.close, exitpriority=10)
+    return profiler
+
+
+def merge(dir: str, top: int) -> List[str]:
+    """Merge stats of all processes into files in `dir`
+
+    :return: Paths of merged files
+    """
+    processes_dir = os.path.join(dir, PROCESSES_DIR)
+    stats_files = sorted(glob.glob(os.path.join(processes_dir, "*.pstats")))
+    memory_files = sorted(glob.glob(os.path.join(processes_dir, "*.memory.txt")))
+
+    merged: List[str] = []
+    if stats_files:
+        stats_path = os.path.join(dir, STATS_FILE)
+        pstats.Stats(*stats_files).dump_stats(stats_path)
+        merged.append(stats_path)
+
+        summary_path = os.path.join(dir, SUMMARY_FILE)
+        with open(summary_path, "w", encoding="utf8") as f:
+            for sort_key in ["cumulative", "tottime"]:
+                stream = io.StringIO()
+                pstats.Stats(stats_path, stream=stream).sort_stats(sort_key).print_stats(top)
+                f.write(f"# Top {top} functions by {sort_key}\n{stream.getvalue()}\n")
+        merged.append(summary_path)
+
+    if memory_files:
+        memory_path = os.path.join(dir, MEMORY_FILE)
+        with open(memory_path, "w", encoding="utf8") as f:
+            f.write(f"# Top {top} lines of memory increased during trials\n\n")
+            for path in memory_files:
+                with open(path, encoding="utf8") as m:
+                    f.write(m.read() + "\n")
+        merged.append(memory_path)
+
+    shutil.rmtree(processes_dir, ignore_errors=True)
+    return merged
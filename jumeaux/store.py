@@ -0,0 +1,268 @@
+# -*- coding:utf-8 -*-
+
+"""Write responses and props to `<response_dir>/<key>`
+
+Returned paths are relative to `<response_dir>/<key>` and are used as `ResponseSummary.file`
+or `ResponseSummary.prop_file`.
+Compressed files have an extension of their compression (ex: `.gz`) and `read` decompresses them.
+"""
+
+import gzip
+import hashlib
+import multiprocessing
+import multiprocessing.util
+import os
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Union
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+Body = Union[bytes, Callable[[], bytes]]
+
+EXTENSIONS_BY_COMPRESSION = {"gzip": ".gz", "zstd": ".zst"}
+CONTENT_ENCODINGS_BY_EXTENSION = {".gz": "gzip", ".zst": "zstd"}
+
+
+def check_compression(compression: Optional[str]) -> Optional[str]:
+    """
+    :return: An error message if `compression` is unavailable
+    """
+    if compression == "zstd" and zstandard is None:
+        return "`zstandard` is required to use zstd compression. (pip install zstandard)"
+    return None
+
+
+def compress(body: bytes, compression: Optional[str]) -> bytes:
+    if compression is None:
+        return body
+    if compression == "gzip":
+        # mtime=0 makes outputs of the same body identical
+        return gzip.compress(body, mtime=0)
+    if compression == "zstd":
+        return zstandard.ZstdCompressor().compress(body)
+    raise ValueError(f"{compression} is an unsupported compression.")
+
+
+def decompress(body: bytes, path: str) -> bytes:
+    if path.endswith(".gz"):
+        return gzip.decompress(body)
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(check_compression("zstd"))
+        return zstandard.ZstdDecompressor().decompress(body)
+    return body
+
+
+def content_encoding_of(path: str) -> Optional[str]:
+    """Content-Encoding which is used when a stored file is served as is"""
+    return CONTENT_ENCODINGS_BY_EXTENSION.get(os.path.splitext(path)[1])
+
+
+def read(path: str) -> bytes:
+    """Read a stored file and decompress if it is compressed"""
+    with open(path, "rb") as f:
+        return decompress(f.read(), path)
+
+
+def resolve(body: Body) -> bytes:
+    return body() if callable(body) else body
+
+
+def to_digest(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+def write_atomically(path: str, body: bytes):
+    """Rename atomically not to expose a half-written file to another thread or process
+
+    A file which exists is complete even if the process is killed while writing. (Resume)
+    """
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+
+
+def write_to_file(name: str, dir: str, body: bytes):
+    write_atomically(f"{dir}/{name}", body)
+
+
+def write_to_file_once(name: str, dir: str, body: bytes):
+    """Skip if the file already exists. (Files are named by their digests)"""
+    path = f"{dir}/{name}"
+    if os.path.exists(path):
+        return
+    write_atomically(path, body)
+
+
+def write(file: str, dir: str, body: Body, compression: Optional[str], once: bool):
+    data: bytes = compress(resolve(body), compression)
+    if once:
+        write_to_file_once(file, dir, data)
+    else:
+        write_to_file(file, dir, data)
+
+
+class BackgroundWriter:
+    """Write files in a dedicated thread instead of the threads which call `put`
+
+    `put` blocks while the queue is full so that memory usage is bounded. (backpressure)
+    Errors in the writer thread are raised by `flush` or `close`, and by `put` after they occur.
+    """
+
+    def __init__(self, queue_size: int, batch_size: int):
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.batch_size: int = batch_size
+        self.queued_once: Set[str] = set()
+        self.lock = threading.Lock()
+        self.error: Optional[BaseException] = None
+        self.thread = threading.Thread(target=self._run, name="jumeaux-writer", daemon=True)
+        self.thread.start()
+
+    def put(self, file: str, dir: str, body: Body, compression: Optional[str], once: bool):
+        # Not to go on a run whose responses can't be stored
+        if self.error is not None:
+            raise self.error
+        if once:
+            with self.lock:
+                if file in self.queued_once:
+                    return
+                self.queued_once.add(file)
+        self.queue.put((file, dir, body, compression, once))
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for task in batch:
+                try:
+                    if task is None:
+                        return
+                    if self.error is None:
+                        write(*task)
+                except BaseException as e:
+                    self.error = e
+                finally:
+                    self.queue.task_done()
+
+    def flush(self):
+        self.queue.join()
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+
+_writers_by_pid: Dict[int, BackgroundWriter] = {}
+_writers_lock = threading.Lock()
+# Queue to report errors of a writer in a child process to the parent. (See `init_child_writer`)
+_child_errors: Optional[Any] = None
+
+
+def init_child_writer(errors: Any):
+    """Report errors of a writer in this child process by `errors` (multiprocessing.SimpleQueue)
+
+    A writer in a child process is closed when the process exits, and then nobody can catch
+    its errors. So they are sent to the parent which calls `pop_child_writer_errors`.
+    """
+    global _child_errors
+    _child_errors = errors
+
+
+def _close_child_writer(writer: BackgroundWriter):
+    try:
+        writer.close()
+    except BaseException as e:
+        if _child_errors is None:
+            raise
+        _child_errors.put(f"{type(e).__name__}: {e} (pid: {os.getpid()})")
+
+
+def pop_child_writer_errors(errors: Any) -> List[str]:
+    """
+    :param errors: Passed to `init_child_writer` in child processes which have exited
+    :return: Messages of errors
+    """
+    messages: List[str] = []
+    while not errors.empty():
+        messages.append(errors.get())
+    return messages
+
+
+def get_background_writer(queue_size: int, batch_size: int) -> BackgroundWriter:
+    """Return a writer of the current process. (It is created at the first call)
+
+    A writer in a child process is closed (all files are flushed) when the process exits.
+    """
+    pid = os.getpid()
+    with _writers_lock:
+        if pid not in _writers_by_pid:
+            writer = BackgroundWriter(queue_size, batch_size)
+            _writers_by_pid[pid] = writer
+            if multiprocessing.parent_process() is not None:
+                multiprocessing.util.Finalize(
+                    writer, _close_child_writer, args=(writer,), exitpriority=10
+                )
+        return _writers_by_pid[pid]
+
+
+def close_background_writer():
+    """Wait until all files are written by a writer of the current process."""
+    with _writers_lock:
+        writer: Optional[BackgroundWriter] = _writers_by_pid.pop(os.getpid(), None)
+    if writer:
+        writer.close()
+
+
+def store(
+    body: Body,
+    *,
+    dir: str,
+    category: str,
+    name: str,
+    extension: str = "",
+    content_addressed: bool = False,
+    compression: Optional[str] = None,
+    writer: Optional[BackgroundWriter] = None,
+) -> str:
+    """
+    :param body: Contents to write, or a function which creates them when they are written
+    :param dir: `<response_dir>/<key>`
+    :param category: one, other, one-props or other-props
+    :param name: File name used unless content addressed
+    :param extension: Extension which is added to a file name (ex: `.json`)
+    :param content_addressed: Name a file by the digest of `body` instead of `name` if True
+    :param compression: gzip or zstd. Not compressed if None
+    :param writer: Write in background if specified
+    :return: File path relative to `dir` (It may not be written yet if `writer` is specified)
+    """
+    compressed_extension = EXTENSIONS_BY_COMPRESSION.get(compression, "")
+    if content_addressed:
+        body = resolve(body)
+        # Digest of the uncompressed body so that a name doesn't depend on compression
+        file = f"{category}/{to_digest(body)}{extension}{compressed_extension}"
+        if os.path.exists(f"{dir}/{file}"):
+            return file
+    else:
+        file = f"{category}/{name}{extension}{compressed_extension}"
+
+    if writer:
+        writer.put(file, dir, body, compression, content_addressed)
+    else:
+        write(file, dir, body, compression, content_addressed)
+
+    return file
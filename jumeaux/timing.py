@@ -0,0 +1,66 @@
+# -*- coding:utf-8 -*-
+
+"""Measure stages and add-ons of trials and aggregate them for a summary
+
+Times are measured by `time.perf_counter` in seconds.
+"""
+
+import math
+import time
+from typing import Dict, Iterable, List, Optional
+
+from owlmixin import TDict
+
+from jumeaux.models import Timings, TimingStats, TimingsSummary
+
+
+def add(timings: Optional[Dict[str, float]], key: str, begin: float) -> float:
+    """Add seconds from `begin` to `timings[key]` if `timings` is not None
+
+    :return: Added seconds
+    """
+    elapsed = time.perf_counter() - begin
+    if timings is not None:
+        timings[key] = timings.get(key, 0) + elapsed
+    return elapsed
+
+
+def rounded(timings: Dict[str, float]) -> TDict[float]:
+    """Microseconds are enough for a report"""
+    return TDict({k: round(v, 6) for k, v in timings.items()})
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank method"""
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def to_stats(values: List[float]) -> TimingStats:
+    ordered = sorted(values)
+    return TimingStats.from_dict(
+        {
+            "count": len(ordered),
+            "mean": round(sum(ordered) / len(ordered), 6),
+            "p50": round(percentile(ordered, 50), 6),
+            "p95": round(percentile(ordered, 95), 6),
+            "p99": round(percentile(ordered, 99), 6),
+            "max": round(ordered[-1], 6),
+        }
+    )
+
+
+def summarize(timings: Iterable[Timings]) -> TimingsSummary:
+    stages: Dict[str, List[float]] = {}
+    addons: Dict[str, List[float]] = {}
+    for t in timings:
+        for k, v in t.stages.items():
+            stages.setdefault(k, []).append(v)
+        for k, v in t.addons.items():
+            addons.setdefault(k, []).append(v)
+
+    return TimingsSummary.from_dict(
+        {
+            "stages": TDict({k: to_stats(v) for k, v in stages.items()}),
+            "addons": TDict({k: to_stats(v) for k, v in addons.items()}),
+        }
+    )
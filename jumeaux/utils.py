@@ -1,9 +1,12 @@
 # -*- coding:utf-8 -*-
 from datetime import datetime, timedelta
+import collections
+import itertools
 import math
 import ast
 import re
-from typing import Any
+from concurrent import futures
+from typing import Any, Callable, Iterable, Iterator, List
 
 import pydash as py_
 from jinja2 import Environment, BaseLoader
@@ -94,3 +97,29 @@ def get_jinja2_format_error(fmt: str) -> TOption[str]:
 def parse_datetime_dsl(value: str):
     m = re.search(r"^\$DATETIME\((.+)\)\((.+)\)$", value)
     return (now() + timedelta(seconds=int(m[2]))).strftime(m[1]) if m else value
+
+
+def map_in_order(
+    ex: futures.Executor, fn: Callable[[Any], Any], iterable: Iterable, window: int
+) -> Iterator:
+    """Same as `ex.map(fn, iterable)` but consumes `iterable` lazily
+
+    At most `window` tasks are submitted ahead of results which have been yielded.
+    """
+    fs: collections.deque = collections.deque()
+    for x in iterable:
+        if len(fs) >= window:
+            yield fs.popleft().result()
+        fs.append(ex.submit(fn, x))
+    while fs:
+        yield fs.popleft().result()
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """Split `iterable` into lists of `size` items lazily. The last one may be shorter."""
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+import gzip
+
+import pytest
+
+from jumeaux.addons.final.csv import Executor
+from jumeaux.models import FinalAddOnPayload, Report
+
+COLUMN_NAMES = [
+    "seq",
+    "name",
+    "method",
+    "path",
+    "headers",
+    "queries",
+    "request_time",
+    "status",
+    "one.url",
+    "one.status",
+    "one.byte",
+    "one.response_sec",
+    "one.content_type",
+    "one.encoding",
+    "other.url",
+    "other.status",
+    "other.byte",
+    "other.response_sec",
+    "other.content_type",
+    "other.encoding",
+]
+
+REPORT = {
+    "version": "1.0.0",
+    "key": "hash_key",
+    "title": "Report title",
+    "summary": {
+        "one": {"name": "name_one", "host": "http://host/one"},
+        "other": {"name": "name_other", "host": "http://host/other"},
+        "status": {"same": 1, "different": 1, "failure": 0},
+        "tags": [],
+        "time": {"start": "start", "end": "end", "elapsed_sec": 1},
+        "concurrency": {"threads": 1, "processes": 1},
+        "output": {"response_dir": "responses"},
+    },
+    "trials": [
+        {
+            "seq": 1,
+            "name": "name1",
+            "tags": [],
+            "headers": {"key": "value"},
+            "queries": {"q": ["日本語", "a,b"]},
+            "one": {
+                "url": "URL_ONE",
+                "type": "json",
+                "status_code": 200,
+                "byte": 10,
+                "response_sec": 1.23,
+                "content_type": "application/json; charset=utf-8",
+                "encoding": "utf-8",
+            },
+            "other": {
+                "url": "URL_OTHER",
+                "type": "json",
+                "status_code": 500,
+                "byte": 20,
+                "response_sec": 0.5,
+                "content_type": "application/json",
+            },
+            "method": "GET",
+            "path": "/path",
+            "request_time": "time",
+            "status": "different",
+        },
+        {
+            "seq": 2,
+            "name": 'quoted "name"',
+            "tags": [],
+            "headers": {},
+            "queries": {},
+            "one": {"url": "URL_ONE", "type": "unknown"},
+            "other": {"url": "URL_OTHER", "type": "unknown"},
+            "method": "POST",
+            "path": "/path",
+            "request_time": "time",
+            "status": "failure",
+        },
+    ],
+}
+
+
+def to_csvf(report: Report, path: str, with_header: bool):
+    """Implementation before trials were written one by one"""
+    report.trials.map(
+        lambda x: {
+            "seq": x.seq,
+            "name": x.name,
+            "method": x.method,
+            "path": x.path,
+            "headers": x.headers.to_json(),
+            "queries": x.queries.to_json(),
+            "request_time": x.request_time,
+            "status": x.status,
+            "one.url": x.one.url,
+            "one.status": x.one.status_code,
+            "one.byte": x.one.byte,
+            "one.response_sec": x.one.response_sec,
+            "one.content_type": x.one.content_type,
+            "one.encoding": x.one.encoding,
+            "other.url": x.other.url,
+            "other.status": x.other.status_code,
+            "other.byte": x.other.byte,
+            "other.response_sec": x.other.response_sec,
+            "other.content_type": x.other.content_type,
+            "other.encoding": x.other.encoding,
+        }
+    ).to_csvf(fpath=path, fieldnames=COLUMN_NAMES, with_header=with_header)
+
+
+def exec_addon(config: dict) -> Report:
+    report: Report = Report.from_dict(REPORT)
+    Executor(config).exec(
+        FinalAddOnPayload.from_dict({"report": report, "output_summary": {"response_dir": "x"}}),
+        None,
+    )
+    return report
+
+
+class TestExec:
+    @pytest.mark.parametrize("with_header", [False, True])
+    def test_same_as_to_csvf(self, tmpdir, with_header):
+        path = str(tmpdir.join("trials.csv"))
+        report = exec_addon(
+            {"column_names": COLUMN_NAMES, "output_path": path, "with_header": with_header}
+        )
+        expected = str(tmpdir.join("expected.csv"))
+        to_csvf(report, expected, with_header)
+
+        assert tmpdir.join("expected.csv").read_binary() == tmpdir.join("trials.csv").read_binary()
+
+    def test_gzip(self, tmpdir):
+        path = str(tmpdir.join("trials.csv.gz"))
+        report = exec_addon(
+            {"column_names": COLUMN_NAMES, "output_path": path, "with_header": True, "gzip": True}
+        )
+        expected = str(tmpdir.join("expected.csv"))
+        to_csvf(report, expected, True)
+
+        with gzip.open(path, "rb") as f:
+            assert tmpdir.join("expected.csv").read_binary() == f.read()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+import time
+
+import pytest
+from owlmixin import TList
+
+from jumeaux.addons.final import FinalExecutor, exec_addons, find_dependencies, ALL
+
+
+class Recorder(FinalExecutor):
+    def __init__(self, name, events, concurrent=True, provides=None, requires=None, sec=0.0):
+        self.name = name
+        self.events = events
+        self.concurrent = concurrent
+        self.provides = provides or []
+        self.requires = requires or []
+        self.sec = sec
+
+    def exec(self, payload, reference):
+        self.events.append(("start", self.name))
+        time.sleep(self.sec)
+        self.events.append(("end", self.name))
+        return payload if self.concurrent else payload + [self.name]
+
+
+class Broken(FinalExecutor):
+    concurrent = True
+
+    def exec(self, payload, reference):
+        raise SystemExit(1)
+
+
+class TestFindDependencies:
+    @pytest.mark.parametrize(
+        "title, addons, index, expected",
+        [
+            (
+                "Independent",
+                [Recorder("a", [], provides=["report.json"]), Recorder("b", [])],
+                1,
+                [],
+            ),
+            (
+                "Required",
+                [
+                    Recorder("a", [], provides=["report.json"]),
+                    Recorder("b", [], provides=["summary.txt"]),
+                    Recorder("c", [], requires=["report.json"]),
+                ],
+                2,
+                [0],
+            ),
+            (
+                "All",
+                [
+                    Recorder("a", [], provides=["report.json"]),
+                    Recorder("b", []),
+                    Recorder("c", [], provides=["summary.txt"]),
+                    Recorder("d", [], requires=[ALL]),
+                ],
+                3,
+                [0, 1, 2],
+            ),
+            (
+                "Same file is provided",
+                [
+                    Recorder("a", [], provides=["report.json"]),
+                    Recorder("b", [], provides=["summary.txt"]),
+                    Recorder("c", [], provides=["report.json"]),
+                ],
+                2,
+                [0],
+            ),
+            (
+                "Not concurrent",
+                [Recorder("a", [], concurrent=False), Recorder("b", [])],
+                1,
+                [0],
+            ),
+        ],
+    )
+    def test(self, title, addons, index, expected):
+        assert find_dependencies(TList(addons), index) == expected
+
+
+class TestExecAddons:
+    def test_concurrent(self):
+        events = []
+        addons = TList(
+            [
+                Recorder("json", events, provides=["report.json"], sec=0.2),
+                Recorder("notify", events),
+                Recorder("viewer", events, requires=["report.json"]),
+            ]
+        )
+
+        assert exec_addons(addons, [], None) == []
+        # notify doesn't wait for json, viewer waits for json
+        assert events.index(("end", "notify")) < events.index(("end", "json"))
+        assert events.index(("end", "json")) < events.index(("start", "viewer"))
+
+    def test_not_concurrent(self):
+        events = []
+        addons = TList(
+            [
+                Recorder("a", events, sec=0.1),
+                Recorder("b", events, concurrent=False),
+                Recorder("c", events),
+                Recorder("d", events, concurrent=False),
+            ]
+        )
+
+        assert exec_addons(addons, [], None) == ["b", "d"]
+        assert events.index(("end", "a")) < events.index(("start", "b"))
+        assert events.index(("end", "b")) < events.index(("start", "c"))
+        assert events.index(("end", "c")) < events.index(("start", "d"))
+
+    def test_all(self):
+        events = []
+        addons = TList(
+            [
+                Recorder("miroir", events, sec=0.2),
+                Recorder("json", events, provides=["report.json"]),
+                Recorder("notify", events, requires=[ALL]),
+            ]
+        )
+
+        exec_addons(addons, [], None)
+        # notify waits for miroir which provides no files
+        assert events.index(("end", "miroir")) < events.index(("start", "notify"))
+        assert events.index(("end", "json")) < events.index(("start", "notify"))
+
+    def test_error_in_dependency(self):
+        events = []
+        addons = TList([Broken(), Recorder("notify", events, requires=[ALL])])
+
+        with pytest.raises(SystemExit):
+            exec_addons(addons, [], None)
+        assert events == []
+
+    def test_error(self):
+        events = []
+        addons = TList([Broken(), Recorder("a", events)])
+
+        with pytest.raises(SystemExit):
+            exec_addons(addons, [], None)
+        assert events == [("start", "a"), ("end", "a")]
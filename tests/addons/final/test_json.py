@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+import gzip
+import os
+
+import pytest
+
+from jumeaux.addons.final.json import Executor
+from jumeaux.models import FinalAddOnPayload, Report
+
+REPORT = {
+    "version": "1.0.0",
+    "key": "hash_key",
+    "title": "Report title",
+    "summary": {
+        "one": {"name": "name_one", "host": "http://host/one"},
+        "other": {"name": "name_other", "host": "http://host/other"},
+        "status": {"same": 1, "different": 1, "failure": 0},
+        "tags": [],
+        "time": {"start": "start", "end": "end", "elapsed_sec": 1},
+        "concurrency": {"threads": 1, "processes": 1},
+        "output": {"response_dir": "responses"},
+    },
+    "trials": [
+        {
+            "seq": seq,
+            "name": f"name{seq}",
+            "tags": [],
+            "headers": {},
+            "queries": {"q": ["日本語"]},
+            "one": {"url": "URL_ONE", "type": "json", "status_code": 200},
+            "other": {"url": "URL_OTHER", "type": "json", "status_code": 200},
+            "method": "GET",
+            "path": "/path",
+            "request_time": "time",
+            "status": "different",
+            "diffs_by_cognition": {
+                "unknown": {"added": ["root<'a'>"], "changed": [], "removed": []}
+            },
+        }
+        for seq in [1, 2]
+    ],
+}
+
+
+def exec_addon(config: dict, response_dir: str, encoding: str = "utf8") -> Report:
+    report: Report = Report.from_dict(REPORT)
+    os.makedirs(os.path.join(response_dir, report.key))
+    Executor(config).exec(
+        FinalAddOnPayload.from_dict(
+            {
+                "report": report,
+                "output_summary": {"response_dir": response_dir, "encoding": encoding},
+            }
+        ),
+        None,
+    )
+    return report
+
+
+class TestExec:
+    @pytest.mark.parametrize(
+        "title, config, encoding",
+        [
+            ("Default", {}, "utf8"),
+            ("Indent", {"indent": 4}, "utf8"),
+            ("Encoding", {"indent": 2}, "euc-jp"),
+        ],
+    )
+    def test_same_as_to_jsonf(self, tmpdir, title, config, encoding):
+        report = exec_addon(config, str(tmpdir), encoding)
+        report.to_jsonf(
+            str(tmpdir.join("expected.json")), encoding=encoding, indent=config.get("indent")
+        )
+
+        assert (
+            tmpdir.join("expected.json").read_binary()
+            == tmpdir.join("hash_key", "report.json").read_binary()
+        )
+
+    def test_gzip(self, tmpdir):
+        report = exec_addon({"indent": 4, "gzip": True}, str(tmpdir))
+        report.to_jsonf(str(tmpdir.join("expected.json")), encoding="utf8", indent=4)
+
+        assert not tmpdir.join("hash_key", "report.json").exists()
+        with gzip.open(str(tmpdir.join("hash_key", "report.json.gz")), "rb") as f:
+            assert tmpdir.join("expected.json").read_binary() == f.read()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+import gzip
+import os
+import threading
+
+import pytest
+
+from jumeaux.addons.final.miroir import Uploader, Upload, RESPONSE_DIRS, iter_other_files
+
+
+class LocalS3:
+    """Stand-in of a S3 client which keeps uploaded objects in memory"""
+
+    def __init__(self):
+        self.objects = {}
+        self.lock = threading.Lock()
+
+    def upload_file(self, path, bucket, key, ExtraArgs=None, Config=None):
+        with open(path, "rb") as f:
+            body = f.read()
+        with self.lock:
+            self.objects[(bucket, key)] = {"body": body, "extra_args": ExtraArgs}
+
+
+def create_responses(dir: str):
+    for which in RESPONSE_DIRS:
+        os.makedirs(f"{dir}/{which}")
+        for i in range(1, 4):
+            with open(f"{dir}/{which}/({i})", "wb") as f:
+                f.write(f"{which}-{i}".encode())
+    with open(f"{dir}/one/(4).gz", "wb") as f:
+        f.write(gzip.compress(b"compressed"))
+
+
+class TestUploader:
+    def test_upload_responses(self, tmpdir):
+        dir = str(tmpdir)
+        create_responses(dir)
+        s3 = LocalS3()
+        uploaded = []
+
+        Uploader(s3, "bucket", 60, Upload.from_dict({"workers": 3})).upload_responses(
+            dir, "results/key", RESPONSE_DIRS, on_uploaded=uploaded.append
+        )
+
+        assert len(s3.objects) == 13
+        assert s3.objects[("bucket", "results/key/one-props/(2)")] == {
+            "body": b"one-props-2",
+            "extra_args": {"CacheControl": "max-age=60"},
+        }
+        assert s3.objects[("bucket", "results/key/one/(4).gz")] == {
+            "body": gzip.compress(b"compressed"),
+            "extra_args": {"CacheControl": "max-age=60", "ContentEncoding": "gzip"},
+        }
+        assert sorted(uploaded) == sorted(
+            f"{dir}/{which}/{f}" for which in RESPONSE_DIRS for f in os.listdir(f"{dir}/{which}")
+        )
+
+    def test_upload_responses_error(self, tmpdir):
+        dir = str(tmpdir)
+        create_responses(dir)
+
+        class BrokenS3(LocalS3):
+            def upload_file(self, path, bucket, key, ExtraArgs=None, Config=None):
+                raise IOError("broken")
+
+        with pytest.raises(IOError):
+            Uploader(BrokenS3(), "bucket", 0, Upload.from_dict({})).upload_responses(
+                dir, "results/key", RESPONSE_DIRS
+            )
+
+
+class TestIterOtherFiles:
+    def test(self, tmpdir):
+        dir = str(tmpdir)
+        create_responses(dir)
+        for path in [
+            "report.json",
+            "index.html",
+            "summary/summary.txt",
+            "run.json",
+            "journal.jsonl",
+            "profile.pstats",
+            "profile.txt",
+            "profile-memory.txt",
+            "profile/123.pstats",
+        ]:
+            tmpdir.join(path).write("", ensure=True)
+
+        assert ["index.html", "report.json", os.path.join("summary", "summary.txt")] == sorted(
+            iter_other_files(dir)
+        )
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+import bz2
+import gzip
+import lzma
+
+import pytest
+from owlmixin.util import load_yaml
+
+from jumeaux.addons.log2reqs.access_log import Executor
+from jumeaux.models import Log2ReqsAddOnPayload
+
+COMBINED = """
+127.0.0.1 - - [10/Oct/2000:13:55:36 -0700] "GET /path1?a=1&b=2 HTTP/1.1" 200 2326 "http://referer" "Mozilla/5.0"
+127.0.0.1 - frank [10/Oct/2000:13:55:37 -0700] "POST /path2 HTTP/1.1" 201 10 "-" "curl/7.0"
+127.0.0.1 - - [10/Oct/2000:13:55:38 -0700] "GET /path3?word=%e6%9d%b1%e4%ba%ac&c HTTP/1.1" 304 - "-" "-"
+broken line
+127.0.0.1 - - [10/Oct/2000:13:55:39 -0700] "HEAD /path4 HTTP/1.1" 200 0 "-" "-"
+""".lstrip()
+
+COMMON = """
+127.0.0.1 - - [10/Oct/2000:13:55:36 -0700] "GET /path1?a=1&b=2 HTTP/1.0" 200 2326
+127.0.0.1 - frank [10/Oct/2000:13:55:37 -0700] "POST /path2 HTTP/1.0" 201 10
+127.0.0.1 - - [10/Oct/2000:13:55:38 -0700] "GET /path3?word=%e6%9d%b1%e4%ba%ac&c HTTP/1.0" 304 -
+""".lstrip()
+
+CUSTOM = """
+2000-10-10T13:55:36 GET /path1?a=1&b=2 200
+2000-10-10T13:55:37 POST /path2 201
+2000-10-10T13:55:38 GET /path3?word=%e6%9d%b1%e4%ba%ac&c 304
+""".lstrip()
+
+
+def create_expected(path: str, qs: dict, method: str = "GET") -> dict:
+    return {"method": method, "path": path, "qs": qs, "headers": {}, "url_encoding": "utf-8"}
+
+
+EXPECTED_GET = [
+    create_expected("/path1", {"a": ["1"], "b": ["2"]}),
+    create_expected("/path3", {"word": ["東京"]}),
+]
+
+
+class TestExec:
+    @pytest.mark.parametrize(
+        "title, logs, config_yml, expected",
+        [
+            ("Combined", COMBINED, "", EXPECTED_GET),
+            ("Common", COMMON, "format: common", EXPECTED_GET),
+            (
+                "Methods and keep_blank",
+                COMBINED,
+                """
+                methods: [GET, POST]
+                keep_blank: true
+                """,
+                [
+                    create_expected("/path1", {"a": ["1"], "b": ["2"]}),
+                    create_expected("/path2", {}, "POST"),
+                    create_expected("/path3", {"word": ["東京"], "c": [""]}),
+                ],
+            ),
+            (
+                "Custom pattern",
+                CUSTOM,
+                r"""
+                pattern: '^\S+ (?P<method>[A-Z]+) (?P<path>\S+) \d{3}$'
+                """,
+                EXPECTED_GET,
+            ),
+            (
+                "Custom pattern without method",
+                CUSTOM,
+                r"""
+                pattern: '^\S+ [A-Z]+ (?P<path>\S+) \d{3}$'
+                """,
+                [
+                    create_expected("/path1", {"a": ["1"], "b": ["2"]}),
+                    create_expected("/path2", {}),
+                    create_expected("/path3", {"word": ["東京"]}),
+                ],
+            ),
+        ],
+    )
+    def test(self, create_tmpfile_from, title, logs, config_yml, expected):
+        tmp = create_tmpfile_from(logs)
+        actual = Executor(load_yaml(config_yml)).exec(Log2ReqsAddOnPayload.from_dict({"file": tmp}))
+
+        assert expected == actual.to_dicts()
+
+    @pytest.mark.parametrize(
+        "extension, opener", [(".gz", gzip.open), (".bz2", bz2.open), (".xz", lzma.open)]
+    )
+    def test_compressed(self, tmpdir, extension, opener):
+        tmp = str(tmpdir.join(f"access.log{extension}"))
+        with opener(tmp, "wt", encoding="utf8") as f:
+            f.write(COMBINED)
+
+        actual = Executor({}).exec(Log2ReqsAddOnPayload.from_dict({"file": tmp}))
+
+        assert EXPECTED_GET == actual.to_dicts()
+
+    @pytest.mark.parametrize(
+        "title, config",
+        [
+            ("Unknown format", {"format": "unknown"}),
+            ("Invalid pattern", {"pattern": "(?P<path>"}),
+            ("No path group", {"pattern": r"^(?P<method>\S+)"}),
+            ("Unsupported method", {"methods": ["GET", "PUT"]}),
+        ],
+    )
+    def test_invalid_config(self, title, config):
+        with pytest.raises(SystemExit):
+            Executor(config)
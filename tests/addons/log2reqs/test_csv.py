@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 # -*- coding:utf-8 -*-
 
+import gzip
+
 import pytest
 from owlmixin.util import load_yaml
 
@@ -61,6 +63,26 @@ class TestExec:
                     create_expected(5, HttpMethod.GET, {}, {}),
                 ],
             ),
+            (
+                "CSV in parallel",
+                CSV,
+                """
+                parallel:
+                  processes: 2
+                """,
+                [
+                    create_expected(
+                        1,
+                        HttpMethod.GET,
+                        {"q1": ["1"], "q2": ["2"]},
+                        {"header1": "1", "header2": "2"},
+                    ),
+                    create_expected(2, HttpMethod.POST, {"q1": ["1"]}, {"header1": "1"}),
+                    create_expected(3, HttpMethod.GET, {"q1": ["1"]}, {}),
+                    create_expected(4, HttpMethod.POST, {}, {"header1": "1", "header2": "2"}),
+                    create_expected(5, HttpMethod.GET, {}, {}),
+                ],
+            ),
             (
                 "TSV",
                 TSV,
@@ -112,6 +134,16 @@ class TestExec:
 
         assert actual.to_dicts() == expected
 
+    @pytest.mark.parametrize("config_yml", ["", "parallel: {processes: 2}"])
+    def test_gzip(self, tmpdir, config_yml):
+        tmp = str(tmpdir.join("requests.csv.gz"))
+        with gzip.open(tmp, "wt", encoding="utf8") as f:
+            f.write(CSV)
+
+        actual = Executor(load_yaml(config_yml)).exec(Log2ReqsAddOnPayload.from_dict({"file": tmp}))
+
+        assert len(actual) == 5
+
     def test_length_over_5(self, create_tmpfile_from):
         tmp = create_tmpfile_from(OVER5)
         with pytest.raises(ValueError):
@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+import pytest
+
+from jumeaux.addons.log2reqs import find_chunks, read_lines
+
+LINES = "/path1?a=1\n/path2\r\n/東京\n\n/path4?b=2\n/path5"
+
+
+class TestFindChunks:
+    @pytest.mark.parametrize("chunk_size", [1, 3, 8, 16, 1024])
+    def test(self, create_tmpfile_from, chunk_size):
+        tmp = create_tmpfile_from(LINES)
+
+        chunks = find_chunks(tmp, chunk_size)
+
+        # Chunks cover the file without gaps and end at line boundaries
+        assert chunks[0][0] == 0
+        assert chunks[-1][1] == len(LINES.encode())
+        assert all(x[1] == y[0] for x, y in zip(chunks, chunks[1:]))
+        assert "".join(l for s, e in chunks for l in read_lines(tmp, s, e, "utf8")) == "".join(
+            open(tmp, encoding="utf8")
+        )
+
+    def test_empty(self, create_tmpfile_from):
+        assert find_chunks(create_tmpfile_from(""), 16) == []
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+import gzip
+
+import pytest
+from owlmixin.util import load_yaml
+
+from jumeaux.addons.log2reqs.jsonl import Executor
+from jumeaux.models import Log2ReqsAddOnPayload
+
+REQUESTS = """
+{"path": "/test1"}
+{"path": "/test2", "method": "GET", "qs": {"q1": ["1"]}}
+
+{"path": "/test3", "method": "POST", "headers": {"key": "value"}, "json": {"a": 1}}
+""".lstrip()
+
+INVALID_REQUESTS = """
+{"path": "/test1"}
+{"path": "/test2"
+{"name": "no path"}
+[{"path": "/test4"}]
+{"path": "/test5", "method": "PUT"}
+{"path": "/test6"}
+""".lstrip()
+
+EXPECTED = [
+    {"path": "/test1", "method": "GET", "qs": {}, "headers": {}, "url_encoding": "utf-8"},
+    {
+        "path": "/test2",
+        "method": "GET",
+        "qs": {"q1": ["1"]},
+        "headers": {},
+        "url_encoding": "utf-8",
+    },
+    {
+        "path": "/test3",
+        "method": "POST",
+        "qs": {},
+        "headers": {"key": "value"},
+        "json": {"a": 1},
+        "url_encoding": "utf-8",
+    },
+]
+
+EXPECTED_WITHOUT_INVALID = [
+    {"path": "/test1", "method": "GET", "qs": {}, "headers": {}, "url_encoding": "utf-8"},
+    {"path": "/test6", "method": "GET", "qs": {}, "headers": {}, "url_encoding": "utf-8"},
+]
+
+
+class TestExec:
+    @pytest.mark.parametrize(
+        "title, requests, config_yml, expected",
+        [
+            ("Normal", REQUESTS, "", EXPECTED),
+            ("Parallel", REQUESTS, "parallel: {processes: 2}", EXPECTED),
+            ("Invalid lines are skipped", INVALID_REQUESTS, "", EXPECTED_WITHOUT_INVALID),
+            (
+                "Invalid lines are skipped in parallel",
+                INVALID_REQUESTS,
+                "parallel: {processes: 2}",
+                EXPECTED_WITHOUT_INVALID,
+            ),
+        ],
+    )
+    def test(self, create_tmpfile_from, title, requests, config_yml, expected):
+        tmp = create_tmpfile_from(requests)
+        actual = Executor(load_yaml(config_yml)).exec(Log2ReqsAddOnPayload.from_dict({"file": tmp}))
+
+        assert expected == actual.to_dicts()
+
+    @pytest.mark.parametrize("config_yml", ["strict: true", "{strict: true, parallel: {}}"])
+    def test_strict(self, create_tmpfile_from, config_yml):
+        tmp = create_tmpfile_from(INVALID_REQUESTS)
+
+        with pytest.raises(ValueError, match="Line 2: "):
+            Executor(load_yaml(config_yml)).exec(Log2ReqsAddOnPayload.from_dict({"file": tmp}))
+
+    def test_strict_in_small_chunks(self, create_tmpfile_from, monkeypatch):
+        # Line 2 is not in the first chunk (16 bytes)
+        monkeypatch.setattr("jumeaux.addons.log2reqs.MB", 1)
+        tmp = create_tmpfile_from(INVALID_REQUESTS)
+
+        with pytest.raises(ValueError, match="Line 2: "):
+            Executor(load_yaml("{strict: true, parallel: {processes: 2, chunk_size_mb: 16}}")).exec(
+                Log2ReqsAddOnPayload.from_dict({"file": tmp})
+            )
+
+    @pytest.mark.parametrize("config_yml", ["", "parallel: {processes: 2}"])
+    def test_gzip(self, tmpdir, config_yml):
+        tmp = str(tmpdir.join("requests.jsonl.gz"))
+        with gzip.open(tmp, "wt", encoding="utf8") as f:
+            f.write(REQUESTS)
+
+        actual = Executor(load_yaml(config_yml)).exec(Log2ReqsAddOnPayload.from_dict({"file": tmp}))
+
+        assert EXPECTED == actual.to_dicts()
+
+    @pytest.mark.parametrize("config_yml", ["", "parallel: {processes: 2, chunk_size_mb: 16}"])
+    def test_report_line_numbers(self, create_tmpfile_from, monkeypatch, caplog, config_yml):
+        # Split into many small chunks (16 bytes)
+        monkeypatch.setattr("jumeaux.addons.log2reqs.MB", 1)
+        tmp = create_tmpfile_from(INVALID_REQUESTS)
+
+        Executor(load_yaml(config_yml)).exec(Log2ReqsAddOnPayload.from_dict({"file": tmp}))
+
+        assert [
+            int(m.split("Skip line ")[1].split(" ")[0]) for m in caplog.messages if "Skip line" in m
+        ] == [2, 3, 4, 5]
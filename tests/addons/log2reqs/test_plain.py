@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 # -*- coding:utf-8 -*-
 
+import gzip
+
 import pytest
 from owlmixin.util import load_yaml
 
@@ -69,6 +71,26 @@ class TestExec:
                     create_expected("/eucjp", {"word": ["���"]}),
                 ],
             ),
+            (
+                "Parallel",
+                """
+                parallel:
+                  processes: 2
+                """,
+                [
+                    create_expected("/path1", {"a": ["1"]}),
+                    create_expected("/path2", {"a": ["1"], "b": ["2"]}),
+                    create_expected("/path3", {"a": ["1", "2"], "b": ["1"]}),
+                    create_expected("/path4", {"a": ["1"]}),
+                    create_expected("/path5", {"a": ["1"]}),
+                    create_expected("/path6", {"a": ["1"], "b": ["あ"]}),
+                    create_expected("/path7", {}),
+                    create_expected("/path8", {}),
+                    create_expected("/utf8", {"word": ["東京"]}),
+                    create_expected("/sjis", {"word": ["����"]}),
+                    create_expected("/eucjp", {"word": ["���"]}),
+                ],
+            ),
             (
                 "Specify candidate for url encodings",
                 """
@@ -97,3 +119,16 @@ class TestExec:
         actual = Executor(load_yaml(config_yml)).exec(Log2ReqsAddOnPayload.from_dict({"file": tmp}))
 
         assert expected == actual.to_dicts()
+
+    @pytest.mark.parametrize("config_yml", ["", "parallel: {processes: 2}"])
+    def test_gzip(self, tmpdir, config_yml):
+        tmp = str(tmpdir.join("requests.gz"))
+        with gzip.open(tmp, "wt", encoding="utf8") as f:
+            f.write("/path1?a=1\n/path2?a=1&b=2\n")
+
+        actual = Executor(load_yaml(config_yml)).exec(Log2ReqsAddOnPayload.from_dict({"file": tmp}))
+
+        assert [
+            create_expected("/path1", {"a": ["1"]}),
+            create_expected("/path2", {"a": ["1"], "b": ["2"]}),
+        ] == actual.to_dicts()
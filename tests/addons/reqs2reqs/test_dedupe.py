@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+import hashlib
+
+import pytest
+from owlmixin.util import load_yaml
+
+from jumeaux.addons.reqs2reqs.dedupe import Executor, BloomFilter
+from jumeaux.models import Reqs2ReqsAddOnPayload
+
+REQUESTS = [
+    {"name": "1", "path": "/items", "qs": {"id": ["1"], "lang": ["ja"]}},
+    {"name": "2", "path": "/items", "qs": {"lang": ["ja"], "id": ["1"]}},
+    {"name": "3", "path": "/items", "qs": {"id": ["2"]}, "headers": {"X-Device": "pc"}},
+    {"name": "4", "path": "/items", "qs": {"id": ["2"]}, "headers": {"x-device": "sp"}},
+    {"name": "5", "path": "/items", "qs": {"id": ["1"], "lang": ["ja"]}},
+    {"name": "6", "method": "POST", "path": "/items", "json": {"a": 1, "b": 2}},
+    {"name": "7", "method": "POST", "path": "/items", "json": {"b": 2, "a": 1}},
+    {"name": "8", "method": "POST", "path": "/items", "json": {"a": 2}},
+]
+
+
+def names(payload: Reqs2ReqsAddOnPayload) -> list:
+    return [x.name.get() for x in payload.requests]
+
+
+class TestExec:
+    @pytest.mark.parametrize(
+        "title, config_yml, expected",
+        [
+            ("Default", "", ["1", "3", "6", "8"]),
+            ("Max occurrences", "max_occurrences: 2", ["1", "2", "3", "4", "6", "7", "8"]),
+            ("Headers", "headers: [X-DEVICE]", ["1", "3", "4", "6", "8"]),
+            ("Bloom filter", "bloom_filter: {capacity: 100}", ["1", "3", "6", "8"]),
+        ],
+    )
+    def test(self, title, config_yml, expected):
+        payload = Reqs2ReqsAddOnPayload.from_dict({"requests": REQUESTS})
+
+        actual = Executor(load_yaml(config_yml)).exec(payload, None)
+
+        assert expected == names(actual)
+
+    def test_tag(self):
+        payload = Reqs2ReqsAddOnPayload.from_dict({"requests": REQUESTS})
+
+        actual = Executor({"tag": "hits:{{ hits }}"}).exec(payload, None)
+
+        assert [("1", ["hits:3"]), ("3", ["hits:2"]), ("6", ["hits:2"]), ("8", ["hits:1"])] == [
+            (r.name.get(), r.tags.get()) for r in actual.requests
+        ]
+
+    @pytest.mark.parametrize(
+        "title, config",
+        [
+            ("Zero occurrences", {"max_occurrences": 0}),
+            ("Bloom filter with tag", {"bloom_filter": {"capacity": 10}, "tag": "{{ hits }}"}),
+            ("Invalid tag", {"tag": "{{ hits "}),
+        ],
+    )
+    def test_invalid_config(self, title, config):
+        with pytest.raises(SystemExit):
+            Executor(config)
+
+
+class TestBloomFilter:
+    def test(self):
+        bf = BloomFilter(1000, 0.01)
+        fingerprints = [
+            hashlib.blake2b(str(i).encode(), digest_size=16).digest() for i in range(2000)
+        ]
+
+        assert sum(bf.add(x) for x in fingerprints[:1000]) < 1000 * 0.05
+        assert all(bf.add(x) for x in fingerprints[:1000])
+        # False positive rate is about `error_rate` when it is full
+        assert sum(x in bf for x in fingerprints[1000:]) < 1000 * 0.05
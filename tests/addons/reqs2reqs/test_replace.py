@@ -116,3 +116,39 @@ items:
         payload: Reqs2ReqsAddOnPayload = Reqs2ReqsAddOnPayload.from_dict({"requests": reqs})
 
         assert Executor(config).exec(payload, None).to_dict() == {"requests": expected}
+
+
+class TestCopyOnWrite:
+    def test(self):
+        payload: Reqs2ReqsAddOnPayload = Reqs2ReqsAddOnPayload.from_dict(
+            {"requests": [{"path": "/api", "qs": {"q1": ["v1"]}, "headers": {"h1": "H1"}}]}
+        )
+        original = payload.requests[0]
+
+        actual = Executor({"items": [{"queries": {"q2": ["v2"]}, "headers": {"h2": "H2"}}]}).exec(
+            payload, None
+        )
+
+        assert {"q1": ["v1"], "q2": ["v2"]} == actual.requests[0].qs
+        assert {"h1": "H1", "h2": "H2"} == actual.requests[0].headers
+        assert {"q1": ["v1"]} == original.qs
+        assert {"h1": "H1"} == original.headers
+
+
+class TestChainedReplacers:
+    def test_condition_refers_previous_replacements(self):
+        payload: Reqs2ReqsAddOnPayload = Reqs2ReqsAddOnPayload.from_dict(
+            {"requests": [{"path": "/api", "headers": {}}]}
+        )
+
+        actual = Executor(
+            {
+                "items": [
+                    {"headers": {"h": "x"}},
+                    {"when": "headers.h == 'x'", "headers": {"replaced": "yes"}},
+                    {"when": "headers.h != 'x'", "headers": {"h": "y"}},
+                ]
+            }
+        ).exec(payload, None)
+
+        assert {"h": "x", "replaced": "yes"} == actual.requests[0].headers
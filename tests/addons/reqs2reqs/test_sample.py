@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+from collections import Counter
+
+import pytest
+from owlmixin.util import load_yaml
+
+from jumeaux.addons.reqs2reqs.sample import Executor, Reservoir
+from jumeaux.models import HttpMethod, Reqs2ReqsAddOnPayload, Request
+
+REQUESTS = (
+    [{"name": f"item{i}", "path": f"/items/{i}"} for i in range(100)]
+    + [{"name": f"search{i}", "path": "/search", "qs": {"q": [str(i)]}} for i in range(50)]
+    + [{"name": "status", "path": "/status"}]
+    + [{"name": "post", "method": "POST", "path": "/search"}]
+)
+
+
+def sample(config_yml: str) -> list:
+    payload = Reqs2ReqsAddOnPayload.from_dict({"requests": REQUESTS})
+    return [x.name.get() for x in Executor(load_yaml(config_yml)).exec(payload, None).requests]
+
+
+def groups(names: list) -> Counter:
+    return Counter(x.rstrip("0123456789") for x in names)
+
+
+class TestExec:
+    def test_size(self):
+        actual = sample(
+            """
+            size: 3
+            pattern: "^/[^/]+"
+            key: "{{ path }}"
+            seed: 1
+            """
+        )
+        counts = groups(actual)
+        # GET and POST of `/search` are the same group
+        assert (3, 3, 1) == (counts["item"], counts["search"] + counts["post"], counts["status"])
+
+    def test_default_key(self):
+        actual = sample("size: 2")
+        # `/items/{i}` are different groups, and GET and POST of `/search` are different groups
+        assert {"item": 100, "search": 2, "status": 1, "post": 1} == groups(actual)
+
+    @pytest.mark.parametrize("method", ["POST", HttpMethod.POST])
+    def test_default_key_method(self, method):
+        req: Request = Request.from_dict({"path": "/search", "method": method})
+        assert "POST /search" == Executor({"size": 1}).to_key(req)
+
+    @pytest.mark.parametrize("path, expected", [("/a", "/a"), ("/a/1", "/a//1")])
+    def test_key_optional_group(self, path, expected):
+        req: Request = Request.from_dict({"path": path})
+        executor = Executor({"size": 1, "pattern": r"^GET (/\w+)(/\d+)?"})
+        assert expected == executor.to_key(req)
+
+    def test_pattern_groups(self):
+        actual = sample(
+            """
+            size: 1
+            pattern: "^(GET|POST) /(items|search)"
+            seed: 1
+            """
+        )
+        assert {"item": 1, "search": 1, "status": 1, "post": 1} == groups(actual)
+
+    def test_rate(self):
+        actual = sample(
+            """
+            rate: 0.2
+            pattern: "^GET /[^/]+"
+            seed: 1
+            """
+        )
+        counts = groups(actual)
+        assert 5 <= counts["item"] <= 40
+        assert 1 <= counts["search"] <= 20
+        # Small groups are kept by `min_size`
+        assert 1 == counts["status"]
+        assert 1 == counts["post"]
+
+    def test_keep_order(self):
+        actual = sample("size: 5\nkey: all\nseed: 3")
+        assert sorted(actual, key=[x["name"] for x in REQUESTS].index) == actual
+
+    def test_seed(self):
+        assert sample("size: 5\nkey: all\nseed: 3") == sample("size: 5\nkey: all\nseed: 3")
+
+    @pytest.mark.parametrize(
+        "title, config",
+        [
+            ("Neither size nor rate", {}),
+            ("Both size and rate", {"size": 1, "rate": 0.1}),
+            ("Zero size", {"size": 0}),
+            ("Rate over 1", {"rate": 1.5}),
+            ("Invalid key", {"size": 1, "key": "{{ path "}),
+            ("Invalid pattern", {"size": 1, "pattern": "("}),
+        ],
+    )
+    def test_invalid_config(self, title, config):
+        with pytest.raises(SystemExit):
+            Executor(config)
+
+
+class TestReservoir:
+    def test_uniform(self):
+        import random
+
+        counts: Counter = Counter()
+        rand = random.Random(0)
+        for _ in range(2000):
+            r = Reservoir(2, rand)
+            for i in range(10):
+                r.add((i, None))
+            counts.update(i for i, _ in r.items)
+
+        # Each item is chosen with probability 2/10
+        assert all(300 < counts[i] < 500 for i in range(10))
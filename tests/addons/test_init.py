@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+import itertools
+
+from owlmixin import TList
+
+from jumeaux.addons import AddOnExecutor, Addons
+from jumeaux.domain.config.vo import Config
+from jumeaux.models import Request
+
+
+def create_addon_executor(reqs2reqs: list) -> AddOnExecutor:
+    return AddOnExecutor(Addons.from_dict({"log2reqs": {"name": "plain"}, "reqs2reqs": reqs2reqs}))
+
+
+def infinite_requests():
+    for i in itertools.count():
+        yield Request.from_dict({"path": f"/path{i}"})
+
+
+class TestStreamReqs2Reqs:
+    def test_streaming(self):
+        addon_executor = create_addon_executor(
+            [
+                {"name": "filter", "config": {"when": "path.endswith('0')"}},
+                {"name": "head", "config": {"size": 3}},
+            ]
+        )
+
+        actual = addon_executor.stream_reqs2reqs(infinite_requests(), None)
+
+        assert [x.path for x in actual] == ["/path0", "/path10", "/path20"]
+
+    def test_buffering(self):
+        addon_executor = create_addon_executor(
+            [{"name": "head", "config": {"size": 3}}, {"name": "shuffle"}]
+        )
+
+        actual = addon_executor.stream_reqs2reqs(infinite_requests(), None)
+
+        assert isinstance(actual, TList)
+        assert sorted(x.path for x in actual) == ["/path0", "/path1", "/path2"]
+
+    def test_parallel(self):
+        addon_executor = create_addon_executor(
+            [
+                {"name": "filter", "config": {"when": "path.endswith('0')"}},
+                {"name": "rename", "config": {"conditions": [{"name": "{{ path }}!"}]}},
+                {"name": "head", "config": {"size": 30}},
+            ]
+        )
+        config = Config.from_dict(
+            {
+                "one": {"name": "one", "host": "http://one"},
+                "other": {"name": "other", "host": "http://other"},
+                "output": {"response_dir": "responses"},
+                "addons": {"log2reqs": {"name": "plain"}},
+                "reqs2reqs_parallel": {"processes": 2, "chunk_size": 7},
+            }
+        )
+
+        actual = addon_executor.stream_reqs2reqs(infinite_requests(), config)
+
+        assert [x.name.get() for x in actual] == [f"/path{i * 10}!" for i in range(30)]
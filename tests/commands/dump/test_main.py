@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+import gzip
+import os
+
+from jumeaux import __version__
+from jumeaux.commands.dump.main import Args, run, to_response
+from jumeaux.models import Report, ResponseSummary
+
+RAW = b'{"items": [1]}'
+FORMATTED = b'{\n    "items": [\n        1\n    ]\n}'
+
+
+def create_summary(file: str) -> dict:
+    return {
+        "url": "http://host/items",
+        "type": "json",
+        "status_code": 200,
+        "response_sec": 1.5,
+        "content_type": "application/json",
+        "encoding": "utf8",
+        "file": file,
+    }
+
+
+def create_trial(seq: int, one: str, other: str) -> dict:
+    return {
+        "seq": seq,
+        "name": str(seq),
+        "tags": [],
+        "headers": {},
+        "queries": {},
+        "one": create_summary(one),
+        "other": create_summary(other),
+        "method": "GET",
+        "path": "/items",
+        "request_time": "2000-01-01T00:00:00+09:00",
+        "status": "same",
+    }
+
+
+def create_report(dir: str, trials: list) -> str:
+    """Write a report with raw responses and return its path"""
+    for which in ["one", "other"]:
+        os.makedirs(f"{dir}/{which}")
+        with open(f"{dir}/{which}/(1)1", "wb") as f:
+            f.write(RAW)
+        with open(f"{dir}/{which}/(2)2.gz", "wb") as f:
+            f.write(gzip.compress(RAW))
+
+    report: Report = Report.from_dict(
+        {
+            "version": __version__,
+            "key": "key",
+            "title": "title",
+            "summary": {
+                "one": {"name": "one", "host": "http://one"},
+                "other": {"name": "other", "host": "http://other"},
+                "status": {},
+                "tags": [],
+                "time": {"start": "", "end": "", "elapsed_sec": 0},
+                "output": {"response_dir": dir, "store": {"deferred_dump": True}},
+                "concurrency": {"threads": 1, "processes": 1},
+            },
+            "trials": trials,
+            "addons": {"log2reqs": {"name": "plain"}, "dump": [{"name": "json"}]},
+        }
+    )
+    path = f"{dir}/report.json"
+    with open(path, "w", encoding="utf8") as f:
+        f.write(report.to_json())
+    return path
+
+
+class TestToResponse:
+    def test(self):
+        actual = to_response(ResponseSummary.from_dict(create_summary("one/(1)1")), RAW)
+
+        assert RAW == actual.body
+        assert "application/json" == actual.headers["Content-Type"]
+        assert 200 == actual.status_code
+        assert 1.5 == actual.elapsed_sec
+        assert "json" == actual.type
+
+
+class TestRun:
+    def test(self, tmpdir):
+        dir = str(tmpdir)
+        report = create_report(
+            dir,
+            [
+                create_trial(1, "one/(1)1", "other/(1)1"),
+                create_trial(2, "one/(2)2.gz", "other/(2)2.gz"),
+                # A file shared by trials is formatted only once
+                create_trial(3, "one/(1)1", "other/(1)1"),
+            ],
+        )
+
+        run(Args.from_dict({"report": report, "processes": 1, "v": 0}))
+
+        formatted = f"{dir}/formatted"
+        assert ["(1)1", "(2)2.gz"] == sorted(os.listdir(f"{formatted}/one"))
+        assert ["(1)1", "(2)2.gz"] == sorted(os.listdir(f"{formatted}/other"))
+        with open(f"{formatted}/one/(1)1", "rb") as f:
+            assert FORMATTED == f.read()
+        # Compressed files stay compressed
+        with open(f"{formatted}/other/(2)2.gz", "rb") as f:
+            assert FORMATTED == gzip.decompress(f.read())
+        # Raw files are left as they are
+        with open(f"{dir}/one/(1)1", "rb") as f:
+            assert RAW == f.read()
+
+    def test_output_dir(self, tmpdir):
+        dir = str(tmpdir.join("result"))
+        report = create_report(dir, [create_trial(1, "one/(1)1", "other/(1)1")])
+
+        run(
+            Args.from_dict(
+                {"report": report, "output_dir": str(tmpdir.join("out")), "processes": 1, "v": 0}
+            )
+        )
+
+        with open(str(tmpdir.join("out", "one", "(1)1")), "rb") as f:
+            assert FORMATTED == f.read()
+        assert not os.path.exists(f"{dir}/formatted")
@@ -3,8 +3,12 @@
 # pylint: disable=no-self-use
 from owlmixin import TList, TOption
 
+import pytest
+
+from jumeaux import __version__
 from jumeaux.domain.config import service
 from jumeaux.domain.config.vo import Config, MergedArgs
+from jumeaux.models import Report
 
 
 class TestMergeArgs2Config:
@@ -18,6 +22,7 @@ class TestMergeArgs2Config:
                 "threads": 3,
                 "processes": 2,
                 "max_retries": 5,
+                "profile": {"every": 10},
             }
         )
 
@@ -62,6 +67,7 @@ class TestMergeArgs2Config:
             "judge_response_header": True,
             "ignore_response_header_keys": ["Date", "Cache-Control"],
             "input_files": ["file1", "file2"],
+            "profile": {"every": 10, "top": 30, "cpu": True, "memory": False},
             "one": {
                 "name": "name_one",
                 "host": "http://host/one",
@@ -76,7 +82,7 @@ class TestMergeArgs2Config:
                 "default_response_encoding": "euc-jp",
                 "headers": {"YYY": "yyy"},
             },
-            "output": {"encoding": "utf8", "response_dir": "tmpdir"},
+            "output": {"encoding": "utf8", "response_dir": "tmpdir", "trial_timings": False},
             "addons": {
                 "log2reqs": {
                     "name": "addons.log2reqs.csv",
@@ -131,7 +137,7 @@ class TestMergeArgs2Config:
             "ignore_response_header_keys": ["Date", "Cache-Control"],
             "one": {"name": "name_one", "host": "http://host/one", "headers": {"XXX": "xxx"}},
             "other": {"name": "name_other", "host": "http://host/other", "headers": {"YYY": "yyy"}},
-            "output": {"encoding": "utf8", "response_dir": "tmpdir"},
+            "output": {"encoding": "utf8", "response_dir": "tmpdir", "trial_timings": False},
             "addons": {
                 "log2reqs": {
                     "name": "addons.log2reqs.csv",
@@ -174,7 +180,7 @@ class TestMergeArgs2Config:
             "ignore_response_header_keys": ["Content-Length", "Date"],
             "one": {"name": "name_one", "host": "http://host/one", "headers": {"XXX": "xxx"}},
             "other": {"name": "name_other", "host": "http://host/other", "headers": {"YYY": "yyy"}},
-            "output": {"encoding": "utf8", "response_dir": "tmpdir"},
+            "output": {"encoding": "utf8", "response_dir": "tmpdir", "trial_timings": False},
             "addons": {
                 "log2reqs": {
                     "name": "addons.log2reqs.csv",
@@ -206,7 +212,7 @@ class TestCreateConfig:
                 "headers": {},
             },
             "other": {"name": "name_other", "host": "http://host/other", "headers": {}},
-            "output": {"encoding": "utf8", "response_dir": "tmpdir"},
+            "output": {"encoding": "utf8", "response_dir": "tmpdir", "trial_timings": False},
             "threads": 3,
             "max_retries": 2,
             "judge_response_header": False,
@@ -241,7 +247,7 @@ class TestCreateConfig:
                 "headers": {},
             },
             "other": {"name": "name_other", "host": "http://host/other", "headers": {}},
-            "output": {"encoding": "utf8", "response_dir": "tmpdir"},
+            "output": {"encoding": "utf8", "response_dir": "tmpdir", "trial_timings": False},
             "threads": 1,
             "max_retries": 3,
             "judge_response_header": False,
@@ -284,7 +290,7 @@ class TestCreateConfig:
                 "headers": {},
             },
             "other": {"name": "name_other", "host": "http://host/other", "headers": {}},
-            "output": {"encoding": "utf8", "response_dir": "tmpdir"},
+            "output": {"encoding": "utf8", "response_dir": "tmpdir", "trial_timings": False},
             "threads": 1,
             "max_retries": 3,
             "judge_response_header": False,
@@ -337,7 +343,7 @@ class TestCreateConfig:
                 "headers": {},
             },
             "other": {"name": "name_other", "host": "http://host/other", "headers": {}},
-            "output": {"encoding": "utf8", "response_dir": "mergecase2"},
+            "output": {"encoding": "utf8", "response_dir": "mergecase2", "trial_timings": False},
             "threads": 1,
             "max_retries": 3,
             "judge_response_header": False,
@@ -378,7 +384,7 @@ class TestCreateConfig:
                 "headers": {},
             },
             "other": {"name": "name_other", "host": "http://host/other", "headers": {}},
-            "output": {"encoding": "utf8", "response_dir": "mergecase1"},
+            "output": {"encoding": "utf8", "response_dir": "mergecase1", "trial_timings": False},
             "threads": 1,
             "max_retries": 3,
             "judge_response_header": False,
@@ -418,7 +424,11 @@ class TestCreateConfig:
                 "headers": {},
             },
             "other": {"name": "name_other", "host": "http://host/other", "headers": {}},
-            "output": {"encoding": "utf8", "response_dir": "mergecase_with_tags"},
+            "output": {
+                "encoding": "utf8",
+                "response_dir": "mergecase_with_tags",
+                "trial_timings": False,
+            },
             "threads": 1,
             "max_retries": 3,
             "judge_response_header": False,
@@ -470,7 +480,7 @@ class TestCreateConfig:
                 "headers": {},
             },
             "other": {"name": "name_other", "host": "http://host/other", "headers": {}},
-            "output": {"encoding": "utf8", "response_dir": "includecase1"},
+            "output": {"encoding": "utf8", "response_dir": "includecase1", "trial_timings": False},
             "threads": 1,
             "max_retries": 3,
             "judge_response_header": False,
@@ -504,3 +514,58 @@ class TestCreateConfig:
         }
 
         assert actual.to_dict() == expected
+
+
+class TestCreateProfile:
+    @pytest.mark.parametrize(
+        "title, cpu, memory, every, expected",
+        [
+            ("Nothing", False, False, 10, None),
+            ("Only cpu", True, False, 10, {"every": 10, "top": 30, "cpu": True, "memory": False}),
+            (
+                "Only memory",
+                False,
+                True,
+                None,
+                {"every": 1, "top": 30, "cpu": False, "memory": True},
+            ),
+            ("Both", True, True, None, {"every": 1, "top": 30, "cpu": True, "memory": True}),
+        ],
+    )
+    def test(self, title, cpu, memory, every, expected):
+        actual = service.create_profile(cpu, memory, TOption(every), TOption(None))
+        assert expected == actual.map(lambda x: x.to_dict()).get()
+
+
+class TestCreateConfigFromReport:
+    @pytest.mark.parametrize(
+        "title, encoding_detection, expected",
+        [
+            ("Recorded", {"max_bytes": 1024, "cache": True}, {"max_bytes": 1024, "cache": True}),
+            ("Not recorded (old reports)", None, None),
+        ],
+    )
+    def test_encoding_detection(self, title, encoding_detection, expected):
+        report: Report = Report.from_dict(
+            {
+                "version": __version__,
+                "key": "key",
+                "title": "title",
+                "summary": {
+                    "one": {"name": "one", "host": "http://one"},
+                    "other": {"name": "other", "host": "http://other"},
+                    "status": {},
+                    "tags": [],
+                    "time": {"start": "", "end": "", "elapsed_sec": 0},
+                    "output": {"response_dir": "responses"},
+                    "concurrency": {"threads": 1, "processes": 1},
+                    "encoding_detection": encoding_detection,
+                },
+                "trials": [],
+                "addons": {"log2reqs": {"name": "plain"}},
+            }
+        )
+
+        actual: Config = service.create_config_from_report(report)
+
+        assert expected == actual.encoding_detection.map(lambda x: x.to_dict()).get()
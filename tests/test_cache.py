@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+import itertools
+import os
+
+from jumeaux import cache
+from jumeaux.models import Request
+
+
+def create_requests(n: int):
+    return [Request.from_dict({"path": f"/path{i}", "qs": {"id": [str(i)]}}) for i in range(n)]
+
+
+class TestFingerprint:
+    def test_mtime(self, tmpdir):
+        f = tmpdir.join("requests")
+        f.write("/path1\n")
+        before = cache.fingerprint(str(f), False)
+        os.utime(str(f), ns=(0, 0))
+
+        assert before != cache.fingerprint(str(f), False)
+
+    def test_content_hash(self, tmpdir):
+        f = tmpdir.join("requests")
+        f.write("/path1\n")
+        before = cache.fingerprint(str(f), True)
+        os.utime(str(f), ns=(0, 0))
+
+        assert before == cache.fingerprint(str(f), True)
+        f.write("/path2\n")
+        assert before != cache.fingerprint(str(f), True)
+
+
+class TestToCachePath:
+    def test(self, tmpdir):
+        actual = cache.to_cache_path(str(tmpdir), {"path": "a"}, {"name": "plain"})
+
+        assert actual == cache.to_cache_path(str(tmpdir), {"path": "a"}, {"name": "plain"})
+        assert actual != cache.to_cache_path(str(tmpdir), {"path": "a"}, {"name": "csv"})
+        assert os.path.dirname(actual) == str(tmpdir)
+
+
+class TestStreamWithCache:
+    def test_miss_and_hit(self, tmpdir):
+        path = os.path.join(str(tmpdir), "sub", "key.pickle")
+        requests = create_requests(2500)
+
+        assert requests == list(cache.stream_with_cache(path, lambda: requests, "test"))
+        assert os.path.exists(path)
+
+        def create():
+            raise AssertionError("Must not be called")
+
+        assert [x.to_dict() for x in requests] == [
+            x.to_dict() for x in cache.stream_with_cache(path, create, "test")
+        ]
+
+    def test_not_saved_if_not_consumed(self, tmpdir):
+        path = os.path.join(str(tmpdir), "key.pickle")
+
+        stream = cache.stream_with_cache(path, lambda: create_requests(2500), "test")
+        assert 10 == len(list(itertools.islice(stream, 10)))
+        stream.close()
+
+        assert [] == os.listdir(str(tmpdir))
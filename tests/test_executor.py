@@ -3,23 +3,34 @@
 # pylint: disable=no-self-use,duplicate-code
 
 import datetime
+import io
 import os
 import shutil
+import sys
 from datetime import timezone, timedelta
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
 import freezegun
 import pytest
-from owlmixin import TList, TDict
+from owlmixin import TList, TDict, TOption
 from requests.exceptions import ConnectionError
 
-from jumeaux import executor, __version__
+from jumeaux import executor, journal, __version__
 from jumeaux.addons import AddOnExecutor, Addons
 from jumeaux.executor import create_query_string, merge_headers
 from jumeaux.domain.config.vo import Config
-from jumeaux.models import CaseInsensitiveDict, ChallengeArg, Request, Report, QueryCustomization
+from jumeaux.models import (
+    CaseInsensitiveDict,
+    ChallengeContext,
+    Request,
+    Report,
+    QueryCustomization,
+    Status,
+    Timings,
+    Trial,
+)
 
 
 def mock_date(year, month, day, hour, minute, second, microsecond):
@@ -100,6 +111,23 @@ class ResponseBuilder:
         return m
 
 
+STAGES = {
+    "request",
+    "request.one",
+    "request.other",
+    "res2res.one",
+    "res2res.other",
+    "res2dict.one",
+    "res2dict.other",
+    "diff",
+    "judgement",
+    "store_criterion",
+    "store",
+    "did_challenge",
+    "total",
+}
+
+
 @patch("jumeaux.executor.store_criterion")
 @patch("jumeaux.executor.now")
 @patch("jumeaux.executor.concurrent_request")
@@ -151,31 +179,35 @@ class TestChallenge:
         now.return_value = mock_date(2000, 1, 1, 10, 10, 10, 10)
         store_criterion.return_value = True
 
-        args: ChallengeArg = ChallengeArg.from_dict(
+        executor.init_challenge(
+            ChallengeContext.from_dict(
+                {
+                    "number_of_request": 10,
+                    "key": "hash_key",
+                    "max_retries": 3,
+                    "host_one": "hoge_one",
+                    "host_other": "hoge_other",
+                    "res_dir": "tmpdir",
+                    "proxy_one": None,
+                    "proxy_other": None,
+                    "headers_one": {},
+                    "headers_other": {},
+                    "encoding_detection": {},
+                    "judge_response_header": False,
+                    "ignore_response_header_keys": [],
+                }
+            )
+        )
+        req: Request = Request.from_dict(
             {
-                "seq": 1,
-                "number_of_request": 10,
-                "key": "hash_key",
-                "session": "dummy",
-                "req": {
-                    "name": "name1",
-                    "path": "/challenge",
-                    "qs": {"q1": ["1"], "q2": ["2-1", "2-2"]},
-                    "headers": {"header1": "1", "header2": "2"},
-                },
-                "host_one": "hoge_one",
-                "host_other": "hoge_other",
-                "res_dir": "tmpdir",
-                "proxy_one": None,
-                "proxy_other": None,
-                "headers_one": {},
-                "headers_other": {},
-                "judge_response_header": False,
-                "ignore_response_header_keys": [],
+                "name": "name1",
+                "path": "/challenge",
+                "qs": {"q1": ["1"], "q2": ["2-1", "2-2"]},
+                "headers": {"header1": "1", "header2": "2"},
             }
         )
 
-        actual = executor.challenge(args)
+        actual = executor.challenge((1, req))
 
         expected = {
             "seq": 1,
@@ -211,7 +243,12 @@ class TestChallenge:
             },
         }
 
-        assert actual == expected
+        # Elapsed seconds of each stage are not deterministic except for requests
+        timings: Timings = actual.timings.get()
+        assert STAGES == set(timings.stages.keys())
+        assert 1.234567 == timings.stages["request.one"]
+        assert {} == timings.addons.to_dict()
+        assert {k: v for k, v in actual.to_dict().items() if k != "timings"} == expected
 
     def test_same(self, concurrent_request, now, store_criterion):
         res_one = (
@@ -241,34 +278,38 @@ class TestChallenge:
         now.return_value = mock_date(2000, 1, 1, 10, 10, 10, 10)
         store_criterion.return_value = False
 
-        args: ChallengeArg = ChallengeArg.from_dict(
+        executor.init_challenge(
+            ChallengeContext.from_dict(
+                {
+                    "number_of_request": 10,
+                    "key": "hash_key",
+                    "max_retries": 3,
+                    "host_one": "hoge_one",
+                    "host_other": "hoge_other",
+                    "res_dir": "tmpdir",
+                    "proxy_one": None,
+                    "proxy_other": None,
+                    "headers_one": {},
+                    "headers_other": {},
+                    "encoding_detection": {},
+                    "judge_response_header": True,
+                    "ignore_response_header_keys": ["Content-Type"],
+                }
+            )
+        )
+        req: Request = Request.from_dict(
             {
-                "seq": 1,
-                "number_of_request": 10,
-                "key": "hash_key",
-                "session": "dummy",
-                "req": {
-                    "name": "name2",
-                    "method": "POST",
-                    "path": "/challenge",
-                    "qs": {"q1": ["1"], "q2": ["2-1", "2-2"]},
-                    "headers": {"header1": "1", "header2": "2"},
-                    "raw": "dummy",
-                    "form": {"form": "dummy"},
-                    "json": {"json": "dummy"},
-                },
-                "host_one": "hoge_one",
-                "host_other": "hoge_other",
-                "res_dir": "tmpdir",
-                "proxy_one": None,
-                "proxy_other": None,
-                "headers_one": {},
-                "headers_other": {},
-                "judge_response_header": True,
-                "ignore_response_header_keys": ["Content-Type"],
+                "name": "name2",
+                "method": "POST",
+                "path": "/challenge",
+                "qs": {"q1": ["1"], "q2": ["2-1", "2-2"]},
+                "headers": {"header1": "1", "header2": "2"},
+                "raw": "dummy",
+                "form": {"form": "dummy"},
+                "json": {"json": "dummy"},
             }
         )
-        actual = executor.challenge(args)
+        actual = executor.challenge((1, req))
 
         expected = {
             "seq": 1,
@@ -307,37 +348,113 @@ class TestChallenge:
             },
         }
 
-        assert actual == expected
+        # Elapsed seconds of each stage are not deterministic except for requests
+        timings: Timings = actual.timings.get()
+        # Not stored
+        assert STAGES - {"store"} == set(timings.stages.keys())
+        assert 1.234567 == timings.stages["request.one"]
+        assert {} == timings.addons.to_dict()
+        assert {k: v for k, v in actual.to_dict().items() if k != "timings"} == expected
+
+    @pytest.mark.parametrize(
+        "title, deferred_dump, expected",
+        [
+            ("Dumped", False, b'{\n    "items": [\n        1\n    ]\n}'),
+            ("Deferred", True, b'{"items": [1]}'),
+        ],
+    )
+    def test_deferred_dump(
+        self, concurrent_request, now, store_criterion, monkeypatch, title, deferred_dump, expected
+    ):
+        res = (
+            ResponseBuilder()
+            .text('{"items": [1]}')
+            .json({"items": [1]})
+            .url("URL")
+            .status_code(200)
+            .headers({"Content-Type": "application/json"})
+            .content(b'{"items": [1]}')
+            .encoding("utf8")
+            .second(1, 0)
+            .build()
+        )
+        concurrent_request.return_value = res, res
+        now.return_value = mock_date(2000, 1, 1, 10, 10, 10, 10)
+        store_criterion.return_value = True
+        monkeypatch.setattr(
+            executor,
+            "global_addon_executor",
+            AddOnExecutor(
+                Addons.from_dict(
+                    {
+                        "log2reqs": {"name": "jumeaux.addons.log2reqs.csv"},
+                        "dump": [{"name": "json"}],
+                    }
+                )
+            ),
+        )
+
+        executor.init_challenge(
+            ChallengeContext.from_dict(
+                {
+                    "number_of_request": 10,
+                    "key": "hash_key",
+                    "max_retries": 3,
+                    "host_one": "hoge_one",
+                    "host_other": "hoge_other",
+                    "res_dir": "tmpdir",
+                    "proxy_one": None,
+                    "proxy_other": None,
+                    "headers_one": {},
+                    "headers_other": {},
+                    "encoding_detection": {},
+                    "judge_response_header": False,
+                    "ignore_response_header_keys": [],
+                    "store": {"deferred_dump": deferred_dump},
+                }
+            )
+        )
+        req: Request = Request.from_dict({"name": title, "path": "/challenge"})
+
+        actual = executor.challenge((1, req))
+
+        assert f"one/(1){title}" == actual.one.file.get()
+        with open(os.path.join("tmpdir", "hash_key", actual.one.file.get()), "rb") as f:
+            assert expected == f.read()
 
     def test_failure(self, concurrent_request, now, store_criterion):
         concurrent_request.side_effect = ConnectionError
         now.return_value = mock_date(2000, 1, 1, 10, 10, 10, 10)
         store_criterion.return_value = False
 
-        args: ChallengeArg = ChallengeArg.from_dict(
+        executor.init_challenge(
+            ChallengeContext.from_dict(
+                {
+                    "number_of_request": 10,
+                    "key": "hash_key",
+                    "max_retries": 3,
+                    "host_one": "http://one",
+                    "host_other": "http://other",
+                    "res_dir": "tmpdir",
+                    "proxy_one": None,
+                    "proxy_other": None,
+                    "headers_one": {},
+                    "headers_other": {},
+                    "encoding_detection": {},
+                    "judge_response_header": False,
+                    "ignore_response_header_keys": [],
+                }
+            )
+        )
+        req: Request = Request.from_dict(
             {
-                "seq": 1,
-                "number_of_request": 10,
-                "key": "hash_key",
-                "session": "dummy",
-                "req": {
-                    "name": "name3",
-                    "path": "/challenge",
-                    "qs": {"q1": ["1"]},
-                    "headers": {"header1": "1", "header2": "2"},
-                },
-                "host_one": "http://one",
-                "host_other": "http://other",
-                "res_dir": "tmpdir",
-                "proxy_one": None,
-                "proxy_other": None,
-                "headers_one": {},
-                "headers_other": {},
-                "judge_response_header": False,
-                "ignore_response_header_keys": [],
+                "name": "name3",
+                "path": "/challenge",
+                "qs": {"q1": ["1"]},
+                "headers": {"header1": "1", "header2": "2"},
             }
         )
-        actual = executor.challenge(args)
+        actual = executor.challenge((1, req))
 
         expected = {
             "seq": 1,
@@ -353,7 +470,7 @@ class TestChallenge:
             "other": {"url": "http://other/challenge?q1=1", "type": "unknown"},
         }
 
-        assert actual == expected
+        assert actual.to_dict() == expected
 
 
 class TestCreateQueryString:
@@ -540,66 +657,73 @@ class TestExec:
         dummy_hash = "dummy hash"
 
         hash_from_args.return_value = dummy_hash
-        challenge.side_effect = [
-            {
-                "seq": 1,
-                "name": "name1",
-                "tags": [],
-                "request_time": "2000-01-01T10:10:10.000010+09:00",
-                "status": "different",
-                "method": "GET",
-                "path": "/challenge1",
-                "queries": {"q1": ["1"], "q2": ["2-1", "2-2"]},
-                "headers": {"header1": "1", "header2": "2"},
-                "one": {
-                    "file": "one/(1)name1",
-                    "type": "json",
-                    "url": "URL_ONE",
-                    "status_code": 200,
-                    "byte": 20,
-                    "response_sec": 1.23,
-                    "content_type": "application/json; charset=sjis",
-                    "encoding": "sjis",
-                },
-                "other": {
-                    "file": "other/(1)name1",
-                    "type": "json",
-                    "url": "URL_OTHER",
-                    "status_code": 400,
-                    "byte": 23,
-                    "response_sec": 9.88,
-                    "content_type": "application/json; charset=utf8",
-                    "encoding": "utf8",
-                },
-            },
-            {
-                "seq": 2,
-                "name": "name2",
-                "tags": [],
-                "request_time": "2000-01-01T10:10:11.000010+09:00",
-                "status": "same",
-                "method": "POST",
-                "path": "/challenge2",
-                "queries": {"q1": ["1"], "q2": ["2-1", "2-2"]},
-                "headers": {"header1": "1", "header2": "2"},
-                "one": {
-                    "file": "one/(2)name2",
-                    "type": "unknown",
-                    "url": "URL_ONE",
-                    "status_code": 200,
-                    "byte": 1,
-                    "response_sec": 1.00,
+        challenge.side_effect = TList(
+            [
+                {
+                    "seq": 1,
+                    "name": "name1",
+                    "tags": [],
+                    "request_time": "2000-01-01T10:10:10.000010+09:00",
+                    "status": "different",
+                    "method": "GET",
+                    "path": "/challenge1",
+                    "queries": {"q1": ["1"], "q2": ["2-1", "2-2"]},
+                    "headers": {"header1": "1", "header2": "2"},
+                    "one": {
+                        "file": "one/(1)name1",
+                        "type": "json",
+                        "url": "URL_ONE",
+                        "status_code": 200,
+                        "byte": 20,
+                        "response_sec": 1.23,
+                        "content_type": "application/json; charset=sjis",
+                        "encoding": "sjis",
+                    },
+                    "other": {
+                        "file": "other/(1)name1",
+                        "type": "json",
+                        "url": "URL_OTHER",
+                        "status_code": 400,
+                        "byte": 23,
+                        "response_sec": 9.88,
+                        "content_type": "application/json; charset=utf8",
+                        "encoding": "utf8",
+                    },
+                    "timings": {
+                        "stages": {"res2dict.one": 0.2, "total": 1.5},
+                        "addons": {"res2dict/json": 0.1},
+                    },
                 },
-                "other": {
-                    "file": "other/(2)name2",
-                    "type": "unknown",
-                    "url": "URL_OTHER",
-                    "status_code": 200,
-                    "byte": 1,
-                    "response_sec": 2.00,
+                {
+                    "seq": 2,
+                    "name": "name2",
+                    "tags": [],
+                    "request_time": "2000-01-01T10:10:11.000010+09:00",
+                    "status": "same",
+                    "method": "POST",
+                    "path": "/challenge2",
+                    "queries": {"q1": ["1"], "q2": ["2-1", "2-2"]},
+                    "headers": {"header1": "1", "header2": "2"},
+                    "one": {
+                        "file": "one/(2)name2",
+                        "type": "unknown",
+                        "url": "URL_ONE",
+                        "status_code": 200,
+                        "byte": 1,
+                        "response_sec": 1.00,
+                    },
+                    "other": {
+                        "file": "other/(2)name2",
+                        "type": "unknown",
+                        "url": "URL_OTHER",
+                        "status_code": 200,
+                        "byte": 1,
+                        "response_sec": 2.00,
+                    },
+                    "timings": {"stages": {"total": 0.5}, "addons": {}},
                 },
-            },
-        ]
+            ]
+        ).map(Trial.from_dict)
         now.side_effect = [
             mock_date(2000, 1, 1, 23, 50, 30, 100),
             mock_date(2000, 1, 2, 0, 0, 0, 200),
@@ -705,8 +829,38 @@ class TestExec:
                 },
                 "tags": ["tag1", "tag2"],
                 "status": {"same": 1, "different": 1, "failure": 0},
-                "output": {"encoding": "utf8", "response_dir": "tmpdir"},
+                "output": {"encoding": "utf8", "response_dir": "tmpdir", "trial_timings": False},
                 "concurrency": {"threads": 1, "processes": 1},
+                "timings": {
+                    "stages": {
+                        "res2dict.one": {
+                            "count": 1,
+                            "mean": 0.2,
+                            "p50": 0.2,
+                            "p95": 0.2,
+                            "p99": 0.2,
+                            "max": 0.2,
+                        },
+                        "total": {
+                            "count": 2,
+                            "mean": 1.0,
+                            "p50": 0.5,
+                            "p95": 1.5,
+                            "p99": 1.5,
+                            "max": 1.5,
+                        },
+                    },
+                    "addons": {
+                        "res2dict/json": {
+                            "count": 1,
+                            "mean": 0.1,
+                            "p50": 0.1,
+                            "p95": 0.1,
+                            "p99": 0.1,
+                            "max": 0.1,
+                        },
+                    },
+                },
             },
             "trials": [
                 {
@@ -771,3 +925,234 @@ class TestExec:
         }
 
         assert expected == actual.to_dict()
+
+
+class TestStreamFiles:
+    @staticmethod
+    def create_config(files, log2reqs_parallel: Optional[dict] = None) -> Config:
+        return Config.from_dict(
+            {
+                "one": {"name": "one", "host": "http://one"},
+                "other": {"name": "other", "host": "http://other"},
+                "output": {"response_dir": "responses"},
+                "input_files": files,
+                "addons": {"log2reqs": {"name": "plain"}},
+                "log2reqs_parallel": log2reqs_parallel,
+            }
+        )
+
+    @pytest.mark.parametrize(
+        "title, log2reqs_parallel", [("Serial", None), ("Parallel", {"processes": 2})]
+    )
+    def test_order(self, tmpdir, title, log2reqs_parallel):
+        files = []
+        for i in range(5):
+            f = tmpdir.join(f"requests{i}")
+            f.write("".join(f"/file{i}/path{j}\n" for j in range(i * 100)))
+            files.append(str(f))
+        config = self.create_config(files, log2reqs_parallel)
+
+        actual = executor.stream_files(TList(files), config, AddOnExecutor(config.addons).log2reqs)
+
+        assert [x.path for x in actual] == [
+            f"/file{i}/path{j}" for i in range(5) for j in range(i * 100)
+        ]
+
+
+def create_trial(seq: int, path: str, status: str, tags: list, file: str) -> dict:
+    response = {"url": f"http://host{path}", "type": "json", "file": file}
+    return {
+        "seq": seq,
+        "name": str(seq),
+        "tags": tags,
+        "headers": {},
+        "queries": {},
+        "one": response,
+        "other": response,
+        "method": "GET",
+        "path": path,
+        "request_time": "2000-01-01T00:00:00+09:00",
+        "status": status,
+    }
+
+
+def create_report(key: str, response_dir: str, trials: list) -> Report:
+    return Report.from_dict(
+        {
+            "version": __version__,
+            "key": key,
+            "title": "title",
+            "summary": {
+                "one": {"name": "one", "host": "http://one"},
+                "other": {"name": "other", "host": "http://other"},
+                "status": {},
+                "tags": [],
+                "time": {"start": "", "end": "", "elapsed_sec": 0},
+                "output": {"response_dir": response_dir},
+                "concurrency": {"threads": 1, "processes": 1},
+            },
+            "trials": trials,
+            "addons": {"log2reqs": {"name": "plain"}},
+        }
+    )
+
+
+class TestSelectTrials:
+    TRIALS = TList(
+        [
+            create_trial(1, "/items/1", "same", [], "one/1"),
+            create_trial(2, "/items/2", "different", ["flaky"], "one/2"),
+            create_trial(3, "/users/1", "failure", [], "one/3"),
+            create_trial(4, "/users/2", "different", [], "one/4"),
+        ]
+    ).map(Trial.from_dict)
+
+    @pytest.mark.parametrize(
+        "title, statuses, tags, path_regex, expected",
+        [
+            ("No conditions", [], [], None, [1, 2, 3, 4]),
+            ("Statuses", ["different", "failure"], [], None, [2, 3, 4]),
+            ("Tags", [], ["flaky", "other"], None, [2]),
+            ("Path regex", [], [], "^/users/", [3, 4]),
+            ("All", ["different"], [], "^/users/", [4]),
+        ],
+    )
+    def test(self, title, statuses, tags, path_regex, expected):
+        actual = executor.select_trials(
+            self.TRIALS,
+            TList(statuses).map(Status.from_value),
+            TList(tags),
+            TOption(path_regex),
+        )
+
+        assert expected == [x.seq for x in actual]
+
+
+class TestMergeReports:
+    def test(self, tmpdir):
+        os.makedirs(os.path.join(tmpdir, "origin", "one"))
+        os.makedirs(os.path.join(tmpdir, "retried", "one"))
+        for i in range(1, 4):
+            tmpdir.join("origin", "one", str(i)).write(f"origin{i}")
+        origin = create_report(
+            "origin",
+            str(tmpdir),
+            [
+                create_trial(1, "/1", "same", [], "one/1"),
+                create_trial(2, "/2", "different", [], "one/2"),
+                create_trial(3, "/3", "different", [], "one/3"),
+            ],
+        )
+        retried = create_report(
+            "retried", str(tmpdir), [create_trial(1, "/2", "same", [], "one/retried1")]
+        )
+
+        actual = executor.merge_reports(origin, retried, [2])
+
+        assert "retried" == actual.key
+        assert [(1, "/1", "one/1"), (2, "/2", "one/retried1"), (3, "/3", "one/3")] == [
+            (x.seq, x.path, x.one.file.get()) for x in actual.trials
+        ]
+        assert {"same": 2, "different": 1, "failure": 0} == actual.summary.status.to_dict()
+        assert ["1", "3"] == sorted(os.listdir(os.path.join(tmpdir, "retried", "one")))
+        assert 1 == retried.trials[0].seq
+
+    def test_same_file_names(self, tmpdir):
+        os.makedirs(os.path.join(tmpdir, "origin", "one"))
+        os.makedirs(os.path.join(tmpdir, "retried", "one"))
+        for i in range(1, 4):
+            tmpdir.join("origin", "one", f"({i})name").write(f"origin{i}")
+        for i in range(1, 3):
+            tmpdir.join("retried", "one", f"({i})name").write(f"retried{i}")
+        origin = create_report(
+            "origin",
+            str(tmpdir),
+            [create_trial(i, f"/{i}", "different", [], f"one/({i})name") for i in range(1, 4)],
+        )
+        retried = create_report(
+            "retried",
+            str(tmpdir),
+            [create_trial(i, f"/{i + 1}", "same", [], f"one/({i})name") for i in range(1, 3)],
+        )
+
+        actual = executor.merge_reports(origin, retried, [2, 3])
+
+        assert [(1, "one/(1)name"), (2, "one/(2)name"), (3, "one/(3)name")] == [
+            (x.seq, x.one.file.get()) for x in actual.trials
+        ]
+        assert {"(1)name": "origin1", "(2)name": "retried1", "(3)name": "retried2",} == {
+            f: tmpdir.join("retried", "one", f).read()
+            for f in os.listdir(os.path.join(tmpdir, "retried", "one"))
+        }
+        assert "one/(1)name" == retried.trials[0].one.file.get()
+
+
+class TestResume:
+    @staticmethod
+    def stop_run(tmpdir, completed_seqs: List[int], fingerprint=journal.fingerprint) -> Config:
+        """Create a state of a run which has stopped after `completed_seqs` finished"""
+        tmpdir.join("requests").write("".join(f"/{i}\n" for i in range(1, 5)))
+        config: Config = Config.from_dict(
+            {
+                "one": {"name": "one", "host": "http://one"},
+                "other": {"name": "other", "host": "http://other"},
+                "output": {"response_dir": str(tmpdir.join("responses"))},
+                "input_files": [str(tmpdir.join("requests"))],
+                "addons": {"log2reqs": {"name": "plain"}, "final": [{"name": "json"}]},
+            }
+        )
+        res_dir = tmpdir.join("responses", "key")
+        res_dir.join("one", "1").write("body", ensure=True)
+        journal.save_run(
+            str(res_dir),
+            journal.Run.from_dict({"config": config, "start_time": "2000-01-01T00:00:00+09:00"}),
+        )
+        reqs = list(
+            executor.stream_files(
+                config.input_files.get(), config, AddOnExecutor(config.addons).log2reqs
+            )
+        )
+        with journal.Journal(str(res_dir)) as j:
+            for seq in completed_seqs:
+                j.append(
+                    Trial.from_dict(create_trial(seq, f"/{seq}", "same", [], "one/1")),
+                    fingerprint(reqs[seq - 1]),
+                )
+        return config
+
+    @staticmethod
+    def isolate_stdio(monkeypatch):
+        # `__run` wraps buffers of them and closes them
+        monkeypatch.setattr(sys, "stdout", io.TextIOWrapper(io.BytesIO()))
+        monkeypatch.setattr(sys, "stderr", io.TextIOWrapper(io.BytesIO()))
+
+    @patch("jumeaux.executor.challenge")
+    def test(self, challenge, tmpdir, monkeypatch):
+        self.isolate_stdio(monkeypatch)
+        self.stop_run(tmpdir, [2, 1])
+        challenge.side_effect = lambda task: Trial.from_dict(
+            create_trial(task[0], task[1].path, "different", [], "one/1")
+        )
+
+        executor.resume(key="key", response_dir=str(tmpdir.join("responses")))
+
+        assert [3, 4] == [c.args[0][0] for c in challenge.call_args_list]
+        report: Report = Report.from_jsonf(str(tmpdir.join("responses", "key", "report.json")))
+        assert [(1, "same"), (2, "same"), (3, "different"), (4, "different")] == [
+            (t.seq, t.status.value) for t in report.trials
+        ]
+        assert journal.load_run(str(tmpdir.join("responses", "key"))) is None
+
+    @patch("jumeaux.executor.challenge")
+    def test_requests_changed(self, challenge, tmpdir, monkeypatch):
+        self.isolate_stdio(monkeypatch)
+        # Requests are shuffled after the run stopped
+        self.stop_run(tmpdir, [1, 2], lambda req: "different request")
+        challenge.side_effect = lambda task: Trial.from_dict(
+            create_trial(task[0], task[1].path, "different", [], "one/1")
+        )
+
+        with pytest.raises(SystemExit):
+            executor.resume(key="key", response_dir=str(tmpdir.join("responses")))
+
+        assert journal.load_run(str(tmpdir.join("responses", "key"))) is not None
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+import os
+
+import pytest
+
+from jumeaux import journal
+from jumeaux.domain.config.vo import Config
+from jumeaux.models import Request, Trial
+
+
+def create_trial(seq: int, file: str) -> dict:
+    response = {"url": "http://host/path", "type": "json", "file": file}
+    return {
+        "seq": seq,
+        "name": str(seq),
+        "tags": [],
+        "headers": {},
+        "queries": {},
+        "one": response,
+        "other": response,
+        "method": "GET",
+        "path": "/path",
+        "request_time": "2000-01-01T00:00:00+09:00",
+        "status": "same",
+    }
+
+
+class TestLoadEntries:
+    def test(self, tmpdir):
+        tmpdir.join("exists").write("body")
+        with journal.Journal(str(tmpdir)) as j:
+            j.append(Trial.from_dict(create_trial(2, "exists")), "fp2")
+            j.append(Trial.from_dict(create_trial(1, "exists")), "fp1")
+            j.append(Trial.from_dict(create_trial(3, "not_written_yet")), "fp3")
+        # Killed while writing
+        with open(os.path.join(str(tmpdir), journal.JOURNAL_FILE), "a") as f:
+            f.write('{"request": "fp4", "trial": {"seq": 4, "na')
+
+        actual = journal.load_entries(str(tmpdir))
+
+        assert [1, 2] == sorted(actual)
+        assert "fp1" == actual[1].request
+        assert "exists" == actual[1].trial.one.file.get()
+
+    def test_append_after_broken_line(self, tmpdir):
+        tmpdir.join("exists").write("body")
+        with journal.Journal(str(tmpdir)) as j:
+            j.append(Trial.from_dict(create_trial(1, "exists")), "fp1")
+        # Killed while writing
+        with open(os.path.join(str(tmpdir), journal.JOURNAL_FILE), "a") as f:
+            f.write('{"request": "fp2", "trial": {"seq": 2, "na')
+
+        # Resumed
+        with journal.Journal(str(tmpdir)) as j:
+            j.append(Trial.from_dict(create_trial(2, "exists")), "fp2")
+
+        assert [1, 2] == sorted(journal.load_entries(str(tmpdir)))
+
+    def test_not_exists(self, tmpdir):
+        assert {} == journal.load_entries(str(tmpdir))
+
+
+class TestTruncateBrokenLine:
+    @pytest.mark.parametrize(
+        "title, content, expected",
+        [
+            ("Complete", "a\nb\n", "a\nb\n"),
+            ("Broken", "a\nb\nc", "a\nb\n"),
+            ("Only a broken line", "abc", ""),
+            ("Broken longer than a block", "a\n" + "b" * 10000, "a\n"),
+            ("Empty", "", ""),
+        ],
+    )
+    def test(self, tmpdir, title, content, expected):
+        path = tmpdir.join("journal.jsonl")
+        path.write(content)
+
+        journal.truncate_broken_line(str(path))
+
+        assert expected == path.read()
+
+
+class TestFingerprint:
+    def test(self):
+        req = Request.from_dict({"path": "/path", "qs": {"a": ["1"], "b": ["2"]}})
+
+        assert journal.fingerprint(req) == journal.fingerprint(
+            Request.from_dict({"path": "/path", "qs": {"b": ["2"], "a": ["1"]}})
+        )
+        assert journal.fingerprint(req) != journal.fingerprint(
+            Request.from_dict({"path": "/path", "qs": {"a": ["1"], "b": ["3"]}})
+        )
+
+
+class TestRun:
+    def test(self, tmpdir):
+        config = Config.from_dict(
+            {
+                "one": {"name": "one", "host": "http://one"},
+                "other": {"name": "other", "host": "http://other"},
+                "output": {"response_dir": "responses"},
+                "input_files": ["requests"],
+                "addons": {"log2reqs": {"name": "plain"}},
+            }
+        )
+        journal.save_run(
+            str(tmpdir),
+            journal.Run.from_dict({"config": config, "start_time": "2000-01-01T00:00:00+09:00"}),
+        )
+
+        actual = journal.load_run(str(tmpdir))
+
+        assert config.to_dict() == actual.config.to_dict()
+        assert actual.retry_hash.is_none()
+
+        journal.remove(str(tmpdir))
+        assert journal.load_run(str(tmpdir)) is None
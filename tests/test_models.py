@@ -1,11 +1,12 @@
 #!/usr/bin/env python
 # -*- coding:utf-8 -*-
+import datetime
 from collections import namedtuple
 
 import pytest
 from owlmixin import TOption
 
-from jumeaux.models import Proxy, Response
+from jumeaux.models import EncodingDetector, Proxy, Response, Report
 
 
 class TestProxy:
@@ -137,3 +138,153 @@ class TestModels:
         )
 
         assert actual == expected
+
+    def test_from_requests_decide_encoding_only_by_head(self):
+        Requests = namedtuple("Requests", ("headers", "content", "encoding", "url"))
+        content = b"<p>" * 10 + b'<meta charset="EUC-JP">'
+
+        assert (
+            Response._decide_encoding(
+                Requests({"content-type": "text/html"}, content, None, "http://host/path"),
+                detector=EncodingDetector(max_bytes=30),
+            )
+            == "ascii"
+        )
+        assert (
+            Response._decide_encoding(
+                Requests({"content-type": "text/html"}, content, None, "http://host/path"),
+                detector=EncodingDetector(max_bytes=100),
+            )
+            == "EUC-JP"
+        )
+
+
+class TestEncodingDetector:
+    Requests = namedtuple("Requests", ("headers", "content", "url"))
+
+    def test_guess_only_head(self):
+        detector = EncodingDetector(max_bytes=10)
+        res = self.Requests({}, b"abcdefghij" + "日本語".encode("utf8"), "http://host/path")
+        assert detector.guess(res) == "ascii"
+
+    def test_guess_head_which_ends_in_the_middle_of_a_character(self):
+        detector = EncodingDetector(max_bytes=1001)
+        res = self.Requests({}, ("日本語 " * 1000).encode("utf8"), "http://host/path")
+        assert detector.guess(res) == "utf-8"
+
+    def test_guess_cache_by_host_and_content_type(self):
+        detector = EncodingDetector(cache=True)
+        utf8_res = self.Requests(
+            {"content-type": "text/plain"}, ("日本語です" * 10).encode("utf8"), "http://host/1"
+        )
+        # Guessed as ascii or windows-1252 without a cache
+        ascii_res = self.Requests({"content-type": "text/plain"}, b"abc", "http://host/2")
+        other_host_res = self.Requests({"content-type": "text/plain"}, b"abc", "http://other/2")
+
+        assert detector.guess(utf8_res) == "utf-8"
+        assert detector.guess(ascii_res) == "utf-8"
+        assert detector.guess(other_host_res) == "ascii"
+
+    def test_guess_cache_ascii_is_not_reused(self):
+        detector = EncodingDetector(cache=True)
+        ascii_res = self.Requests({"content-type": "text/plain"}, b"abc", "http://host/1")
+        utf8_res = self.Requests(
+            {"content-type": "text/plain"}, "日本語です".encode("utf8"), "http://host/2"
+        )
+
+        assert detector.guess(ascii_res) == "ascii"
+        assert detector.guess(utf8_res) == "utf-8"
+
+    def test_guess_cache_again_if_it_can_not_decode(self):
+        detector = EncodingDetector(cache=True)
+        utf8_res = self.Requests(
+            {"content-type": "text/plain"}, ("日本語です" * 10).encode("utf8"), "http://host/1"
+        )
+        euc_jp_res = self.Requests(
+            {"content-type": "text/plain"}, ("日本語です" * 10).encode("euc-jp"), "http://host/2"
+        )
+
+        assert detector.guess(utf8_res) == "utf-8"
+        # EUC-JP or a superset of it
+        assert euc_jp_res.content.decode(detector.guess(euc_jp_res)) == "日本語です" * 10
+
+    def test_guess_without_cache(self):
+        detector = EncodingDetector()
+        assert detector.guess(self.Requests({}, b"abc", "http://host/1")) == "ascii"
+        assert detector.guess(self.Requests({}, "日本語です".encode("utf8"), "http://host/2")) == (
+            "utf-8"
+        )
+
+
+class TestResponse:
+    def create(self, body: bytes) -> Response:
+        return Response.from_dict(
+            {
+                "body": body,
+                "encoding": "utf8",
+                "headers": {},
+                "url": "http://host/path",
+                "status_code": 200,
+                "elapsed": datetime.timedelta(seconds=1),
+                "elapsed_sec": 1.0,
+                "type": "plain",
+            }
+        )
+
+    def test_text_is_memoized(self):
+        res = self.create("日本語".encode("utf8"))
+        assert res.text is res.text
+        assert "_text" not in res.to_dict()
+
+    def test_copy_with_body_forgets_text(self):
+        res = self.create(b"before")
+        assert res.text == "before"
+        assert res.copy_with(body=b"after").text == "after"
+        assert res.copy_with(status_code=400).text is res.text
+
+
+REPORT = {
+    "version": "1.0.0",
+    "key": "hash_key",
+    "title": "Report title",
+    "summary": {
+        "one": {"name": "name_one", "host": "http://host/one"},
+        "other": {"name": "name_other", "host": "http://host/other"},
+        "status": {"same": 1, "different": 1, "failure": 0},
+        "tags": [],
+        "time": {"start": "start", "end": "end", "elapsed_sec": 1},
+        "concurrency": {"threads": 1, "processes": 1},
+        "output": {"response_dir": "responses"},
+    },
+    "trials": [
+        {
+            "seq": seq,
+            "name": f"name{seq}",
+            "tags": [],
+            "headers": {},
+            "queries": {"q": ["日本語"]},
+            "one": {"url": "URL_ONE", "type": "json"},
+            "other": {"url": "URL_OTHER", "type": "json"},
+            "method": "GET",
+            "path": "/path",
+            "request_time": "time",
+            "status": "same",
+            "diffs_by_cognition": {
+                "unknown": {"added": ["root<'a'>"], "changed": [], "removed": []}
+            },
+        }
+        for seq in [1, 2]
+    ],
+}
+
+
+class TestReport:
+    @pytest.mark.parametrize("indent", [None, 0, 2, 4])
+    def test_iter_json(self, indent):
+        report: Report = Report.from_dict(REPORT)
+        assert "".join(report.iter_json(indent)) == report.to_json(indent=indent)
+
+    @pytest.mark.parametrize("indent", [None, 4])
+    def test_iter_json_without_trials(self, indent):
+        report: Report = Report.from_dict({**REPORT, "trials": []})
+        assert "".join(report.iter_json(indent)) == report.to_json(indent=indent)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+import os
+import pstats
+from concurrent.futures import ThreadPoolExecutor
+
+from jumeaux import profiler
+from jumeaux.domain.config.vo import Profile
+
+
+def fibonacci(n: int) -> int:
+    return n if n < 2 else fibonacci(n - 1) + fibonacci(n - 2)
+
+
+def profile_trials(p: profiler.TrialProfiler, seqs):
+    def trial(seq: int):
+        with p.trial(seq):
+            fibonacci(10)
+
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        list(ex.map(trial, seqs))
+    p.close()
+
+
+class TestTrialProfiler:
+    def test_sampled(self, tmpdir):
+        p = profiler.TrialProfiler(Profile.from_dict({"every": 3}), str(tmpdir))
+        assert [3, 6] == [x for x in range(1, 8) if p.sampled(x)]
+
+    def test_merge(self, tmpdir):
+        profile_trials(
+            profiler.TrialProfiler(Profile.from_dict({"every": 2, "top": 5}), str(tmpdir)),
+            range(1, 9),
+        )
+
+        actual = profiler.merge(str(tmpdir), 5)
+
+        assert [
+            os.path.join(str(tmpdir), "profile.pstats"),
+            os.path.join(str(tmpdir), "profile.txt"),
+        ] == actual
+        # Only trials 2, 4, 6 and 8 in all threads
+        stats = pstats.Stats(actual[0]).stats  # type: ignore
+        assert [4] == [v[0] for k, v in stats.items() if k[2] == "trial"]
+        assert "# Top 5 functions by cumulative" in tmpdir.join("profile.txt").read()
+        assert not os.path.exists(os.path.join(str(tmpdir), profiler.PROCESSES_DIR))
+
+    def test_memory(self, tmpdir):
+        profile_trials(
+            profiler.TrialProfiler(Profile.from_dict({"memory": True, "top": 3}), str(tmpdir)),
+            range(1, 3),
+        )
+
+        actual = profiler.merge(str(tmpdir), 3)
+
+        assert os.path.join(str(tmpdir), "profile-memory.txt") == actual[-1]
+        assert (
+            tmpdir.join("profile-memory.txt")
+            .read()
+            .startswith("# Top 3 lines of memory increased during trials")
+        )
+
+    def test_only_memory(self, tmpdir):
+        profile_trials(
+            profiler.TrialProfiler(Profile.from_dict({"cpu": False, "memory": True}), str(tmpdir)),
+            range(1, 3),
+        )
+
+        assert [os.path.join(str(tmpdir), "profile-memory.txt")] == profiler.merge(str(tmpdir), 30)
+
+    def test_no_trials(self, tmpdir):
+        profile_trials(
+            profiler.TrialProfiler(Profile.from_dict({"every": 10}), str(tmpdir)), range(1, 3)
+        )
+
+        assert [] == profiler.merge(str(tmpdir), 30)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+import multiprocessing
+import os
+from concurrent import futures
+
+import pytest
+
+from jumeaux.store import (
+    store,
+    to_digest,
+    read,
+    content_encoding_of,
+    get_background_writer,
+    init_child_writer,
+    pop_child_writer_errors,
+    BackgroundWriter,
+)
+
+
+class TestStore:
+    def test_named(self, tmpdir):
+        os.makedirs(os.path.join(tmpdir, "one"))
+
+        actual = store(b"body", dir=str(tmpdir), category="one", name="(1)name")
+
+        assert actual == "one/(1)name"
+        assert tmpdir.join("one", "(1)name").read_binary() == b"body"
+
+    def test_named_killed_while_writing(self, tmpdir, monkeypatch):
+        os.makedirs(os.path.join(tmpdir, "one"))
+
+        def killed(src, dst):
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr("jumeaux.store.os.replace", killed)
+        with pytest.raises(KeyboardInterrupt):
+            store(b"body", dir=str(tmpdir), category="one", name="(1)name")
+
+        # Not to be regarded as a complete file by resume
+        assert not tmpdir.join("one", "(1)name").exists()
+
+    def test_content_addressed(self, tmpdir):
+        os.makedirs(os.path.join(tmpdir, "one-props"))
+
+        actual1 = store(
+            b"{}",
+            dir=str(tmpdir),
+            category="one-props",
+            name="(1)name",
+            extension=".json",
+            content_addressed=True,
+        )
+        actual2 = store(
+            b"{}",
+            dir=str(tmpdir),
+            category="one-props",
+            name="(2)name",
+            extension=".json",
+            content_addressed=True,
+        )
+
+        assert actual1 == actual2 == f"one-props/{to_digest(b'{}')}.json"
+        assert os.listdir(os.path.join(tmpdir, "one-props")) == [f"{to_digest(b'{}')}.json"]
+        assert tmpdir.join(actual1).read_binary() == b"{}"
+
+    def test_compressed(self, tmpdir):
+        os.makedirs(os.path.join(tmpdir, "other"))
+
+        actual = store(
+            b"body", dir=str(tmpdir), category="other", name="(1)name", compression="gzip"
+        )
+
+        assert actual == "other/(1)name.gz"
+        assert tmpdir.join(actual).read_binary() != b"body"
+        assert read(str(tmpdir.join(actual))) == b"body"
+        assert content_encoding_of(actual) == "gzip"
+
+    def test_content_addressed_and_compressed(self, tmpdir):
+        os.makedirs(os.path.join(tmpdir, "other"))
+
+        actual = store(
+            b"body",
+            dir=str(tmpdir),
+            category="other",
+            name="(1)name",
+            content_addressed=True,
+            compression="gzip",
+        )
+
+        assert actual == f"other/{to_digest(b'body')}.gz"
+        assert read(str(tmpdir.join(actual))) == b"body"
+
+
+class TestBackgroundWriter:
+    def test_flush(self, tmpdir):
+        os.makedirs(os.path.join(tmpdir, "one"))
+        writer = BackgroundWriter(queue_size=2, batch_size=2)
+
+        actual = [
+            store(
+                lambda i=i: f"body{i}".encode(),
+                dir=str(tmpdir),
+                category="one",
+                name=f"({i})name",
+                writer=writer,
+            )
+            for i in range(10)
+        ]
+        writer.close()
+
+        assert actual == [f"one/({i})name" for i in range(10)]
+        assert tmpdir.join("one", "(9)name").read_binary() == b"body9"
+
+    def test_content_addressed(self, tmpdir):
+        os.makedirs(os.path.join(tmpdir, "one"))
+        writer = BackgroundWriter(queue_size=10, batch_size=10)
+
+        actual = [
+            store(
+                b"same",
+                dir=str(tmpdir),
+                category="one",
+                name=f"({i})name",
+                content_addressed=True,
+                writer=writer,
+            )
+            for i in range(3)
+        ]
+        writer.flush()
+
+        assert set(actual) == {f"one/{to_digest(b'same')}"}
+        assert os.listdir(os.path.join(tmpdir, "one")) == [to_digest(b"same")]
+        writer.close()
+
+    def test_error(self, tmpdir):
+        writer = BackgroundWriter(queue_size=10, batch_size=10)
+
+        store(b"body", dir=str(tmpdir), category="not_exist", name="(1)name", writer=writer)
+
+        with pytest.raises(FileNotFoundError):
+            writer.close()
+
+    def test_put_after_error(self, tmpdir):
+        writer = BackgroundWriter(queue_size=10, batch_size=10)
+        store(b"body", dir=str(tmpdir), category="not_exist", name="(1)name", writer=writer)
+
+        with pytest.raises(FileNotFoundError):
+            writer.flush()
+        with pytest.raises(FileNotFoundError):
+            store(b"body", dir=str(tmpdir), category="not_exist", name="(2)name", writer=writer)
+
+
+def store_in_background(dir: str) -> str:
+    return store(
+        b"body",
+        dir=dir,
+        category="not_exist",
+        name="(1)name",
+        writer=get_background_writer(queue_size=10, batch_size=10),
+    )
+
+
+class TestChildWriterErrors:
+    def test(self, tmpdir):
+        errors = multiprocessing.SimpleQueue()
+        with futures.ProcessPoolExecutor(
+            max_workers=1, initializer=init_child_writer, initargs=(errors,)
+        ) as ex:
+            # The error occurs after the task finished
+            assert "not_exist/(1)name" == ex.submit(store_in_background, str(tmpdir)).result()
+
+        actual = pop_child_writer_errors(errors)
+
+        assert 1 == len(actual)
+        assert actual[0].startswith("FileNotFoundError: ")
+        assert [] == pop_child_writer_errors(errors)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+import time
+
+import pytest
+
+from jumeaux import timing
+from jumeaux.models import Timings
+
+
+class TestAdd:
+    def test_accumulate(self):
+        timings = {"res2dict/json": 1.0}
+        elapsed = timing.add(timings, "res2dict/json", time.perf_counter())
+        assert elapsed >= 0
+        assert timings == {"res2dict/json": 1.0 + elapsed}
+
+    def test_none(self):
+        assert timing.add(None, "res2dict/json", time.perf_counter()) >= 0
+
+
+class TestPercentile:
+    @pytest.mark.parametrize(
+        "p, expected", [(0, 1), (50, 50), (95, 95), (99, 99), (99.5, 100), (100, 100)]
+    )
+    def test(self, p, expected):
+        assert expected == timing.percentile(list(range(1, 101)), p)
+
+    def test_single(self):
+        assert 3 == timing.percentile([3], 99)
+
+
+class TestSummarize:
+    def test(self):
+        actual = timing.summarize(
+            [
+                Timings.from_dict({"stages": {"total": 0.3, "diff": 0.1}, "addons": {}}),
+                Timings.from_dict({"stages": {"total": 0.1}, "addons": {"dump/json": 0.05}}),
+                Timings.from_dict({"stages": {"total": 0.2}}),
+            ]
+        )
+
+        assert {
+            "stages": {
+                "total": {"count": 3, "mean": 0.2, "p50": 0.2, "p95": 0.3, "p99": 0.3, "max": 0.3},
+                "diff": {"count": 1, "mean": 0.1, "p50": 0.1, "p95": 0.1, "p99": 0.1, "max": 0.1},
+            },
+            "addons": {
+                "dump/json": {
+                    "count": 1,
+                    "mean": 0.05,
+                    "p50": 0.05,
+                    "p95": 0.05,
+                    "p99": 0.05,
+                    "max": 0.05,
+                }
+            },
+        } == actual.to_dict()
+
+    def test_empty(self):
+        assert {"stages": {}, "addons": {}} == timing.summarize([]).to_dict()
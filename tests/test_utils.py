@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 # -*- coding:utf-8 -*-
 
+from concurrent import futures
+
 import pytest
 
 from jumeaux import utils
@@ -126,3 +128,39 @@ class TestGetJinja2FormatError:
     def test_normal(self, expected, fmt):
         actual = utils.get_jinja2_format_error(fmt)
         assert expected == actual.get()
+
+
+class TestMapInOrder:
+    def test_order(self):
+        with futures.ThreadPoolExecutor(max_workers=4) as ex:
+            actual = list(utils.map_in_order(ex, lambda x: x * 2, range(100), 8))
+        assert actual == [x * 2 for x in range(100)]
+
+    def test_lazy(self):
+        consumed = []
+
+        def inputs():
+            for x in range(100):
+                consumed.append(x)
+                yield x
+
+        with futures.ThreadPoolExecutor(max_workers=2) as ex:
+            results = utils.map_in_order(ex, lambda x: x, inputs(), 4)
+            assert next(results) == 0
+            assert len(consumed) <= 5
+
+
+class TestChunked:
+    @pytest.mark.parametrize(
+        "expected, size",
+        [
+            ([[0, 1, 2], [3, 4, 5], [6]], 3),
+            ([[0, 1, 2, 3, 4, 5, 6]], 10),
+            ([[x] for x in range(7)], 1),
+        ],
+    )
+    def test_normal(self, expected, size):
+        assert expected == list(utils.chunked(range(7), size))
+
+    def test_empty(self):
+        assert [] == list(utils.chunked([], 3))